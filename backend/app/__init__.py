@@ -107,6 +107,7 @@ def create_app():
     from app.endpoints.public_data import public_data_bp
     from app.endpoints.data_sources import data_sources_bp
     from app.endpoints.tasks import tasks_bp
+    from app.endpoints.ingest import ingest_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(general_bp)
@@ -114,6 +115,7 @@ def create_app():
     app.register_blueprint(public_data_bp)
     app.register_blueprint(data_sources_bp)
     app.register_blueprint(tasks_bp)
+    app.register_blueprint(ingest_bp)
 
 
     # Extensions
@@ -51,6 +51,13 @@ class Config:
     SPECIFIC_PAGES = os.getenv("SPECIFIC_PAGES", "").split(",") if os.getenv("SPECIFIC_PAGES") else []
     SQL_LOGGING = os.getenv("SQL_LOGGING", "true").lower() == "true"
     DB_MODE = os.getenv("DB_MODE", "prod")
+    # Data pipeline
+    CONTENT_HASH_BACKEND = os.getenv("CONTENT_HASH_BACKEND", "auto")  # Options: "auto", "msgspec", "json"
+    INGEST_BUFFER_URL = os.getenv("INGEST_BUFFER_URL", "redis://localhost:6379/1")  # push ingestion buffer
+    FILE_INGEST_ROOT = os.getenv("FILE_INGEST_ROOT", os.path.join(BASE_DIR, "ingest"))  # file/manual source inboxes
+    RESPONSE_CACHE_ROOT = os.getenv("RESPONSE_CACHE_ROOT", os.path.join(BASE_DIR, "response_cache"))  # recorded API pages
+    RESPONSE_CACHE_RECORD = os.getenv("RESPONSE_CACHE_RECORD", "false").lower() == "true"  # record on every extract
+    TRANSFORM_WORKERS = int(os.getenv("TRANSFORM_WORKERS", "1"))  # parse processes per transform_data run (1 = serial)
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -82,6 +82,8 @@ def init_celery(flask_app: Flask):
     import app.tasks.extract_data_sources   # noqa: F401
     import app.tasks.transform_data          # noqa: F401 
     import app.tasks.load_analytics          # noqa: F401
+    import app.tasks.flush_ingest_buffer     # noqa: F401
+    from app.tasks.flush_ingest_buffer import INGEST_FLUSH_INTERVAL
 
     # 6) Define Beat schedule AFTER conf.update so it isn't clobbered elsewhere
     celery.conf.beat_schedule = {
@@ -95,6 +97,11 @@ def init_celery(flask_app: Flask):
             "schedule": CLEAN_INTERVAL,
             # "options": {"queue": "etl"},
         },
+        "flush-ingest-buffer": {
+            "task": "app.tasks.flush_ingest_buffer.flush_ingest_buffer_task",
+            "schedule": INGEST_FLUSH_INTERVAL,
+            "options": {"expires": INGEST_FLUSH_INTERVAL * 2},  # don't pile up ticks behind a stalled worker
+        },
     }
 
     return celery
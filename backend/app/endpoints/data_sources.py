@@ -5,19 +5,30 @@
 # ------------------------------------------------------------------------------------
 # Notes:
 # - Open data sources (no auth, no CSRF)
+# - POST /data-sources/<id>/files uploads a file into a 'file' / 'manual' source's inbox
+#   (app/utils/file_ingest.py) and queues that source's extract subtask.
+# - GET /data-sources/<id>/field-changes measures how often each field changes between
+#   stored copies of a record (app/utils/field_volatility.py) and suggests hash exclusions;
+#   PUT /data-sources/<id>/hash-exclude stores them in config["hash_exclude"].
 # ------------------------------------------------------------------------------------
 # Imports:
 from __future__ import annotations
+import os
 from datetime import datetime, timedelta, date
-from flask import Blueprint, jsonify, request
+from uuid import uuid4
+from flask import Blueprint, current_app, jsonify, request
 from sqlalchemy import text
 from decimal import Decimal
+from werkzeug.utils import secure_filename
 
 # Local Imports
 from app.extensions import db, csrf
-from app.models.data_sources import DataSource
+from app.models.data_sources import DataSource, UserDatasetRaw
 from app.models.analysis import SourceMetricsDaily
 from app.models.clean_staging import CustomersClean
+from app.tasks.extract_data_sources import FILE_SOURCE_TYPES, extract_data_source_task
+from app.utils import field_volatility, file_ingest
+from app.utils.content_hash import MAX_EXCLUDED_FIELDS
 from app.utils.security import authorizeUser
 
 from app.utils.logging import debug_logger
@@ -25,6 +36,9 @@ from app.utils.logging import debug_logger
 # Vars
 data_sources_bp = Blueprint("data_sources", __name__)
 
+FIELD_CHANGES_DEFAULT_ROWS = 5000
+FIELD_CHANGES_MAX_ROWS = 50000
+
 # ------------------------------------------------------------------------------------
 # Helpers
 def _parse_date(name: str, val: str | None):
@@ -68,6 +82,8 @@ def _to_ymd(s: str) -> str:
 def list_sources():
     user_id = authorizeUser()
     # Aggregate counts and bounds cheaply. LEFT JOIN so sources with 0 rows still show.
+    # Health columns come from data_source_state (one row per source, so MAX() is a no-op
+    # that keeps ONLY_FULL_GROUP_BY happy).
     sql = text("""
         SELECT
           ds.id AS source_id,
@@ -77,10 +93,19 @@ def list_sources():
           ds.last_updated,
           COALESCE(COUNT(udr.id), 0) AS record_count,
           MIN(udr.record_time) AS earliest_record,
-          MAX(udr.record_time) AS latest_record
+          MAX(udr.record_time) AS latest_record,
+          COALESCE(MAX(dss.circuit_state), 'closed') AS circuit_state,
+          MAX(dss.circuit_opened_at) AS circuit_opened_at,
+          COALESCE(MAX(dss.consecutive_failures), 0) AS consecutive_failures,
+          COALESCE(MAX(dss.total_failures), 0) AS total_failures,
+          MAX(dss.last_error) AS last_error,
+          MAX(dss.last_error_at) AS last_error_at,
+          MAX(dss.last_success_at) AS last_success_at
         FROM data_sources ds
         LEFT JOIN user_dataset_raw udr
           ON udr.source_id = ds.id AND udr.user_id = ds.user_id
+        LEFT JOIN data_source_state dss
+          ON dss.source_id = ds.id
         WHERE ds.user_id = :user_id
         GROUP BY ds.id
         ORDER BY ds.name ASC
@@ -200,6 +225,106 @@ def delete_source(source_id: int):
     db.session.commit()
     return jsonify({"ok": True}), 200
 
+@data_sources_bp.route("/data-sources/<int:source_id>/files", methods=["POST"])
+@csrf.exempt
+def upload_source_file(source_id: int):
+    """
+    multipart/form-data with a `file` field (.ndjson/.jsonl/.csv/.json, optionally .gz).
+    The file is written to the source inbox under a temp name and renamed into place, so
+    an extract never sees a partial upload. ?ingest=0 only stores it for the next run.
+    """
+    uid = authorizeUser()
+    ds = db.session.get(DataSource, source_id)
+    if not ds or ds.user_id != uid:
+        return jsonify({"error": "not found"}), 404
+    if ds.source_type not in FILE_SOURCE_TYPES:
+        return jsonify({"error": "files can only be uploaded to file or manual sources"}), 400
+
+    upload = request.files.get("file")
+    name = secure_filename(upload.filename or "") if upload else ""
+    if not name:
+        return jsonify({"error": "file is required"}), 400
+    if not file_ingest.allowed_file(name):
+        return jsonify({"error": "unsupported file type (ndjson, jsonl, csv, json, optionally .gz)"}), 400
+
+    inbox = file_ingest.source_inbox(current_app.config["FILE_INGEST_ROOT"], uid, source_id)
+    os.makedirs(inbox, exist_ok=True)
+    stored = f"{uuid4().hex}-{name}"
+    tmp_path = os.path.join(inbox, f".tmp-{stored}")
+    try:
+        upload.save(tmp_path)
+        os.replace(tmp_path, os.path.join(inbox, stored))
+    except OSError as e:
+        debug_logger.error(f"[data_sources] upload failed source_id={source_id} file={name}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return jsonify({"error": "could not store file"}), 500
+
+    task_id = None
+    if request.args.get("ingest", "1") != "0":
+        task_id = extract_data_source_task.apply_async(args=[source_id]).id
+    debug_logger.info(f"[data_sources] stored upload source_id={source_id} file={stored} task_id={task_id}")
+    return jsonify({"ok": True, "file": stored, "task_id": task_id}), 202
+
+@data_sources_bp.route("/data-sources/<int:source_id>/field-changes", methods=["GET"])
+def source_field_changes(source_id: int):
+    """
+    Change rate per field over the source's latest stored rows (?limit=5000, max 50000).
+    ?key=<field> names the record id field when it isn't id / uuid / _id / key.
+    """
+    uid = authorizeUser()
+    ds = db.session.get(DataSource, source_id)
+    if not ds or ds.user_id != uid:
+        return jsonify({"error": "not found"}), 404
+    try:
+        limit = min(max(int(request.args.get("limit", FIELD_CHANGES_DEFAULT_ROWS)), 1), FIELD_CHANGES_MAX_ROWS)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    config = ds.config or {}
+    key_field = (request.args.get("key") or config.get("hash_key") or "").strip() or None
+
+    rows = (
+        db.session.query(UserDatasetRaw.content)
+        .filter(UserDatasetRaw.source_id == source_id, UserDatasetRaw.status == "ok")
+        .order_by(UserDatasetRaw.id.desc())
+        .limit(limit)
+        .all()
+    )
+    current = config.get("hash_exclude") or []
+    # Page-mode rows hold a list of items
+    items = (it for r in reversed(rows) for it in (r.content if isinstance(r.content, list) else [r.content]))
+    result = field_volatility.analyze(items, key_field, current)
+    result.update(source_id=source_id, key=key_field, hash_exclude=current)
+    return jsonify(result), 200
+
+@data_sources_bp.route("/data-sources/<int:source_id>/hash-exclude", methods=["PUT"])
+@csrf.exempt
+def set_hash_exclude(source_id: int):
+    """Body: {"fields": ["date_modified", "_links", "meta.request_id"]} ([] clears it)."""
+    uid = authorizeUser()
+    ds = db.session.get(DataSource, source_id)
+    if not ds or ds.user_id != uid:
+        return jsonify({"error": "not found"}), 404
+    fields = (request.get_json(silent=True) or {}).get("fields")
+    if not isinstance(fields, list) or not all(isinstance(f, str) and f.strip() for f in fields):
+        return jsonify({"error": "fields must be a list of field paths"}), 400
+    fields = sorted({f.strip() for f in fields})
+    if len(fields) > MAX_EXCLUDED_FIELDS:
+        return jsonify({"error": f"at most {MAX_EXCLUDED_FIELDS} fields"}), 400
+    bad = [f for f in fields if not all(f.split("."))]
+    if bad:
+        return jsonify({"error": f"invalid field paths: {bad}"}), 400
+
+    config = dict(ds.config or {})
+    if fields:
+        config["hash_exclude"] = fields
+    else:
+        config.pop("hash_exclude", None)
+    ds.config = config
+    db.session.commit()
+    debug_logger.info(f"[data_sources] hash_exclude source_id={source_id} fields={fields}")
+    return jsonify({"ok": True, "hash_exclude": fields}), 200
+
 # NEW PRIMARY data sources endpoint! Source metrics depreciating
 @data_sources_bp.route("/analytics/source-metrics", methods=["GET"])
 def source_metrics():
@@ -0,0 +1,111 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Push ingestion: POST /ingest/<source_id> with an API key (X-API-Key or
+#   Authorization: Bearer <key>). The key's user must own the source.
+# - Body: one event object, a list of them, or {"events": [...]}.
+# - Events are appended to the Redis buffer (app/utils/ingest_buffer.py) and the
+#   request returns 202 right away; flush_ingest_buffer_task writes them to
+#   user_dataset_raw in large batches with the usual content hash dedupe.
+# ------------------------------------------------------------------------------------
+# Imports:
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from flask import Blueprint, jsonify, request
+from redis.exceptions import RedisError
+
+# Local Imports
+from app.extensions import csrf, db
+from app.models.data_sources import DataSource
+from app.tasks.flush_ingest_buffer import FLUSH_BATCH_SIZE, KICK_DEBOUNCE_SECONDS, flush_ingest_buffer_task
+from app.utils import ingest_buffer
+from app.utils.logging import debug_logger
+from app.utils.security import authorizeApiKey
+
+# ------------------------------------------------------------------------------------
+# Vars
+ingest_bp = Blueprint("ingest", __name__)
+
+MAX_EVENTS_PER_REQUEST = 10_000
+OWNER_CACHE_SECONDS = 60  # source -> owner lookups, so hot sources skip the DB on every push
+
+_owner_cache: Dict[int, Tuple[int, float]] = {}
+_owner_lock = threading.Lock()
+
+# ------------------------------------------------------------------------------------
+# Helpers
+
+def _source_owner(source_id: int):
+    now = time.monotonic()
+    with _owner_lock:
+        hit = _owner_cache.get(source_id)
+    if hit and hit[1] > now:
+        return hit[0]
+    ds = db.session.get(DataSource, source_id)
+    owner = ds.user_id if ds else None
+    if owner is not None:
+        with _owner_lock:
+            _owner_cache[source_id] = (owner, now + OWNER_CACHE_SECONDS)
+    return owner
+
+def _parse_events(payload: Any):
+    """Returns (events, error)."""
+    if isinstance(payload, dict) and isinstance(payload.get("events"), list):
+        events = payload["events"]
+    elif isinstance(payload, list):
+        events = payload
+    elif isinstance(payload, dict):
+        events = [payload]
+    else:
+        return None, "body must be a JSON object, a list of objects, or {\"events\": [...]}"
+    if not events:
+        return None, "no events"
+    if len(events) > MAX_EVENTS_PER_REQUEST:
+        return None, f"at most {MAX_EVENTS_PER_REQUEST} events per request"
+    for i, event in enumerate(events):
+        if not isinstance(event, dict):
+            return None, f"event {i} is not a JSON object"
+    return events, None
+
+# ------------------------------------------------------------------------------------
+# Endpoints
+
+@ingest_bp.route("/ingest/<int:source_id>", methods=["POST"])
+@csrf.exempt
+def push_events(source_id: int):
+    try:
+        uid = authorizeApiKey()
+    except PermissionError:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    if _source_owner(source_id) != uid:
+        return jsonify({"error": "not found"}), 404
+
+    payload = request.get_json(silent=True)
+    events, err = _parse_events(payload)
+    if err:
+        return jsonify({"error": err}), 400
+
+    try:
+        buffered = ingest_buffer.push(uid, source_id, events)
+    except ingest_buffer.BufferFull as e:
+        debug_logger.warning(f"[ingest] {e}")
+        return jsonify({"error": "buffer full, retry later"}), 503, {"Retry-After": "30"}
+    except RedisError as e:
+        debug_logger.error(f"[ingest] buffer unavailable source_id={source_id}: {e}")
+        return jsonify({"error": "ingest buffer unavailable, retry later"}), 503, {"Retry-After": "5"}
+
+    # Busy source: flush now rather than at the next Beat tick (events are safe either way)
+    try:
+        if buffered >= FLUSH_BATCH_SIZE and ingest_buffer.should_kick(source_id, KICK_DEBOUNCE_SECONDS):
+            flush_ingest_buffer_task.apply_async(args=[source_id])
+    except Exception as e:
+        debug_logger.warning(f"[ingest] could not queue early flush source_id={source_id}: {e}")
+
+    return jsonify({"accepted": len(events), "buffered": buffered}), 202
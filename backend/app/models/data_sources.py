@@ -11,7 +11,10 @@
 # Platform Models in this file:
 # - DataSource: Platform users' data source configurations (API connections, etc.)
 # - UserDatasetRaw: Raw data ingested from platform users' data sources
+# - UserDatasetItemHash: Per-item content hashes of page-mode raw rows (dedupe)
 # - AnalyticsEtlState: ETL job state tracking for data processing
+# - DataSourcePageCache: HTTP validators (ETag / Last-Modified) per source page
+# - DataSourceState: Extraction run state per source (incremental watermark, ...)
 #
 # These are platform infrastructure models, not the actual customer data being analyzed.
 # ------------------------------------------------------------------------------------
@@ -92,10 +95,88 @@ class UserDatasetRaw(db.Model):
     def __repr__(self):
         return f"<UserDatasetRaw id={self.id} src={self.source_id} user={self.user_id}>"
 
+class UserDatasetItemHash(db.Model):
+    """
+    Content hash of every item stored inside a page-mode raw row (DataSource.config
+    ["storage"] = "page", one user_dataset_raw row per page holding a list of items).
+    Keyed by the hash alone, like uq_global_content_hash, so items dedupe the same way.
+    """
+    __tablename__ = "user_dataset_item_hash"
+
+    content_hash = db.Column(db.BINARY(32), primary_key=True)  # SHA-256 of the item (same hasher as item rows)
+    raw_id       = db.Column(db.BigInteger, ForeignKey("user_dataset_raw.id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        Index("idx_item_hash_raw", "raw_id"),
+    )
+
+    def __repr__(self):
+        return f"<UserDatasetItemHash raw={self.raw_id} hash={self.content_hash.hex()[:16]}>"
+
 class AnalyticsEtlState(db.Model):
     __tablename__ = "analytics_etl_state"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    job = db.Column(db.String(64), nullable=False, unique=True)  # e.g., "source_metrics_daily"
-    last_raw_id = db.Column(db.Integer, nullable=False, default=0)
-    last_run_at = db.Column(db.DateTime, nullable=False, default=datetime.now(), onupdate=datetime.now())
+    job = db.Column(db.String(64), nullable=False, unique=True)  # e.g., "source_metrics_daily", "transform_data:user:7"
+    last_raw_id = db.Column(db.BigInteger, nullable=False, default=0)  # user_dataset_raw.id is BIGINT
+    last_run_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+class DataSourcePageCache(db.Model):
+    """
+    Conditional GET validators per (source, page URL). The extractor sends them back
+    as If-None-Match / If-Modified-Since and skips unchanged (304) pages entirely.
+    """
+    __tablename__ = "data_source_page_cache"
+
+    id            = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    source_id     = db.Column(db.BigInteger, ForeignKey("data_sources.id", ondelete="CASCADE"), nullable=False)
+    url_hash      = db.Column(db.BINARY(32), nullable=False)  # SHA-256 of the page URL (URLs are too long to index)
+    url           = db.Column(db.Text, nullable=False)
+    etag          = db.Column(db.String(512), nullable=True)
+    last_modified = db.Column(db.String(64), nullable=True)
+    updated_at    = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint("source_id", "url_hash", name="uq_page_cache_source_url"),
+    )
+
+    def __repr__(self):
+        return f"<DataSourcePageCache src={self.source_id} url={self.url}>"
+
+class DataSourceState(db.Model):
+    """
+    Extraction state per DataSource, kept out of DataSource.config so user edits to
+    the config never clobber it (and vice versa).
+    """
+    __tablename__ = "data_source_state"
+
+    source_id            = db.Column(db.BigInteger, ForeignKey("data_sources.id", ondelete="CASCADE"), primary_key=True)
+    watermark            = db.Column(db.String(255), nullable=True)  # max config.incremental.field seen so far
+    watermark_updated_at = db.Column(db.DateTime, nullable=True)
+
+    # Health / circuit breaker (app/utils/source_health.py)
+    circuit_state        = db.Column(db.Enum("closed", "open", "half_open"), nullable=False, default="closed")
+    circuit_opened_at    = db.Column(db.DateTime, nullable=True)
+    consecutive_failures = db.Column(db.Integer, nullable=False, default=0)
+    total_failures       = db.Column(db.Integer, nullable=False, default=0)
+    last_error           = db.Column(db.Text, nullable=True)
+    last_error_at        = db.Column(db.DateTime, nullable=True)
+    last_success_at      = db.Column(db.DateTime, nullable=True)
+
+    # Resume point after the last committed page of an unfinished walk (cleared when a walk completes)
+    checkpoint_page      = db.Column(db.Integer, nullable=True)     # next page number to fetch
+    checkpoint_next_url  = db.Column(db.Text, nullable=True)        # next cursor URL, if the API returned one
+    checkpoint_run_id    = db.Column(db.String(64), nullable=True)  # extract task id that wrote it
+    checkpoint_url_hash  = db.Column(db.BINARY(32), nullable=True)  # SHA-256 of the walk's base URL
+    checkpoint_watermark = db.Column(db.String(255), nullable=True) # incremental max seen before the checkpoint
+    checkpoint_at        = db.Column(db.DateTime, nullable=True)
+
+    updated_at           = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    source = db.relationship("DataSource", backref=db.backref("state", uselist=False, cascade="all, delete-orphan"))
+
+    def __repr__(self):
+        return (
+            f"<DataSourceState src={self.source_id} watermark={self.watermark} circuit={self.circuit_state} "
+            f"checkpoint={self.checkpoint_page}>"
+        )
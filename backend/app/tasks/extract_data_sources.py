@@ -11,37 +11,161 @@
 #   - You can also kick it off early via the POST /tasks/run/update-data-sources route.
 # Progress:
 #   - Frontend can poll /tasks/<task_id>/status to read self.update_state(meta=...) progress.
+# Fan-out:
+#   - By default the task is a coordinator: it replaces itself with a chord of one
+#     extract_data_source_task per DataSource, and extract_data_sources_summary_task
+#     aggregates their summaries (keeping the coordinator's task id, so polling and
+#     chained transform/load are unchanged). Sources scale across workers and nodes;
+#     a slow source only holds its own subtask (capped by SOURCE_SOFT_TIME_LIMIT).
+#   - fan_out=False keeps the whole run inside one worker (thread pool below).
+#   - The per-host cap below is per worker process once sources are fanned out.
+# Concurrency:
+#   - Sources are fetched in parallel on a thread pool (MAX_CONCURRENT_SOURCES).
+#   - In-flight requests per host are capped (MAX_CONCURRENT_PER_HOST) so several
+#     sources pointing at the same API don't hammer it at once.
+#   - Each worker thread runs in its own Flask app context (own db.session).
+#   - All HTTP goes through one shared HttpClient (app/utils/http_client.py): pooled
+#     keep-alive sessions per host plus retry/backoff. Its stats land in out["http"].
+# Circuit breaker:
+#   - Health per source lives in data_source_state (app/utils/source_health.py). After
+#     CIRCUIT_FAILURE_THRESHOLD consecutive failed runs the circuit opens and runs skip
+#     the source; once the (growing) cooldown passes, one cheap probe request for the
+#     walk's first page URL (profile applied, so cursor APIs get no ?page; PROBE_TIMEOUT,
+#     no retries) decides whether it gets a full run again.
+#   - Opt out of skipping per source with config["circuit_breaker"] = false (failures are
+#     still recorded). Counters land in out["circuit"]; /datasets/sources shows health.
+# Rate limiting:
+#   - DataSource.config["rate_limit"] = {"per_second": 2, "burst": 5, "host_per_second": 10,
+#     "host_burst": 10, "max_pause": 300, "max_rate_limited": 10} (app/utils/rate_limit.py).
+#     Token buckets per source and per host (strictest host limit wins); unset = unlimited.
+#   - Retry-After and X-RateLimit-Remaining: 0 / X-RateLimit-Reset pause the source (and
+#     every source on its host) until the quota resets; a 429 is retried after the pause
+#     instead of failing the source.
+#     Waits longer than max_pause still fail. Counters land in out["throttle"].
+#   - With fan-out, host buckets are per subtask (process), not cluster wide.
+# Extraction profile:
+#   - The first successful run stores what the API looks like in DataSource.config["profile"]
+#     (envelope key, page vs cursor pagination, page size param, total count header; see
+#     app/utils/extract_profile.py). Later runs read items straight from the envelope, follow
+#     only next links on cursor APIs and stop on the last page instead of fetching an empty one.
+#   - A response that no longer matches drops back to probing for the rest of the walk and
+#     the profile is re-detected. config["profile"] = false disables it. Counters: out["profile"].
+# Parallel pages:
+#   - When the first page of a page-numbered walk reports the page count (X-WP-TotalPages,
+#     X-Total-Pages, X-Total-Count / X-WP-Total, or total / total_pages in the body), the
+#     remaining pages are fetched on PAGE_CONCURRENCY threads (config["page_concurrency"],
+#     max MAX_PAGE_CONCURRENCY) once the writer has kept the first page. Every request still
+#     waits on the source / host token buckets; the source's host slot cap is raised to
+#     its page concurrency.
+#   - Pages are handed to the writer in page order, so dedupe, stop rules, checkpoints and
+#     counters are identical to a serial walk. Streamed (huge) first pages stay serial.
+# Conditional GET:
+#   - ETag / Last-Modified per (source, page URL) live in data_source_page_cache.
+#     A 304 means the page is unchanged since it was last stored, which is the same
+#     as "no new hashes": pagination stops without parsing or hashing anything.
+#   - Opt out per source with DataSource.config["conditional_get"] = false.
+# Incremental extraction:
+#   - DataSource.config["incremental"] = {"param": "modified_after", "field": "date_modified"}
+#     injects the stored watermark (data_source_state.watermark) as ?modified_after=...
+#     so each run only walks records changed since the last successful run.
+#   - "field" is the item key (dotted paths allowed) whose max value becomes the next
+#     watermark. It only advances when the whole source completes without errors.
+# Checkpoints:
+#   - After every fully stored page the next page number / cursor URL is saved in
+#     data_source_state (with the run id). A source that errors, a worker that dies, or a
+#     walk cut off at MAX_PAGES (a per-run budget) continues from there on the next run
+#     instead of page 1; the checkpoint is cleared once a walk completes.
+#   - Only valid for the same base URL (incl. the injected watermark) and for
+#     CHECKPOINT_MAX_AGE_SECONDS. Opt out with config["checkpoint"] = false.
+#     Counters land in out["checkpoint"].
+# Streaming:
+#   - Large (or unknown-size) bodies are decoded item by item (app/utils/json_stream.py)
+#     and hashed/upserted in BATCH_SIZE chunks, so worker memory is bounded by
+#     BATCH_SIZE items rather than by page size. DataSource.config["stream"] forces it.
+# Pipelining:
+#   - Per source, a fetch thread downloads/decodes pages into a bounded queue
+#     (PREFETCH_PAGES, or config["prefetch_pages"]) while the source thread hashes and
+#     writes. A full queue blocks the fetcher (backpressure). Streamed pages are not
+#     prefetched: the fetcher waits until the writer has drained the socket.
+#   - Stage timings (fetch / fetch_blocked / process / process_wait) land in out["stages"].
+# Files:
+#   - 'file' / 'manual' sources have no base_url; they ingest NDJSON / CSV / JSON (optionally
+#     gzipped) files from their inbox under FILE_INGEST_ROOT (app/utils/file_ingest.py),
+#     uploaded via POST /data-sources/<id>/files or dropped there directly.
+#   - Each file is claimed (atomic rename), streamed record by record through the same
+#     hasher and batched upserts as API pages, then moved to processed/ or failed/.
+#     Counters land in out["files"]; the circuit breaker and HTTP layers are not involved.
+# Response cache (app/utils/response_cache.py):
+#   - record=True (or app config RESPONSE_CACHE_RECORD) saves every 200 page under
+#     RESPONSE_CACHE_ROOT, gzipped and content-addressed; streamed bodies are teed to disk.
+#   - offline=True replays those pages instead of calling the APIs: no throttling, no
+#     conditional GET, no circuit breaker, checkpoints or incremental filter, and no source
+#     state (watermark, validators, profile, last_updated) is written. A page that was
+#     never recorded fails its source with ResponseCacheMiss. Counters: out["response_cache"].
+# Duplicate pre-check:
+#   - Each write batch first asks user_dataset_raw which of its hashes already exist
+#     (one SELECT ... IN per batch) and only ships the new rows. Skipped rows count as
+#     duplicates and in out["prechecked"]. Opt out with config["hash_precheck"] = false.
+#   - Content hashes come from app/utils/content_hash.py; the encoder backend is picked
+#     with app config CONTENT_HASH_BACKEND ("auto" | "msgspec" | "json"), digests are
+#     identical for every backend. Counters land in out["hash"].
+#   - config["storage"] = "page" stores each written batch (a page, or BATCH_SIZE items of a
+#     streamed one) as one raw row holding the list of new items, with per-item hashes in
+#     user_dataset_item_hash (app/utils/raw_writer.py). For sources with millions of small
+#     items. Page rows written land in out["pages"]["stored"].
+#   - config["hash_exclude"] leaves volatile fields (date_modified, _links, request ids)
+#     out of the hash so re-fetching an unchanged record doesn't store another copy.
 # ------------------------------------------------------------------------------------
 
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from contextlib import contextmanager
 from datetime import datetime
 import hashlib
 import json
-from typing import Any, Dict, List
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import requests
 from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from celery import chord, group
+from flask import current_app
 from sqlalchemy.dialects.mysql import insert as mysql_insert
 
 from app.extensions import celery, db
-from app.models.data_sources import DataSource, UserDatasetRaw
+from app.models.data_sources import DataSource, DataSourcePageCache, DataSourceState
+from app.utils import extract_profile, file_ingest, source_health
+from app.utils.content_hash import DEFAULT_BACKEND as DEFAULT_HASH_BACKEND, compile_exclusions, get_hasher
+from app.utils.http_client import RETRY_STATUSES, HttpClient
+from app.utils.json_stream import StreamedPage
 from app.utils.logging import debug_logger
+from app.utils.rate_limit import HostBuckets, SourceThrottle, TokenBucket, parse_rate_limit_config
+from app.utils.raw_writer import upsert_raw_page, upsert_raw_rows
+from app.utils.response_cache import ResponseCache, ResponseCacheMiss, empty_stats as empty_response_cache_stats
 
 # ------------------------------------------------------------------------------------
 # Consts
 HTTP_TIMEOUT = 30
-MAX_PAGES = 1000
-BATCH_SIZE = 1000  # reserved for future batch optimizations
+MAX_PAGES = 1000  # per run; a walk cut off here resumes from its checkpoint next run
+BATCH_SIZE = 1000  # rows per multi-row upsert / transaction
+MAX_CONCURRENT_SOURCES = 8   # global cap: sources extracted at the same time
+MAX_CONCURRENT_PER_HOST = 2  # per-host cap: in-flight requests against one netloc
+HTTP_MAX_RETRIES = 3         # transient failures retried per request (backoff + jitter)
+STREAM_THRESHOLD_BYTES = 8 * 1024 * 1024  # bodies above this are decoded incrementally
+STREAM_CHUNK_BYTES = 64 * 1024
+PREFETCH_PAGES = 2           # decoded pages the fetch stage may run ahead of the writer
+PAGE_CONCURRENCY = 4         # parallel page fetches once the page count is known (config["page_concurrency"])
+MAX_PAGE_CONCURRENCY = 16
+EXTRACT_FAN_OUT = True       # one Celery subtask per source (chord) instead of one in-process run
+SOURCE_SOFT_TIME_LIMIT = 3600  # seconds one source subtask may run before it is cut off
+PROBE_TIMEOUT = 5            # seconds for the single request that probes an open circuit
+THROTTLED_RETRY_STATUSES = RETRY_STATUSES - {429}  # 429s are paced by the source throttle instead
+CHECKPOINT_MAX_AGE_SECONDS = 7 * 86400  # older resume points are ignored (walk restarts at page 1)
+FILE_SOURCE_TYPES = ("file", "manual")  # ingested from their file inbox instead of base_url
 
 # ------------------------------------------------------------------------------------
 # Helpers
 
-def _canon(o: Any) -> str:
-    """Canonical JSON string for deterministic hashing."""
-    return json.dumps(o, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-
-def _hash_content_only(item: Dict[str, Any]) -> bytes:
-    """Hash based purely on record content."""
-    return hashlib.sha256(_canon(item).encode("utf-8")).digest()
-
 def _as_list(payload: Any) -> List[Dict[str, Any]]:
     """
     Normalizes API responses into a list of dicts.
@@ -64,14 +188,24 @@ def _as_list(payload: Any) -> List[Dict[str, Any]]:
             return [payload]
     return []
 
-def _merge_page_param(base_url: str, page: int) -> str:
-    """Attach or replace the page query param."""
-    parts = urlsplit(base_url)
+def _merge_query_param(url: str, key: str, value: Any) -> str:
+    """Attach or replace a single query param."""
+    parts = urlsplit(url)
     qs = dict(parse_qsl(parts.query, keep_blank_values=True))
-    qs["page"] = str(page)
+    qs[key] = str(value)
     new_query = urlencode(qs, doseq=True)
     return urlunsplit((parts.scheme, parts.netloc, parts.path, new_query, parts.fragment))
 
+def _merge_page_param(base_url: str, page: int) -> str:
+    """Attach or replace the page query param."""
+    return _merge_query_param(base_url, "page", page)
+
+def _page_url(base_url: str, page: int, profile: Optional[Dict[str, Any]]) -> str:
+    """URL of page `page` of a walk without a next link (cursor APIs get no ?page on page 1)."""
+    if profile and profile["pagination"] == "cursor" and page == 1:
+        return base_url
+    return _merge_page_param(base_url, page)
+
 def _maybe_next_url(payload: Any) -> str:
     """Discover a next page URL in cursor style APIs."""
     if not isinstance(payload, dict):
@@ -92,323 +226,1515 @@ def _maybe_next_url(payload: Any) -> str:
     return ""
 
 def _progress(self, *, state: str = "PROGRESS", **meta):
-    """Emit progress updates for the frontend."""
+    """
+    Emit progress updates for the frontend.
+    task_id is passed explicitly so worker threads (which don't share the Celery
+    request context) report against the parent task.
+    """
     try:
-        self.update_state(state=state, meta=meta)
+        self.update_state(task_id=meta.get("task_id"), state=state, meta=meta)
     except Exception:
         pass
 
-# ------------------------------------------------------------------------------------
-# Task
+class _HostSlots:
+    """Counting semaphore whose limit can be raised while in use."""
 
-@celery.task(bind=True, name="app.tasks.extract_data_sources.extract_data_sources_task")
-def extract_data_sources_task(self):
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    def raise_to(self, limit: int) -> None:
+        with self._cond:
+            if limit > self.limit:
+                self.limit = limit
+                self._cond.notify_all()
+
+    def __enter__(self):
+        with self._cond:
+            while self._in_use >= self.limit:
+                self._cond.wait()
+            self._in_use += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify()
+        return False
+
+class _HostLimiter:
     """
-    Walk all DataSource.base_url links with pagination, normalize items, hash content,
-    and upsert into user_dataset_raw with global content hash dedupe.
+    In-flight request cap per URL host, shared by every worker thread in a run.
+    A source fetching pages in parallel may raise its host's cap to its
+    page_concurrency (allow()); rate limits still apply through the token buckets.
     """
-    task_id = self.request.id
-    debug_logger.info(f"[EXTRACT] START task_id={task_id} extract data from connected sources")
-    start_time = datetime.utcnow()
-    out = {"processed": 0, "inserted": 0, "duplicates": 0, "errors": []}
 
-    # Load sources
+    def __init__(self, per_host: int):
+        self.per_host = max(1, int(per_host))
+        self._lock = threading.Lock()
+        self._slots: Dict[str, _HostSlots] = {}
+
+    def _for(self, url: str) -> _HostSlots:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slots = self._slots.get(host)
+            if slots is None:
+                slots = self._slots[host] = _HostSlots(self.per_host)
+            return slots
+
+    def allow(self, url: str, limit: int) -> None:
+        self._for(url).raise_to(limit)
+
+    @contextmanager
+    def slot(self, url: str):
+        with self._for(url):
+            yield
+
+class _ExtractRun:
+    """
+    Shared state for one extract run: the `out` summary, the host limiter, the
+    pooled HTTP client and the progress emitter. Counters are only touched under
+    `lock` since sources run on separate threads.
+    """
+
+    def __init__(self, task, task_id: str, total_sources: int, per_host: int, max_retries: int,
+                 hash_backend: Optional[str] = None, record: bool = False, offline: bool = False):
+        self.task = task
+        self.task_id = task_id
+        self.total_sources = total_sources
+        self.hosts = _HostLimiter(per_host)
+        self.http = HttpClient(
+            timeout=HTTP_TIMEOUT,
+            max_retries=max_retries,
+            pool_maxsize=max(self.hosts.per_host, MAX_PAGE_CONCURRENCY),
+        )
+        self.hasher = get_hasher(hash_backend or DEFAULT_HASH_BACKEND)
+        self.host_buckets = HostBuckets()
+        self.offline = offline
+        self.record = record and not offline
+        self.responses = ResponseCache(current_app.config["RESPONSE_CACHE_ROOT"]) if record or offline else None
+        self.lock = threading.Lock()
+        self.out: Dict[str, Any] = self.empty_out()
+
+    @staticmethod
+    def empty_out() -> Dict[str, Any]:
+        return {
+            "processed": 0, "inserted": 0, "duplicates": 0, "failed": 0, "prechecked": 0, "errors": [],
+            "page_cache_hits": 0, "page_cache_misses": 0,
+            "stages": {"fetch_ms": 0, "fetch_blocked_ms": 0, "process_ms": 0, "process_wait_ms": 0},
+            "throttle": {"throttle_wait_ms": 0, "pauses": 0, "rate_limited": 0},
+            "circuit": {"skipped": 0, "probed": 0, "probe_failed": 0, "opened": 0},
+            "files": {"ingested": 0, "failed": 0, "records": 0, "skipped_lines": 0},
+            "checkpoint": {"resumed": 0, "saved": 0, "kept": 0},
+            "profile": {"used": 0, "detected": 0, "stale": 0},
+            "pages": {"parallel": 0, "stored": 0},
+            "response_cache": empty_response_cache_stats(),
+        }
+
+    def start_source(self) -> None:
+        with self.lock:
+            self.out["processed"] += 1
+
+    def add(self, group: Optional[str] = None, **deltas: float) -> None:
+        """
+        Add deltas to the run's counters: top-level ones (inserted, page_cache_hits, ...)
+        or, with group, those of one nested section (stages, throttle, circuit, ...).
+        """
+        with self.lock:
+            counters = self.out if group is None else self.out[group]
+            for k, v in deltas.items():
+                counters[k] = counters.get(k, 0) + int(v)
+
+    def throttle_for(self, src: Dict[str, Any], url: str) -> SourceThrottle:
+        """Request gate for src: its own bucket plus the run-wide bucket of url's host."""
+        limits = parse_rate_limit_config(src["config"])
+        host = urlsplit(url).netloc.lower()
+        return SourceThrottle(
+            TokenBucket(limits["per_second"], limits["burst"]),
+            self.host_buckets.get(host, limits["host_per_second"], limits["host_burst"]),
+            max_pause=limits["max_pause"],
+            max_rate_limited=int(limits["max_rate_limited"]),
+        )
+
+    def add_error(self, msg: str) -> None:
+        with self.lock:
+            self.out["errors"].append(msg)
+
+    def progress(self, **meta) -> None:
+        with self.lock:
+            processed = self.out["processed"]
+            inserted = self.out["inserted"]
+            duplicates = self.out["duplicates"]
+            cache_hits = self.out["page_cache_hits"]
+            cache_misses = self.out["page_cache_misses"]
+        _progress(
+            self.task,
+            percent=int(processed * 100 / max(self.total_sources, 1)),
+            processed=processed,
+            total=self.total_sources,
+            inserted=inserted,
+            duplicates=duplicates,
+            page_cache_hits=cache_hits,
+            page_cache_misses=cache_misses,
+            task_id=self.task_id,
+            **meta,
+        )
+
+def _source_snapshot(src: DataSource) -> Dict[str, Any]:
+    """Plain-dict copy of a DataSource so it can cross into worker threads."""
+    config = getattr(src, "config", None)
+    return {
+        "id": getattr(src, "id", None),
+        "name": getattr(src, "name", None),
+        "source_type": getattr(src, "source_type", None),
+        "user_id": getattr(src, "user_id", None),
+        "base_url": getattr(src, "base_url", None),
+        "config": dict(config) if isinstance(config, dict) else {},
+        "hash_exclude": compile_exclusions(config.get("hash_exclude")) if isinstance(config, dict) else None,
+    }
+
+def _url_hash(url: str) -> bytes:
+    return hashlib.sha256(url.encode("utf-8")).digest()
+
+def _load_page_validators(source_id: int) -> Dict[bytes, Dict[str, Optional[str]]]:
+    """All stored validators for a source, keyed by URL hash (one query per source)."""
+    rows = (
+        db.session.query(
+            DataSourcePageCache.url_hash,
+            DataSourcePageCache.etag,
+            DataSourcePageCache.last_modified,
+        )
+        .filter(DataSourcePageCache.source_id == source_id)
+        .all()
+    )
+    return {bytes(h): {"etag": etag, "last_modified": lm} for h, etag, lm in rows}
+
+def _conditional_headers(validator: Optional[Dict[str, Optional[str]]]) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    if validator:
+        if validator.get("etag"):
+            headers["If-None-Match"] = validator["etag"]
+        if validator.get("last_modified"):
+            headers["If-Modified-Since"] = validator["last_modified"]
+    return headers
+
+def _save_page_validator(source_id: int, url: str, r) -> None:
+    """Persist ETag / Last-Modified from a fully stored page. Best effort."""
+    etag = r.headers.get("ETag")
+    last_modified = r.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
     try:
-        sources = db.session.query(DataSource).all()
-        debug_logger.info(f"[EXTRACT] Loaded {len(sources)} data sources from database")
+        stmt = mysql_insert(DataSourcePageCache.__table__).values(
+            source_id=source_id,
+            url_hash=_url_hash(url),
+            url=url,
+            etag=(etag or None) and etag[:512],
+            last_modified=(last_modified or None) and last_modified[:64],
+            updated_at=datetime.utcnow(),
+        )
+        stmt = stmt.on_duplicate_key_update(
+            etag=stmt.inserted.etag,
+            last_modified=stmt.inserted.last_modified,
+            updated_at=stmt.inserted.updated_at,
+        )
+        db.session.execute(stmt)
+        db.session.commit()
     except Exception as e:
-        debug_logger.error(f"[EXTRACT] FAILED to query data sources: {e}")
-        return {"processed": 0, "inserted": 0, "duplicates": 0, "errors": [f"sources_query_failed: {e}"]}
+        db.session.rollback()
+        debug_logger.warning(f"[EXTRACT] Failed to store page validators source id={source_id} url={url}: {e}")
 
-    total_sources = len(sources)
+def _incremental_config(config: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """Validated config["incremental"] ({"param", "field"}) or None when not enabled."""
+    inc = config.get("incremental")
+    if not isinstance(inc, dict):
+        return None
+    param = inc.get("param")
+    field = inc.get("field")
+    if not (isinstance(param, str) and param and isinstance(field, str) and field):
+        return None
+    return {"param": param, "field": field}
 
-    # Initial progress tick
-    _progress(
-        self,
-        percent=0,
-        processed=0,
-        total=total_sources,
-        inserted=0,
-        duplicates=0,
-        message="Starting ingestion",
-        task_id=task_id,
+def _field_value(item: Dict[str, Any], path: str) -> Any:
+    """Read a (dotted) field from an item; None when any hop is missing."""
+    cur: Any = item
+    for part in path.split("."):
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(part)
+    return cur
+
+def _watermark_key(v: Any):
+    """
+    Sort key for watermark values. Numbers (and numeric strings: epoch seconds,
+    integer cursors) compare numerically; everything else (ISO timestamps) as text.
+    """
+    if isinstance(v, bool):
+        return (1, str(v))
+    if isinstance(v, (int, float)):
+        return (0, float(v))
+    s = str(v).strip()
+    try:
+        return (0, float(s))
+    except ValueError:
+        return (1, s)
+
+def _max_watermark(current: Optional[str], candidate: Any) -> Optional[str]:
+    if candidate is None or candidate == "" or isinstance(candidate, (dict, list)):
+        return current
+    if current is None or _watermark_key(candidate) > _watermark_key(current):
+        return str(candidate)
+    return current
+
+def _load_watermark(source_id: int) -> Optional[str]:
+    state = db.session.get(DataSourceState, source_id)
+    return state.watermark if state is not None else None
+
+def _save_watermark(source_id: int, watermark: str) -> None:
+    now_ts = datetime.utcnow()
+    stmt = mysql_insert(DataSourceState.__table__).values(
+        source_id=source_id,
+        watermark=watermark[:255],
+        watermark_updated_at=now_ts,
+        updated_at=now_ts,
     )
+    stmt = stmt.on_duplicate_key_update(
+        watermark=stmt.inserted.watermark,
+        watermark_updated_at=stmt.inserted.watermark_updated_at,
+        updated_at=stmt.inserted.updated_at,
+    )
+    db.session.execute(stmt)
+
+def _load_checkpoint(source_id: int, base_url: str) -> Optional[Dict[str, Any]]:
+    """
+    Resume point left by an unfinished walk of base_url, or None. Checkpoints written
+    for another URL (config / watermark changed) or older than CHECKPOINT_MAX_AGE_SECONDS
+    are ignored.
+    """
+    state = db.session.get(DataSourceState, source_id)
+    if state is None or not state.checkpoint_page:
+        return None
+    if bytes(state.checkpoint_url_hash or b"") != _url_hash(base_url):
+        debug_logger.info(f"[EXTRACT] Ignoring checkpoint for source id={source_id}: base URL changed")
+        return None
+    age = (datetime.utcnow() - state.checkpoint_at).total_seconds() if state.checkpoint_at else None
+    if age is None or age > CHECKPOINT_MAX_AGE_SECONDS:
+        debug_logger.info(f"[EXTRACT] Ignoring stale checkpoint for source id={source_id} (age={age})")
+        return None
+    return {
+        "page": state.checkpoint_page,
+        "next_url": state.checkpoint_next_url or "",
+        "run_id": state.checkpoint_run_id,
+        "watermark": state.checkpoint_watermark,
+    }
+
+def _upsert_checkpoint(source_id: int, **values) -> None:
+    values["updated_at"] = datetime.utcnow()
+    stmt = mysql_insert(DataSourceState.__table__).values(source_id=source_id, **values)
+    stmt = stmt.on_duplicate_key_update(**{k: getattr(stmt.inserted, k) for k in values})
+    db.session.execute(stmt)
 
-    for src in sources:
-        out["processed"] += 1
-        source_id = getattr(src, "id", None)
-        source_name = getattr(src, "name", None)
-        source_type = getattr(src, "source_type", None)
-        user_id = getattr(src, "user_id", None)
+def _save_checkpoint(source_id: int, run_id: str, base_url: str, next_page: int, next_url: str,
+                     watermark: Optional[str]) -> bool:
+    """Record where the walk continues after a committed page. Best effort; True if stored."""
+    try:
+        _upsert_checkpoint(
+            source_id,
+            checkpoint_page=next_page,
+            checkpoint_next_url=next_url or None,
+            checkpoint_run_id=(run_id or "")[:64] or None,
+            checkpoint_url_hash=_url_hash(base_url),
+            checkpoint_watermark=watermark[:255] if watermark else None,
+            checkpoint_at=datetime.utcnow(),
+        )
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        debug_logger.warning(f"[EXTRACT] Failed to store checkpoint source id={source_id} page={next_page}: {e}")
+        return False
+
+def _clear_checkpoint(source_id: int) -> None:
+    """Walk completed: drop the resume point. Caller commits."""
+    _upsert_checkpoint(
+        source_id,
+        checkpoint_page=None,
+        checkpoint_next_url=None,
+        checkpoint_run_id=None,
+        checkpoint_url_hash=None,
+        checkpoint_watermark=None,
+        checkpoint_at=None,
+    )
+
+def _should_stream(r, config: Dict[str, Any]) -> bool:
+    """
+    config["stream"]: true / false forces the mode; default "auto" streams bodies
+    larger than STREAM_THRESHOLD_BYTES or of unknown size (chunked transfer).
+    """
+    mode = config.get("stream", "auto")
+    if mode is True or mode is False:
+        return mode
+    try:
+        return int(r.headers.get("Content-Length")) > STREAM_THRESHOLD_BYTES
+    except (TypeError, ValueError):
+        return True
 
+class _Page:
+    """
+    Items of one fetched page. Small bodies are decoded in one go (r.json());
+    streamed bodies are decoded item by item from the socket, so `items` can only
+    be iterated once and next_url() / items_key() / item_count() are only valid
+    after it has been exhausted.
+
+    With a known envelope (extraction profile) buffered pages read the items straight
+    from it; `mismatch` is set when the payload doesn't have that shape.
+    """
+
+    def __init__(self, r, stream: bool, envelope: Optional[str] = None, chunks: Optional[Iterator[bytes]] = None):
+        self.streamed = stream
+        self.mismatch = False
+        if stream:
+            self._stream = StreamedPage(chunks if chunks is not None else r.iter_content(STREAM_CHUNK_BYTES))
+            self.items = self._stream
+        else:
+            self._payload = r.json()
+            items = extract_profile.items_at(self._payload, envelope) if envelope is not None else None
+            self._items_key = envelope
+            if items is None:
+                self.mismatch = envelope is not None
+                items = _as_list(self._payload)
+                self._items_key = extract_profile.detect_envelope(self._payload)
+            self.items = items
+
+    def next_url(self) -> str:
+        return _maybe_next_url(self._stream.envelope if self.streamed else self._payload)
+
+    def items_key(self) -> Optional[str]:
+        return self._stream.items_key if self.streamed else self._items_key
+
+    def item_count(self) -> int:
+        return self._stream.count if self.streamed else len(self.items)
+
+    def envelope_fields(self) -> Dict[str, Any]:
+        """Top-level keys next to the items (totals, links, ...); {} for bare arrays / single records."""
+        if self.streamed:
+            return self._stream.envelope if self._stream.items_key not in ("", "$record") else {}
+        if isinstance(self._payload, dict) and self._items_key not in (None, "", "$record"):
+            return self._payload
+        return {}
+
+def _flush_rows(run: _ExtractRun, src: Dict[str, Any], page: int, rows: List[Dict[str, Any]], tally: Dict[str, int],
+                file_name: Optional[str] = None) -> int:
+    """Upsert one batch of a page's (or file's) new rows; returns how many rows were rejected."""
+    source_id = src["id"]
+    where = f"file {file_name}" if file_name else f"page {page}"
+    debug_logger.info(f"[EXTRACT] Upserting {len(rows)} records from {where} source id={source_id}")
+    if src["config"].get("storage") == "page":
+        res = upsert_raw_page(rows)
+        run.add("pages", stored=res["pages"])
+    else:
+        res = upsert_raw_rows(
+            rows,
+            batch_size=BATCH_SIZE,
+            precheck=src["config"].get("hash_precheck", True) is not False,
+        )
+    tally["inserted"] += res["inserted"]
+    tally["duplicates"] += res["duplicates"]
+    tally["failed"] += res["failed"]
+    tally["written"] += len(rows)
+    run.add(
+        inserted=res["inserted"],
+        duplicates=res["duplicates"],
+        failed=res["failed"],
+        prechecked=res["prechecked"],
+    )
+    for err in res["errors"]:
+        run.add_error(f"source_id={source_id} {where.replace(' ', '=', 1)} err={err}")
+    meta = {"file": file_name} if file_name else {"page": page}
+    run.progress(
+        source_id=source_id,
+        source_name=src["name"],
+        fetched_for_source=tally["written"],
+        message=f"Upserted {len(rows)} records on {where}",
+        **meta,
+    )
+    return res["failed"]
+
+class _FetchedPage:
+    """One unit handed from the fetch stage to the write stage."""
+
+    def __init__(self, page: int, url: str, response=None, pg: Optional[_Page] = None,
+                 not_modified: bool = False, error: Optional[BaseException] = None):
+        self.page = page
+        self.url = url
+        self.response = response
+        self.pg = pg
+        self.not_modified = not_modified
+        self.error = error
+        self.consumed = threading.Event()
+
+    def release(self) -> None:
+        """Writer is done with the page: free the socket and unblock the fetcher."""
+        if self.response is not None:
+            self.response.close()
+        self.consumed.set()
+
+def _put_page(pages: "queue.Queue", item, stop: threading.Event, timings: Dict[str, float]) -> bool:
+    """Blocking put that gives up once the writer has stopped. False if abandoned."""
+    t0 = time.monotonic()
+    try:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    finally:
+        timings["fetch_blocked_ms"] += (time.monotonic() - t0) * 1000
+
+def _drain_pages(pages: "queue.Queue") -> None:
+    while True:
+        try:
+            item = pages.get_nowait()
+        except queue.Empty:
+            return
+        if item is not None:
+            item.release()
+
+def _cache_ignore(src: Dict[str, Any]) -> Tuple[str, ...]:
+    """Query params left out of response cache keys: the incremental watermark param."""
+    inc = _incremental_config(src["config"])
+    return (inc["param"],) if inc else ()
+
+def _throttled_get(run: _ExtractRun, src: Dict[str, Any], throttle: SourceThrottle, api_url: str,
+                   headers: Dict[str, str]) -> requests.Response:
+    """
+    GET one page under the source's throttle. The token / pause wait happens before
+    the host slot is taken, so a paused source never blocks other sources on that
+    host. A 429 pauses the source for the server-requested time and retries (up to
+    throttle.max_rate_limited); a wait longer than max_pause returns the 429.
+    """
+    if run.offline:
+        r = run.responses.load(src["id"], api_url, _cache_ignore(src))
+        if r is None:
+            raise ResponseCacheMiss(f"no recorded response for {api_url}")
+        return r
+    limited = 0
+    while True:
+        throttle.wait()
+        with run.hosts.slot(api_url):
+            r = run.http.get(
+                api_url,
+                headers=headers or None,
+                stream=True,
+                max_retries=src["config"].get("max_retries"),
+                retry_statuses=THROTTLED_RETRY_STATUSES,
+            )
+        pause = throttle.observe(r)
+        if pause is not None:
+            debug_logger.info(
+                f"[EXTRACT] Pausing source id={src['id']} for {pause:.1f}s "
+                f"(HTTP {r.status_code}, rate limit hint from {api_url})"
+            )
+        if r.status_code != 429 or pause is None or limited >= throttle.max_rate_limited:
+            return r
+        limited += 1
+        debug_logger.warning(
+            f"[EXTRACT] Rate limited (429) on {api_url}; retry {limited}/{throttle.max_rate_limited} "
+            f"after pause for source id={src['id']}"
+        )
+        r.close()
+
+def _profile_mismatch(profile: Dict[str, Any], pg: _Page, r, item_count: int, next_url: str, first: bool) -> bool:
+    if pg.mismatch or (item_count and pg.items_key() != profile["envelope"]):
+        return True
+    if profile["pagination"] == "page" and next_url:
+        return True
+    if first and profile.get("total_header") and extract_profile.total_pages(profile, r.headers) is None:
+        return True
+    return False
+
+def _profile_last_page(profile: Dict[str, Any], r, page: int, item_count: int, next_url: str) -> bool:
+    """Whether the profile says there is nothing after this page (saves the empty trailing request)."""
+    if profile["pagination"] == "cursor":
+        return not next_url
+    last = extract_profile.total_pages(profile, r.headers)
+    if last is not None:
+        return page >= last
+    size = profile.get("page_size") if profile.get("page_size_param") else None
+    return bool(size) and item_count < size
+
+def _fetch_page(run: _ExtractRun, src: Dict[str, Any], throttle: SourceThrottle, page: int, api_url: str,
+                validators: Dict[bytes, Dict[str, Optional[str]]], conditional: bool, timings: Dict[str, float],
+                walk: Dict[str, Any], allow_stream: bool = True) -> _FetchedPage:
+    """GET and decode one page. Streamed pages keep their response open for the writer."""
+    profile = walk.get("profile")
+    t_fetch = time.monotonic()
+    try:
+        headers = _conditional_headers(validators.get(_url_hash(api_url))) if conditional else {}
+        r = _throttled_get(run, src, throttle, api_url, headers)
+
+        if r.status_code == 304:
+            r.close()
+            run.add(page_cache_hits=1)
+            return _FetchedPage(page, api_url, not_modified=True)
+        if conditional:
+            run.add(page_cache_misses=1)
+
+        debug_logger.debug(
+            f"[EXTRACT] HTTP {r.status_code} content_length={r.headers.get('Content-Length')} url={api_url}"
+        )
+        r.raise_for_status()
+        stream = allow_stream and _should_stream(r, src["config"])
+        chunks = None
+        if stream and run.record:
+            chunks = run.responses.tee(src["id"], api_url, r, r.iter_content(STREAM_CHUNK_BYTES), _cache_ignore(src))
+        pg = _Page(r, stream, profile["envelope"] if profile else None, chunks)
+        if not pg.streamed:
+            if run.record:
+                run.responses.store(src["id"], api_url, r, r.content, _cache_ignore(src))
+            r.close()
+        return _FetchedPage(page, api_url, response=r, pg=pg)
+
+    except requests.exceptions.Timeout:
+        debug_logger.error(f"[EXTRACT] TIMEOUT fetching {api_url} after {HTTP_TIMEOUT}s")
+        raise
+    except requests.exceptions.RequestException as req_e:
+        debug_logger.error(f"[EXTRACT] HTTP ERROR fetching {api_url}: {req_e}")
+        raise
+    except (ValueError, json.JSONDecodeError) as json_e:
+        debug_logger.error(f"[EXTRACT] JSON DECODE ERROR from {api_url}: {json_e}")
+        raise
+    finally:
+        with walk["lock"]:
+            timings["fetch_ms"] += (time.monotonic() - t_fetch) * 1000
+
+def _observe_page(walk: Dict[str, Any], fetched: _FetchedPage, first: bool) -> Tuple[int, str]:
+    """Feed profile detection and drop a profile the page no longer matches. Returns (item_count, next_url)."""
+    pg, r = fetched.pg, fetched.response
+    item_count = pg.item_count()
+    next_url = pg.next_url()
+    if walk.get("observer") is not None:
+        walk["observer"].observe(r.headers, pg.items_key(), item_count, next_url)
+    profile = walk.get("profile")
+    if profile and _profile_mismatch(profile, pg, r, item_count, next_url, first):
         debug_logger.info(
-            f"[EXTRACT] Processing source id={source_id} name='{source_name}' type={source_type} user_id={user_id}"
+            f"[EXTRACT] Extraction profile no longer matches ({fetched.url}); re-detecting"
+        )
+        walk["stale"] = True
+        walk["profile"] = None
+    return item_count, next_url
+
+def _page_concurrency(src: Dict[str, Any]) -> int:
+    try:
+        n = int(src["config"].get("page_concurrency", PAGE_CONCURRENCY))
+    except (TypeError, ValueError):
+        n = PAGE_CONCURRENCY
+    return min(max(n, 1), MAX_PAGE_CONCURRENCY)
+
+def _fetch_pages_parallel(run: _ExtractRun, src: Dict[str, Any], base_url: str,
+                          validators: Dict[bytes, Dict[str, Optional[str]]], conditional: bool,
+                          throttle: SourceThrottle, pages: "queue.Queue", stop: threading.Event,
+                          timings: Dict[str, float], walk: Dict[str, Any], first: int, last: int,
+                          concurrency: int) -> Optional[bool]:
+    """
+    Fetch pages first..last on `concurrency` threads (each request still goes through the
+    source throttle and the host slots) and queue them IN PAGE ORDER, so the writer sees
+    exactly what a serial walk would. At most 2 * concurrency pages are in flight or
+    waiting, which bounds memory. Returns True if every page was queued, False if the
+    walk stopped early (writer stopped, 304, empty page), None after queueing an error.
+    """
+    source_id = src["id"]
+    window = 2 * concurrency
+    debug_logger.info(
+        f"[EXTRACT] Fetching pages {first}..{last} with {concurrency} threads for source id={source_id}"
+    )
+    run.hosts.allow(base_url, concurrency)
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"extract-page-{source_id}")
+    futures: Dict[int, Any] = {}
+    nxt = first
+    try:
+        for page in range(first, last + 1):
+            while nxt <= last and nxt < page + window:
+                futures[nxt] = pool.submit(
+                    _fetch_page, run, src, throttle, nxt, _merge_page_param(base_url, nxt),
+                    validators, conditional, timings, walk, False,
+                )
+                nxt += 1
+            future = futures.pop(page)
+            while True:
+                try:
+                    fetched = future.result(timeout=0.5)
+                    break
+                except FuturesTimeout:
+                    if stop.is_set():
+                        return False
+                except Exception as e:
+                    _put_page(pages, _FetchedPage(page, _merge_page_param(base_url, page), error=e), stop, timings)
+                    return None
+            if fetched.not_modified:
+                _put_page(pages, fetched, stop, timings)
+                return False
+            item_count, _ = _observe_page(walk, fetched, first=False)
+            if not _put_page(pages, fetched, stop, timings):
+                fetched.release()
+                return False
+            if not item_count:
+                return False
+        return True
+    finally:
+        for future in futures.values():
+            future.cancel()
+        pool.shutdown(wait=True)
+        run.add("pages", parallel=nxt - first)
+
+def _fetch_pages(run: _ExtractRun, src: Dict[str, Any], base_url: str, validators: Dict[bytes, Dict[str, Optional[str]]],
+                 conditional: bool, throttle: SourceThrottle, pages: "queue.Queue", stop: threading.Event,
+                 timings: Dict[str, float], walk: Dict[str, Any], start_page: int = 1, start_next_url: str = "") -> None:
+    """
+    Fetch stage: walk pages (page param or cursor next_url) and queue them decoded,
+    starting at start_page / start_next_url (a checkpoint) or page 1.
+    Stops on MAX_PAGES, a 304, an empty buffered page, the last page according to the
+    extraction profile, an error, or when the writer sets `stop`. Always ends the
+    stream with a None sentinel (unless abandoned).
+
+    When the first page of a page-numbered walk reports the total page count (header
+    or body), the remaining pages are fetched concurrently (_fetch_pages_parallel)
+    once the writer has accepted that first page.
+
+    `walk` is shared with the writer: walk["profile"] (fast path, dropped once a page
+    stops matching it; walk["stale"] is then set), walk["observer"] (profile detection),
+    walk["proceed"] (writer kept the first page) and walk["complete"] (pagination ended
+    on its own; read after the sentinel).
+    """
+    source_id = src["id"]
+    page = start_page
+    next_url = start_next_url
+    api_url = base_url
+    concurrency = _page_concurrency(src)
+    try:
+        while page < start_page + MAX_PAGES and not stop.is_set():
+            api_url = next_url or _page_url(base_url, page, walk.get("profile"))
+            debug_logger.info(f"[EXTRACT] Fetching page {page} from {api_url} for source id={source_id}")
+            debug_logger.debug(f"[EXTRACT] Using {'cursor next_url' if next_url else 'page parameter'} pagination")
+
+            fetched = _fetch_page(run, src, throttle, page, api_url, validators, conditional, timings, walk)
+            if fetched.not_modified:
+                _put_page(pages, fetched, stop, timings)
+                break
+            pg = fetched.pg
+            if not _put_page(pages, fetched, stop, timings):
+                fetched.release()
+                return
+
+            if pg.streamed:
+                # next_url is only known once the writer has drained the stream
+                while not fetched.consumed.wait(0.5):
+                    if stop.is_set():
+                        return
+
+            item_count, next_url = _observe_page(walk, fetched, first=page == start_page)
+            profile = walk.get("profile")
+
+            if not item_count and not pg.streamed:
+                break
+            if profile and _profile_last_page(profile, fetched.response, page, item_count, next_url):
+                debug_logger.debug(f"[EXTRACT] Last page {page} per extraction profile for source id={source_id}")
+                walk["complete"] = True
+                break
+
+            # Known page count on a page-numbered walk: fetch the rest concurrently
+            if page == start_page and concurrency > 1 and not next_url and not pg.streamed and item_count:
+                last = extract_profile.known_total_pages(fetched.response.headers, pg.envelope_fields(), item_count)
+                budget_last = start_page + MAX_PAGES - 1
+                if last is not None and last > page:
+                    # Let the writer look at this page first: if it stops here, nothing more is fetched
+                    while not walk["proceed"].wait(0.5):
+                        if stop.is_set():
+                            return
+                    done = _fetch_pages_parallel(
+                        run, src, base_url, validators, conditional, throttle, pages, stop, timings, walk,
+                        page + 1, min(last, budget_last), concurrency,
+                    )
+                    if done is None:
+                        return
+                    walk["complete"] = bool(done) and last <= budget_last
+                    break
+            page += 1
+    except Exception as e:
+        _put_page(pages, _FetchedPage(page, api_url, error=e), stop, timings)
+        return
+
+    _put_page(pages, None, stop, timings)
+
+# ------------------------------------------------------------------------------------
+# Source health
+
+class _ProbeFailed(Exception):
+    """The single probe request for an open circuit failed."""
+
+def _load_health(source_id: int) -> Optional[Dict[str, Any]]:
+    """Circuit state for the source; None (no breaker this run) if it cannot be read."""
+    try:
+        return source_health.load_health(source_id)
+    except Exception as e:
+        db.session.rollback()
+        debug_logger.warning(f"[EXTRACT] Could not load health for source id={source_id}: {e}")
+        return None
+
+def _probe_source(run: _ExtractRun, src: Dict[str, Any], base_url: str) -> Optional[str]:
+    """
+    One cheap request against the URL the walk starts from (its stored extraction
+    profile applied): short timeout, no retries, body never read. Returns an error
+    string, or None if the source answered.
+    """
+    profile = extract_profile.load_profile(src["config"]) if extract_profile.profiles_enabled(src["config"]) else None
+    probe_url = _page_url(base_url, 1, profile)
+    try:
+        with run.hosts.slot(probe_url):
+            r = run.http.get(probe_url, stream=True, max_retries=0, timeout=PROBE_TIMEOUT)
+        try:
+            if r.status_code >= 400:
+                return f"probe HTTP {r.status_code} from {probe_url}"
+        finally:
+            r.close()
+    except requests.exceptions.RequestException as e:
+        return f"probe {type(e).__name__} on {probe_url}: {e}"
+    return None
+
+def _record_source_failure(run: _ExtractRun, source_id: int, health: Dict[str, Any], error: Exception) -> None:
+    """Count the failed run against the source's circuit (best effort, own commit)."""
+    try:
+        reason = str(error) if isinstance(error, _ProbeFailed) else f"{type(error).__name__}: {error}"
+        new = source_health.record_failure(source_id, health, reason)
+        db.session.commit()
+    except Exception as health_e:
+        db.session.rollback()
+        debug_logger.error(f"[EXTRACT] Could not record failure for source id={source_id}: {health_e}")
+        return
+    if new["circuit_state"] == source_health.OPEN and health["circuit_state"] != source_health.OPEN:
+        run.add("circuit", opened=1)
+        debug_logger.warning(
+            f"[EXTRACT] Circuit OPEN for source id={source_id} after "
+            f"{new['consecutive_failures']} consecutive failures"
         )
 
+# ------------------------------------------------------------------------------------
+# File sources
+
+def _ingest_file(run: _ExtractRun, src: Dict[str, Any], path: str, name: str,
+                 seen_hashes: set, tally: Dict[str, int]) -> int:
+    """Stream one claimed file into user_dataset_raw. Returns how many rows were rejected."""
+    source_id = src["id"]
+    failed = 0
+    rows: List[Dict[str, Any]] = []
+    with file_ingest.open_records(path, src["config"].get("format")) as (records, content_type, stats):
+        for it in records:
+            content_hash = run.hasher.digest(it, src["hash_exclude"])
+            if content_hash in seen_hashes:
+                continue
+            seen_hashes.add(content_hash)
+            rows.append({
+                "user_id": src["user_id"],
+                "source_id": source_id,
+                "record_time": datetime.utcnow(),  # metadata only
+                "content": it,
+                "content_hash": content_hash,
+                "content_type": content_type,
+                "status": "ok",
+                "error_message": None,
+            })
+            if len(rows) >= BATCH_SIZE:
+                failed += _flush_rows(run, src, 0, rows, tally, file_name=name)
+                rows = []
+        if rows:
+            failed += _flush_rows(run, src, 0, rows, tally, file_name=name)
+
+    run.add("files", records=stats.records, skipped_lines=stats.skipped)
+    for err in stats.errors:
+        run.add_error(f"source_id={source_id} file={name} err={err}")
+    if stats.skipped > len(stats.errors):
+        run.add_error(f"source_id={source_id} file={name} err={stats.skipped - len(stats.errors)} more bad lines")
+    debug_logger.info(
+        f"[EXTRACT] File {name} complete for source id={source_id}: records={stats.records} "
+        f"skipped={stats.skipped} rejected={failed}"
+    )
+    return failed
+
+def _extract_files(run: _ExtractRun, src: Dict[str, Any]) -> None:
+    """Ingest every pending file in a 'file' / 'manual' source's inbox."""
+    source_id = src["id"]
+    source_name = src["name"]
+    inbox = file_ingest.source_inbox(current_app.config["FILE_INGEST_ROOT"], src["user_id"], source_id)
+    tally = {"inserted": 0, "duplicates": 0, "failed": 0, "written": 0}
+    seen_hashes: set[bytes] = set()
+
+    try:
+        names = file_ingest.pending_files(inbox)
+    except OSError as e:
+        msg = f"source_id={source_id} err=inbox_unreadable: {e}"
+        debug_logger.error(f"[EXTRACT] {msg}")
+        run.add_error(msg)
+        return
+    if not names:
+        debug_logger.info(f"[EXTRACT] No pending files for source id={source_id} inbox={inbox}")
+    for name in names:
+        claimed = file_ingest.claim(inbox, name)
+        if claimed is None:
+            continue  # another run picked it up
         try:
-            page = 1
-            total_fetched_for_source = 0
-            per_source_inserted = 0
-            per_source_duplicates = 0
-            now = datetime.utcnow()
-            seen_hashes: set[bytes] = set()
-
-            base_url = getattr(src, "base_url", None)
-            if not base_url:
-                msg = f"source_id={source_id} err=missing_base_url"
-                debug_logger.warning(f"[EXTRACT] SKIP {msg}")
-                out["errors"].append(msg)
-                _progress(
-                    self,
-                    percent=int(out["processed"] * 100 / max(total_sources, 1)),
-                    processed=out["processed"],
-                    total=total_sources,
+            _ingest_file(run, src, claimed, name, seen_hashes, tally)
+        except Exception as e:
+            db.session.rollback()
+            debug_logger.exception(f"[EXTRACT] Failed to ingest file {name} for source id={source_id}: {e}")
+            run.add_error(f"source_id={source_id} file={name} err={e}")
+            run.add("files", failed=1)
+            file_ingest.finish(inbox, claimed, ok=False)
+            continue
+        run.add("files", ingested=1)
+        file_ingest.finish(inbox, claimed, ok=True)
+        run.progress(
+            source_id=source_id,
+            source_name=source_name,
+            file=name,
+            fetched_for_source=tally["written"],
+            message=f"Ingested file {name}",
+        )
+
+    try:
+        ds = db.session.get(DataSource, source_id)
+        if ds is not None and names:
+            ds.last_updated = datetime.utcnow()
+        db.session.commit()
+    except Exception as stamp_e:
+        db.session.rollback()
+        msg = f"source_id={source_id} err=last_updated_commit_failed: {stamp_e}"
+        debug_logger.error(f"[EXTRACT] {msg}")
+        run.add_error(msg)
+
+    run.progress(
+        source_id=source_id,
+        source_name=source_name,
+        message="Source complete",
+    )
+
+# ------------------------------------------------------------------------------------
+# Per source extraction
+
+def _extract_source(app, run: _ExtractRun, src: Dict[str, Any]) -> None:
+    """
+    Walk one source's pages and upsert its items. Runs on a worker thread inside
+    its own app context; errors are recorded on the run, never raised.
+    """
+    with app.app_context():
+        _extract_source_in_context(run, src)
+
+def _extract_source_in_context(run: _ExtractRun, src: Dict[str, Any]) -> None:
+    run.start_source()
+    source_id = src["id"]
+    source_name = src["name"]
+    source_type = src["source_type"]
+    user_id = src["user_id"]
+
+    debug_logger.info(
+        f"[EXTRACT] Processing source id={source_id} name='{source_name}' type={source_type} user_id={user_id}"
+    )
+
+    if source_type in FILE_SOURCE_TYPES:
+        _extract_files(run, src)
+        return
+
+    health: Optional[Dict[str, Any]] = None
+    try:
+        pages_done = 0
+        total_fetched_for_source = 0
+        tally = {"inserted": 0, "duplicates": 0, "failed": 0, "written": 0}
+        now = datetime.utcnow()
+        seen_hashes: set[bytes] = set()
+
+        base_url = src["base_url"]
+        if not base_url:
+            msg = f"source_id={source_id} err=missing_base_url"
+            debug_logger.warning(f"[EXTRACT] SKIP {msg}")
+            run.add_error(msg)
+            run.progress(
+                source_id=source_id,
+                source_name=source_name,
+                message="Skipped source missing base_url",
+            )
+            return
+
+        # Circuit breaker: chronically failing sources are skipped, then probed
+        health = None if run.offline else _load_health(source_id)
+        if health is not None and src["config"].get("circuit_breaker", True) is not False:
+            decision, retry_at = source_health.circuit_gate(health)
+            if decision == source_health.SKIP:
+                debug_logger.warning(
+                    f"[EXTRACT] Circuit open for source id={source_id} "
+                    f"(consecutive_failures={health['consecutive_failures']}); skipping until {retry_at}"
+                )
+                run.add("circuit", skipped=1)
+                run.progress(
                     source_id=source_id,
                     source_name=source_name,
-                    inserted=out["inserted"],
-                    duplicates=out["duplicates"],
-                    message="Skipped source missing base_url",
-                    task_id=task_id,
+                    message=f"Circuit open; skipped until {retry_at.isoformat()}",
                 )
-                continue
+                return
+            if decision == source_health.PROBE:
+                probe_error = _probe_source(run, src, base_url)
+                if probe_error:
+                    run.add("circuit", probed=1, probe_failed=1)
+                    raise _ProbeFailed(probe_error)
+                source_health.mark_half_open(source_id)
+                db.session.commit()
+                health["circuit_state"] = source_health.HALF_OPEN
+                run.add("circuit", probed=1)
+                debug_logger.info(f"[EXTRACT] Probe passed for source id={source_id}; circuit half-open")
+
+        # Incremental: resume from the stored watermark
+        incremental = None if run.offline else _incremental_config(src["config"])
+        watermark: Optional[str] = None
+        new_watermark: Optional[str] = None
+        if incremental:
+            watermark = _load_watermark(source_id)
+            new_watermark = watermark
+            if watermark:
+                base_url = _merge_query_param(base_url, incremental["param"], watermark)
+            debug_logger.info(
+                f"[EXTRACT] Incremental source id={source_id} param={incremental['param']} "
+                f"field={incremental['field']} watermark={watermark}"
+            )
+
+        conditional = not run.offline and src["config"].get("conditional_get", True) is not False
+        validators = _load_page_validators(source_id) if conditional else {}
+
+        # Checkpoint: continue an unfinished walk after its last committed page
+        checkpointing = not run.offline and src["config"].get("checkpoint", True) is not False
+        checkpoint = _load_checkpoint(source_id, base_url) if checkpointing else None
+        start_page, start_next_url = 1, ""
+        if checkpoint:
+            start_page, start_next_url = checkpoint["page"], checkpoint["next_url"]
+            if incremental:
+                new_watermark = _max_watermark(new_watermark, checkpoint["watermark"])
+            run.add("checkpoint", resumed=1)
+            debug_logger.info(
+                f"[EXTRACT] Resuming source id={source_id} at page {start_page} "
+                f"(checkpoint from run {checkpoint['run_id']})"
+            )
+            run.progress(
+                source_id=source_id,
+                source_name=source_name,
+                page=start_page,
+                message=f"Resuming from checkpoint at page {start_page}",
+            )
+        walk_complete = False   # pagination ended on its own (not cut off by MAX_PAGES)
+        checkpoint_saved = False
+        checkpoint_ok = checkpointing  # stops advancing after a page with rejected rows
+
+        throttle = run.throttle_for(src, base_url)
 
-            next_url = ""
+        # Extraction profile: known API shape -> fast path; observe the walk to (re)detect it
+        profiling = extract_profile.profiles_enabled(src["config"])
+        profile = extract_profile.load_profile(src["config"]) if profiling else None
+        walk: Dict[str, Any] = {
+            "profile": profile,
+            "observer": extract_profile.ProfileObserver(src["base_url"]) if profiling and not run.offline else None,
+            "stale": False,
+            "complete": False,
+            "proceed": threading.Event(),
+            "lock": threading.Lock(),
+        }
 
-            while page <= MAX_PAGES:
-                api_url = next_url if next_url else _merge_page_param(base_url, page)
-                debug_logger.info(f"[EXTRACT] Fetching page {page} from {api_url} for source id={source_id}")
-                debug_logger.debug(f"[EXTRACT] Using {'cursor next_url' if next_url else 'page parameter'} pagination")
+        # Fetch stage runs ahead on its own thread; this thread hashes and writes
+        depth = max(1, int(src["config"].get("prefetch_pages") or PREFETCH_PAGES))
+        pages: "queue.Queue[Optional[_FetchedPage]]" = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+        timings = {"fetch_ms": 0.0, "fetch_blocked_ms": 0.0, "process_ms": 0.0, "process_wait_ms": 0.0}
+        fetcher = threading.Thread(
+            target=_fetch_pages,
+            args=(run, src, base_url, validators, conditional, throttle, pages, stop, timings, walk,
+                  start_page, start_next_url),
+            name=f"extract-fetch-{source_id}",
+            daemon=True,
+        )
+        fetcher.start()
+
+        try:
+            while True:
+                t_wait = time.monotonic()
+                fetched = pages.get()
+                timings["process_wait_ms"] += (time.monotonic() - t_wait) * 1000
+                if fetched is None:
+                    walk_complete = walk_complete or walk["complete"]
+                    break
+                if fetched.error is not None:
+                    raise fetched.error
+                page = fetched.page
+                api_url = fetched.url
+                r = fetched.response
+
+                if fetched.not_modified:
+                    walk_complete = True
+                    debug_logger.info(
+                        f"[EXTRACT] Page {page} not modified (304) for source id={source_id}. Stopping."
+                    )
+                    run.progress(
+                        source_id=source_id,
+                        source_name=source_name,
+                        page=page,
+                        fetched_for_source=total_fetched_for_source,
+                        message="Page not modified; stopping pagination",
+                    )
+                    break
 
+                # Hash items as they are decoded; upsert every BATCH_SIZE new rows (avoid in run duplicates)
+                t_proc = time.monotonic()
+                pg = fetched.pg
                 try:
-                    r = requests.get(api_url, timeout=HTTP_TIMEOUT)
-                    content_len = len(r.content) if r.content else 0
-                    debug_logger.debug(f"[EXTRACT] HTTP {r.status_code} content_length={content_len} url={api_url}")
-                    r.raise_for_status()
-
-                    raw_json = r.json()
-                    items = _as_list(raw_json)
-                    debug_logger.debug(f"[EXTRACT] Parsed {len(items)} items from page {page} for source id={source_id}")
-
-                except requests.exceptions.Timeout:
-                    debug_logger.error(f"[EXTRACT] TIMEOUT fetching {api_url} after {HTTP_TIMEOUT}s")
-                    raise
-                except requests.exceptions.RequestException as req_e:
-                    debug_logger.error(f"[EXTRACT] HTTP ERROR fetching {api_url}: {req_e}")
-                    raise
-                except (ValueError, json.JSONDecodeError) as json_e:
-                    debug_logger.error(f"[EXTRACT] JSON DECODE ERROR from {api_url}: {json_e}")
-                    raise
-
-                if not items:
+                    rows = []
+                    page_items = 0
+                    new_hashes = 0
+                    page_failed = 0
+                    for idx, it in enumerate(pg.items):
+                        page_items += 1
+                        if incremental:
+                            new_watermark = _max_watermark(new_watermark, _field_value(it, incremental["field"]))
+                        content_hash = run.hasher.digest(it, src["hash_exclude"])
+                        if content_hash in seen_hashes:
+                            continue
+                        seen_hashes.add(content_hash)
+                        new_hashes += 1
+
+                        rows.append({
+                            "user_id": user_id,
+                            "source_id": source_id,
+                            "record_time": datetime.utcnow(),  # metadata only
+                            "content": it,
+                            "content_hash": content_hash,
+                            "content_type": "json",
+                            "status": "ok",
+                            "error_message": None,
+                        })
+
+                        if idx < 3:
+                            debug_logger.debug(f"[EXTRACT] Item {idx}: hash={content_hash.hex()[:16]}...")
+
+                        if len(rows) >= BATCH_SIZE:
+                            page_failed += _flush_rows(run, src, page, rows, tally)
+                            rows = []
+
+                    if rows:
+                        page_failed += _flush_rows(run, src, page, rows, tally)
+                        rows = []
+                finally:
+                    fetched.release()
+                    timings["process_ms"] += (time.monotonic() - t_proc) * 1000
+
+                pages_done = page
+                debug_logger.debug(
+                    f"[EXTRACT] Parsed {page_items} items from page {page} for source id={source_id} "
+                    f"streamed={pg.streamed}"
+                )
+
+                if page_items == 0:
+                    walk_complete = True
+                    if conditional:
+                        _save_page_validator(source_id, api_url, r)
                     debug_logger.info(f"[EXTRACT] No items on page {page} for source id={source_id}")
-                    _progress(
-                        self,
-                        percent=int(out["processed"] * 100 / max(total_sources, 1)),
-                        processed=out["processed"],
-                        total=total_sources,
+                    run.progress(
                         source_id=source_id,
                         source_name=source_name,
                         page=page,
                         fetched_for_source=total_fetched_for_source,
-                        inserted=out["inserted"],
-                        duplicates=out["duplicates"],
                         message="No items; pagination complete",
-                        task_id=task_id,
                     )
                     break
 
-                # Build rows; avoid in run duplicates
-                rows = []
-                new_hashes = 0
-                for idx, it in enumerate(items):
-                    content_hash = _hash_content_only(it)
-                    if content_hash in seen_hashes:
-                        continue
-                    seen_hashes.add(content_hash)
-                    new_hashes += 1
-
-                    rows.append({
-                        "user_id": user_id,
-                        "source_id": source_id,
-                        "record_time": datetime.utcnow(),  # metadata only
-                        "content": it,
-                        "content_hash": content_hash,
-                        "content_type": "json",
-                        "status": "ok",
-                        "error_message": None,
-                    })
-
-                    if idx < 3:
-                        debug_logger.debug(f"[EXTRACT] Item {idx}: hash={content_hash.hex()[:16]}...")
-
                 if new_hashes == 0:
+                    walk_complete = True
+                    if conditional:
+                        _save_page_validator(source_id, api_url, r)
                     debug_logger.warning(
                         f"[EXTRACT] Page {page} produced no new hashes for source id={source_id}. Stopping."
                     )
-                    _progress(
-                        self,
-                        percent=int(out["processed"] * 100 / max(total_sources, 1)),
-                        processed=out["processed"],
-                        total=total_sources,
+                    run.progress(
                         source_id=source_id,
                         source_name=source_name,
                         page=page,
                         fetched_for_source=total_fetched_for_source,
-                        inserted=out["inserted"],
-                        duplicates=out["duplicates"],
                         message="No new hashes; stopping pagination",
-                        task_id=task_id,
                     )
                     break
 
-                # Upsert each row; DB enforces unique(content_hash)
-                debug_logger.info(
-                    f"[EXTRACT] Upserting {len(rows)} records from page {page} source id={source_id}"
-                )
-                for row_idx, row_data in enumerate(rows):
-                    try:
-                        now_ts = datetime.utcnow()
-                        row_data["ingested_at"] = now_ts
-                        row_data["created_at"]  = now_ts
-
-                        stmt  = mysql_insert(UserDatasetRaw).values(**row_data)
-                        ondup = stmt.on_duplicate_key_update(
-                            ingested_at   = row_data["ingested_at"],
-                            status        = row_data["status"],
-                            error_message = row_data["error_message"],
-                        )
-                        res = db.session.execute(ondup)
-                        db.session.commit()
-
-                        if res.rowcount == 1:
-                            out["inserted"] += 1
-                            per_source_inserted += 1
-                        else:
-                            out["duplicates"] += 1
-                            per_source_duplicates += 1
-
-                        if (row_idx + 1) % 200 == 0:
-                            _progress(
-                                self,
-                                percent=int(out["processed"] * 100 / max(total_sources, 1)),
-                                processed=out["processed"],
-                                total=total_sources,
-                                source_id=source_id,
-                                source_name=source_name,
-                                page=page,
-                                fetched_for_source=total_fetched_for_source + (row_idx + 1),
-                                inserted=out["inserted"],
-                                duplicates=out["duplicates"],
-                                message=f"Upserted {row_idx + 1}/{len(rows)} on page {page}",
-                                task_id=task_id,
-                            )
-
-                    except Exception as e:
-                        db.session.rollback()
-                        debug_logger.warning(
-                            f"[EXTRACT] Failed to upsert record {row_idx} from page {page}: {e}"
-                        )
-                        out["duplicates"] += 1
-                        per_source_duplicates += 1
-
-                total_fetched_for_source += len(rows)
+                # Only remember validators for pages that fully landed, so a 304 never hides lost rows
+                if conditional and not page_failed:
+                    _save_page_validator(source_id, api_url, r)
+
+                total_fetched_for_source += new_hashes
                 debug_logger.info(
                     f"[EXTRACT] Page {page} complete for source {source_id}: "
-                    f"{len(rows)} processed, inserted={per_source_inserted}, duplicates={per_source_duplicates}, "
+                    f"{new_hashes} processed, inserted={tally['inserted']}, duplicates={tally['duplicates']}, "
                     f"total_fetched_for_source={total_fetched_for_source}"
                 )
 
+                # Page is committed: the next run may resume after it (and the fetcher may fan out)
+                walk["proceed"].set()
+                if checkpoint_ok and page_failed:
+                    checkpoint_ok = False
+                    debug_logger.warning(
+                        f"[EXTRACT] Page {page} had {page_failed} rejected rows; checkpoint stays before it "
+                        f"for source id={source_id}"
+                    )
+                if checkpoint_ok and _save_checkpoint(source_id, run.task_id, base_url, page + 1, pg.next_url(), new_watermark):
+                    checkpoint_saved = True
+                    run.add("checkpoint", saved=1)
+
                 # Per page progress tick
-                _progress(
-                    self,
-                    percent=int(out["processed"] * 100 / max(total_sources, 1)),
-                    processed=out["processed"],
-                    total=total_sources,
+                run.progress(
                     source_id=source_id,
                     source_name=source_name,
                     page=page,
                     fetched_for_source=total_fetched_for_source,
-                    inserted=out["inserted"],
-                    duplicates=out["duplicates"],
                     message=f"Processed page {page}",
-                    task_id=task_id,
                 )
+        finally:
+            stop.set()
+            _drain_pages(pages)
+            fetcher.join(timeout=HTTP_TIMEOUT)
+            run.add("stages", **timings)
+            run.add("throttle", **throttle.stats())
+            debug_logger.info(
+                f"[EXTRACT] Stage timings source id={source_id} "
+                + " ".join(f"{k}={int(v)}" for k, v in timings.items())
+            )
 
-                # Advance pagination
-                next_url = _maybe_next_url(raw_json)
-                page += 1
+        # Cut off by MAX_PAGES: keep the checkpoint so the next run continues the walk
+        keep_checkpoint = not walk_complete and (checkpoint_saved or checkpoint is not None)
 
-            # Update last_updated for this source
-            try:
-                src.last_updated = now
-                db.session.commit()
+        # Update last_updated (and the incremental watermark / checkpoint) for this source
+        try:
+            ds = db.session.get(DataSource, source_id)
+            if ds is not None and not run.offline:
+                ds.last_updated = now
+            if keep_checkpoint:
+                run.add("checkpoint", kept=1)
                 debug_logger.info(
-                    f"[EXTRACT] Source id={source_id} completed: fetched={total_fetched_for_source} items across {page-1} pages"
+                    f"[EXTRACT] Walk for source id={source_id} stopped at the page limit; "
+                    f"next run resumes from its checkpoint"
                 )
-            except Exception as stamp_e:
-                db.session.rollback()
-                msg = f"source_id={source_id} err=last_updated_commit_failed: {stamp_e}"
-                debug_logger.error(f"[EXTRACT] {msg}")
-                out["errors"].append(msg)
-
-            # Per source completion tick
-            _progress(
-                self,
-                percent=int(out["processed"] * 100 / max(total_sources, 1)),
-                processed=out["processed"],
-                total=total_sources,
-                source_id=source_id,
-                source_name=source_name,
-                inserted=out["inserted"],
-                duplicates=out["duplicates"],
-                message="Source complete",
-                task_id=task_id,
+            elif checkpoint_saved or checkpoint is not None:
+                _clear_checkpoint(source_id)
+            detected = walk["observer"].result() if walk["observer"] is not None else None
+            if ds is not None and detected and not extract_profile.same_profile(detected, profile):
+                ds.config = {**(ds.config or {}), "profile": detected}
+                run.add("profile", detected=1, stale=int(walk["stale"]))
+                debug_logger.info(
+                    f"[EXTRACT] Stored extraction profile for source id={source_id}: "
+                    + " ".join(f"{k}={detected[k]}" for k in ("envelope", "pagination", "page_size_param", "total_header"))
+                )
+            elif walk["profile"]:
+                run.add("profile", used=1)
+            # While a checkpoint is kept the watermark rides along in it; advancing now would
+            # change the walk's URL and orphan the checkpoint
+            if incremental and new_watermark and new_watermark != watermark and not keep_checkpoint:
+                if tally["failed"]:
+                    debug_logger.warning(
+                        f"[EXTRACT] Not advancing watermark for source id={source_id}: "
+                        f"{tally['failed']} rows failed to store"
+                    )
+                else:
+                    _save_watermark(source_id, new_watermark)
+                    debug_logger.info(
+                        f"[EXTRACT] Watermark source id={source_id} {watermark} -> {new_watermark}"
+                    )
+            if health is not None:
+                source_health.record_success(source_id)
+            db.session.commit()
+            debug_logger.info(
+                f"[EXTRACT] Source id={source_id} completed: fetched={total_fetched_for_source} items across {pages_done} pages"
             )
-
-        except Exception as e:
+        except Exception as stamp_e:
             db.session.rollback()
+            msg = f"source_id={source_id} err=last_updated_commit_failed: {stamp_e}"
+            debug_logger.error(f"[EXTRACT] {msg}")
+            run.add_error(msg)
+
+        # Per source completion tick
+        run.progress(
+            source_id=source_id,
+            source_name=source_name,
+            message="Source complete",
+        )
+
+    except Exception as e:
+        db.session.rollback()
+        if isinstance(e, _ProbeFailed):
+            debug_logger.warning(f"[EXTRACT] Probe failed for source id={source_id}: {e}")
+        else:
             debug_logger.exception(
                 f"[EXTRACT] FATAL ERROR processing source id={source_id} name='{source_name}': {e}"
             )
-            out["errors"].append(f"source_id={source_id} err={e}")
-
-            # Error progress tick
-            _progress(
-                self,
-                percent=int(out["processed"] * 100 / max(total_sources, 1)),
-                processed=out["processed"],
-                total=total_sources,
-                source_id=source_id,
-                source_name=source_name,
-                inserted=out["inserted"],
-                duplicates=out["duplicates"],
-                message=f"Error: {e}",
-                task_id=task_id,
-            )
+        run.add_error(f"source_id={source_id} err={e}")
+        if health is not None:
+            _record_source_failure(run, source_id, health, e)
 
-    # Final summary
-    end_time = datetime.utcnow()
-    elapsed_seconds = (end_time - start_time).total_seconds()
+        # Error progress tick
+        run.progress(
+            source_id=source_id,
+            source_name=source_name,
+            message=f"Error: {e}",
+        )
+
+# ------------------------------------------------------------------------------------
+# Run summary
+
+def _merge_out(into: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold one run summary into another: numbers add up, lists concatenate, dicts recurse."""
+    for key, value in (part or {}).items():
+        if isinstance(value, bool) or value is None:
+            into.setdefault(key, value)
+        elif isinstance(value, (int, float)):
+            into[key] = into.get(key, 0) + value
+        elif isinstance(value, list):
+            into.setdefault(key, []).extend(value)
+        elif isinstance(value, dict):
+            _merge_out(into.setdefault(key, {}), value)
+        else:
+            into.setdefault(key, value)
+    return into
+
+def _record_responses(record: Optional[bool]) -> bool:
+    return bool(current_app.config.get("RESPONSE_CACHE_RECORD")) if record is None else bool(record)
+
+def _finish_run(task, out: Dict[str, Any], task_id: str, total_sources: int, start_time: datetime) -> Dict[str, Any]:
+    """Log the run summary and publish the final SUCCESS state for the frontend."""
+    http = out.get("http") or {}
+    if http.get("requests"):
+        http["reuse_rate"] = round(http.get("reused_connections", 0) / http["requests"], 4)
+
+    elapsed_seconds = (datetime.utcnow() - start_time).total_seconds()
     debug_logger.info(
         f"[EXTRACT] COMPLETE task_id={task_id} elapsed={elapsed_seconds:.2f}s "
         f"sources_processed={out['processed']} inserted={out['inserted']} "
-        f"duplicates={out['duplicates']} errors={len(out['errors'])}"
+        f"duplicates={out['duplicates']} prechecked={out['prechecked']} failed={out['failed']} errors={len(out['errors'])} "
+        f"page_cache_hits={out['page_cache_hits']} page_cache_misses={out['page_cache_misses']}"
     )
+    debug_logger.info(f"[EXTRACT] HTTP pool stats: {http}")
 
     if out["errors"]:
         debug_logger.warning(f"[EXTRACT] Errors encountered: {out['errors']}")
 
-    # Final success state for the frontend
     _progress(
-        self,
+        task,
         state="SUCCESS",
         percent=100,
         processed=out["processed"],
         total=total_sources,
         inserted=out["inserted"],
         duplicates=out["duplicates"],
+        page_cache_hits=out["page_cache_hits"],
+        page_cache_misses=out["page_cache_misses"],
         message="Complete",
         task_id=task_id,
     )
+    return out
 
+# ------------------------------------------------------------------------------------
+# Tasks
+
+@celery.task(bind=True, name="app.tasks.extract_data_sources.extract_data_sources_task")
+def extract_data_sources_task(
+    self,
+    max_workers: Optional[int] = None,
+    per_host: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    fan_out: Optional[bool] = None,
+    record: Optional[bool] = None,
+    offline: bool = False,
+):
+    """
+    Walk all DataSource.base_url links with pagination, normalize items, hash content,
+    and upsert into user_dataset_raw with global content hash dedupe.
+
+    By default this is a coordinator: it replaces itself with a chord of one
+    extract_data_source_task per source plus extract_data_sources_summary_task, so
+    sources spread over every worker and a slow source only holds up its own subtask.
+    The summary keeps this task's id, and any chained transform still runs after it.
+
+    kwargs:
+        max_workers: sources extracted concurrently in-process (fan_out=False only)
+        per_host: in-flight requests allowed per host (default MAX_CONCURRENT_PER_HOST)
+        max_retries: retries per request on transient errors (default HTTP_MAX_RETRIES);
+                     a source can override it with DataSource.config["max_retries"]
+        fan_out: one Celery subtask per source (default EXTRACT_FAN_OUT); False runs
+                 every source on this worker's thread pool
+        record: save every fetched page to the response cache (default app config
+                RESPONSE_CACHE_RECORD)
+        offline: replay pages from the response cache instead of calling the APIs
+    """
+    task_id = self.request.id
+    debug_logger.info(f"[EXTRACT] START task_id={task_id} extract data from connected sources")
+    start_time = datetime.utcnow()
+
+    # Load sources
+    try:
+        sources = [_source_snapshot(s) for s in db.session.query(DataSource).all()]
+        debug_logger.info(f"[EXTRACT] Loaded {len(sources)} data sources from database")
+    except Exception as e:
+        debug_logger.error(f"[EXTRACT] FAILED to query data sources: {e}")
+        return {"processed": 0, "inserted": 0, "duplicates": 0, "failed": 0, "errors": [f"sources_query_failed: {e}"]}
+    finally:
+        db.session.close()
+
+    total_sources = len(sources)
+    fan_out = EXTRACT_FAN_OUT if fan_out is None else bool(fan_out)
+    if fan_out and sources and not self.request.called_directly:
+        # Subtasks follow the coordinator's queue so dedicated ingest workers pick them up
+        queue_name = (self.request.delivery_info or {}).get("routing_key")
+        options = {"queue": queue_name} if queue_name else {}
+        header = group(
+            extract_data_source_task.s(
+                src["id"], per_host=per_host, max_retries=max_retries, record=record, offline=offline,
+            ).set(**options)
+            for src in sources
+        )
+        callback = extract_data_sources_summary_task.s(
+            total_sources=total_sources,
+            started_at=start_time.isoformat(),
+        ).set(**options)
+        debug_logger.info(f"[EXTRACT] Fanning out {total_sources} source subtasks task_id={task_id}")
+        _progress(
+            self,
+            percent=0,
+            processed=0,
+            total=total_sources,
+            message=f"Dispatched {total_sources} source subtasks",
+            task_id=task_id,
+        )
+        return self.replace(chord(header, callback))
+
+    workers = max(1, min(int(max_workers or MAX_CONCURRENT_SOURCES), max(total_sources, 1)))
+    run = _ExtractRun(
+        self,
+        task_id,
+        total_sources,
+        per_host or MAX_CONCURRENT_PER_HOST,
+        HTTP_MAX_RETRIES if max_retries is None else max_retries,
+        hash_backend=current_app.config.get("CONTENT_HASH_BACKEND"),
+        record=_record_responses(record),
+        offline=offline,
+    )
+    debug_logger.info(
+        f"[EXTRACT] Running with workers={workers} per_host={run.hosts.per_host} sources={total_sources} "
+        f"hash_backend={run.hasher.backend} record={run.record} offline={run.offline}"
+    )
+
+    # Initial progress tick
+    run.progress(message="Starting ingestion")
+
+    app = current_app._get_current_object()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as pool:
+            futures = {pool.submit(_extract_source, app, run, src): src for src in sources}
+            for fut in as_completed(futures):
+                src = futures[fut]
+                try:
+                    fut.result()
+                except Exception as e:
+                    # _extract_source records its own errors; this only catches app context failures
+                    debug_logger.exception(f"[EXTRACT] Worker crashed for source id={src['id']}: {e}")
+                    run.add_error(f"source_id={src['id']} err=worker_crashed: {e}")
+    finally:
+        run.http.close()
+
+    out = run.out
+    out["http"] = run.http.stats()
+    out["hash"] = run.hasher.stats()
+    if run.responses is not None:
+        out["response_cache"] = run.responses.stats()
+    return _finish_run(self, out, task_id, total_sources, start_time)
+
+@celery.task(
+    bind=True,
+    name="app.tasks.extract_data_sources.extract_data_source_task",
+    soft_time_limit=SOURCE_SOFT_TIME_LIMIT,
+)
+def extract_data_source_task(
+    self,
+    source_id: int,
+    per_host: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    record: Optional[bool] = None,
+    offline: bool = False,
+):
+    """
+    Extract a single DataSource (one chord member of extract_data_sources_task).
+    Reports its own PROGRESS and returns the same summary shape as the full run plus
+    source_id; errors are recorded in the summary, never raised, so one bad source
+    cannot fail the chord.
+    """
+    task_id = self.request.id
+    run = _ExtractRun(
+        self,
+        task_id,
+        1,
+        per_host or MAX_CONCURRENT_PER_HOST,
+        HTTP_MAX_RETRIES if max_retries is None else max_retries,
+        hash_backend=current_app.config.get("CONTENT_HASH_BACKEND"),
+        record=_record_responses(record),
+        offline=offline,
+    )
+    try:
+        src = db.session.get(DataSource, source_id)
+        if src is None:
+            run.add_error(f"source_id={source_id} err=source_not_found")
+        else:
+            snapshot = _source_snapshot(src)
+            db.session.close()
+            _extract_source_in_context(run, snapshot)
+    except Exception as e:
+        # _extract_source_in_context records its own errors; this covers the lookup
+        db.session.rollback()
+        debug_logger.exception(f"[EXTRACT] Subtask failed for source id={source_id}: {e}")
+        run.add_error(f"source_id={source_id} err={e}")
+    finally:
+        run.http.close()
+
+    out = run.out
+    out["http"] = run.http.stats()
+    out["hash"] = run.hasher.stats()
+    if run.responses is not None:
+        out["response_cache"] = run.responses.stats()
+    out["sources"] = [{
+        "source_id": source_id,
+        "task_id": task_id,
+        "inserted": out["inserted"],
+        "duplicates": out["duplicates"],
+        "failed": out["failed"],
+        "errors": len(out["errors"]),
+    }]
     return out
+
+@celery.task(bind=True, name="app.tasks.extract_data_sources.extract_data_sources_summary_task")
+def extract_data_sources_summary_task(
+    self,
+    results: List[Dict[str, Any]],
+    total_sources: Optional[int] = None,
+    started_at: Optional[str] = None,
+):
+    """
+    Chord callback: fold the per-source summaries into one run summary (same keys as
+    the in-process run, plus "sources" with each subtask's id and counts).
+    """
+    task_id = self.request.id
+    out = _ExtractRun.empty_out()
+    for part in results or []:
+        if isinstance(part, dict):
+            _merge_out(out, part)
+    try:
+        start_time = datetime.fromisoformat(started_at) if started_at else datetime.utcnow()
+    except ValueError:
+        start_time = datetime.utcnow()
+    return _finish_run(self, out, task_id, total_sources or len(results or []), start_time)
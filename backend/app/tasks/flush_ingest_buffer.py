@@ -0,0 +1,181 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# Push ingestion, write side: drains the Redis buffer that POST /ingest/<source_id>
+# fills (app/utils/ingest_buffer.py) into user_dataset_raw.
+# Scheduling:
+#   - Celery Beat runs it every INGEST_FLUSH_INTERVAL seconds for every buffered source.
+#   - A push that leaves FLUSH_BATCH_SIZE or more events waiting queues an early flush
+#     for just that source (debounced), so busy sources don't wait for the next tick.
+# Writes:
+#   - FLUSH_BATCH_SIZE events per read, hashed with the same content hasher as the
+#     extractor and written with upsert_raw_rows (hash pre-check + multi-row upserts),
+#     so pushed and pulled copies of the same record dedupe against each other
+#     (including the source's config["hash_exclude"]).
+#   - Sources with config["storage"] = "page" get one raw row per WRITE_BATCH_SIZE events
+#     (upsert_raw_page) instead of one per event.
+#   - A batch is trimmed from the buffer only after it was written; if every row of a
+#     batch fails (database down) it stays buffered for the next tick. When only some
+#     rows are rejected, their events go to the source's dead-letter list
+#     (ingest:dead:<source_id>) before the trim, so a 202'd event is never just dropped.
+# ------------------------------------------------------------------------------------
+# Imports:
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+
+# Local Imports
+from app.extensions import celery, db
+from app.models.data_sources import DataSource
+from app.utils import ingest_buffer
+from app.utils.content_hash import ContentHasher, compile_exclusions, get_hasher
+from app.utils.logging import debug_logger
+from app.utils.raw_writer import upsert_raw_page, upsert_raw_rows
+
+# ------------------------------------------------------------------------------------
+# Vars
+INGEST_FLUSH_INTERVAL = 5       # seconds between Beat flushes
+FLUSH_BATCH_SIZE = 5000         # events read from the buffer per write
+WRITE_BATCH_SIZE = 1000         # rows per multi-row upsert
+MAX_SECONDS_PER_SOURCE = 30     # per tick, so one busy source can't starve the rest
+KICK_DEBOUNCE_SECONDS = 2
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def _parse_received_at(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.utcnow()
+
+def _build_rows(source_id: int, owner_id: int, batch, hasher: ContentHasher, exclude: Optional[Dict[str, Any]],
+                out: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    seen: set[bytes] = set()
+    for user_id, received_at, event in batch:
+        if event is None:
+            out["dropped"] += 1
+            continue
+        if user_id != owner_id:
+            # Source changed hands since the push; never file events under the wrong user
+            out["dropped"] += 1
+            continue
+        content_hash = hasher.digest(event, exclude)
+        if content_hash in seen:
+            out["duplicates"] += 1
+            continue
+        seen.add(content_hash)
+        rows.append({
+            "user_id": owner_id,
+            "source_id": source_id,
+            "record_time": _parse_received_at(received_at),  # when the push arrived
+            "content": event,
+            "content_hash": content_hash,
+            "content_type": "json",
+            "status": "ok",
+            "error_message": None,
+        })
+    return rows
+
+def _write_pages(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    res: Dict[str, Any] = {"inserted": 0, "duplicates": 0, "failed": 0, "errors": [], "rejected": []}
+    for i in range(0, len(rows), WRITE_BATCH_SIZE):
+        part = upsert_raw_page(rows[i:i + WRITE_BATCH_SIZE])
+        for k in ("inserted", "duplicates", "failed"):
+            res[k] += part[k]
+        res["errors"].extend(part["errors"])
+        res["rejected"].extend(part["rejected"])
+    return res
+
+def _flush_source(source_id: int, hasher: ContentHasher, out: Dict[str, Any]) -> None:
+    token = ingest_buffer.acquire(source_id)
+    if token is None:
+        debug_logger.debug(f"[INGEST_FLUSH] Source {source_id} is being flushed elsewhere")
+        return
+    try:
+        ds = db.session.get(DataSource, source_id)
+        if ds is None:
+            dropped = ingest_buffer.drop(source_id)
+            out["dropped"] += dropped
+            debug_logger.warning(f"[INGEST_FLUSH] Source {source_id} no longer exists; dropped {dropped} events")
+            return
+        owner_id = ds.user_id
+        exclude = compile_exclusions((ds.config or {}).get("hash_exclude"))
+        page_storage = (ds.config or {}).get("storage") == "page"
+
+        deadline = time.monotonic() + MAX_SECONDS_PER_SOURCE
+        wrote = False
+        while time.monotonic() < deadline:
+            batch = ingest_buffer.peek(source_id, FLUSH_BATCH_SIZE)
+            if not batch:
+                break
+            rows = _build_rows(source_id, owner_id, batch, hasher, exclude, out)
+            res = _write_pages(rows) if page_storage else upsert_raw_rows(rows, batch_size=WRITE_BATCH_SIZE)
+            if rows and res["failed"] == len(rows):
+                out["errors"].append(f"source_id={source_id} err=batch_failed: {res['errors'][:1]}")
+                debug_logger.error(
+                    f"[INGEST_FLUSH] All {len(rows)} rows failed for source {source_id}; keeping them buffered"
+                )
+                break
+            if res["rejected"]:
+                rejected = set(res["rejected"])
+                parked = ingest_buffer.dead_letter(source_id, [
+                    (row["user_id"], row["record_time"].isoformat(), row["content"])
+                    for row in rows if row["content_hash"] in rejected
+                ])
+                out["dead_lettered"] += parked
+                debug_logger.error(f"[INGEST_FLUSH] Source {source_id}: {parked} rejected events moved to the dead-letter list")
+            left = ingest_buffer.commit(source_id, len(batch))
+            wrote = wrote or bool(res["inserted"])
+            out["events"] += len(batch)
+            out["inserted"] += res["inserted"]
+            out["duplicates"] += res["duplicates"]
+            out["failed"] += res["failed"]
+            out["errors"].extend(f"source_id={source_id} err={e}" for e in res["errors"])
+            debug_logger.info(
+                f"[INGEST_FLUSH] Source {source_id}: wrote {len(batch)} events inserted={res['inserted']} "
+                f"duplicates={res['duplicates']} failed={res['failed']} left={left}"
+            )
+            if not left:
+                break
+
+        if wrote:
+            ds.last_updated = datetime.utcnow()
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        debug_logger.exception(f"[INGEST_FLUSH] FATAL ERROR flushing source {source_id}: {e}")
+        out["errors"].append(f"source_id={source_id} err={e}")
+    finally:
+        ingest_buffer.release(source_id, token)
+
+# ------------------------------------------------------------------------------------
+# Tasks
+
+@celery.task(bind=True, name="app.tasks.flush_ingest_buffer.flush_ingest_buffer_task", ignore_result=True)
+def flush_ingest_buffer_task(self, source_id: Optional[int] = None) -> Dict[str, Any]:
+    """Write buffered push events to user_dataset_raw (one source, or every buffered source)."""
+    start_time = time.time()
+    out: Dict[str, Any] = {"sources": 0, "events": 0, "inserted": 0, "duplicates": 0, "failed": 0, "dropped": 0,
+                           "dead_lettered": 0, "errors": []}
+    hasher = get_hasher(current_app.config.get("CONTENT_HASH_BACKEND"))
+
+    source_ids = [int(source_id)] if source_id is not None else ingest_buffer.buffered_sources()
+    for sid in source_ids:
+        out["sources"] += 1
+        _flush_source(sid, hasher, out)
+
+    if out["events"] or out["errors"]:
+        debug_logger.info(
+            f"[INGEST_FLUSH] COMPLETE sources={out['sources']} events={out['events']} inserted={out['inserted']} "
+            f"duplicates={out['duplicates']} failed={out['failed']} dropped={out['dropped']} "
+            f"dead_lettered={out['dead_lettered']} "
+            f"errors={len(out['errors'])} elapsed={time.time() - start_time:.2f}s"
+        )
+    return out
@@ -14,7 +14,42 @@
 #   - Stable datetime parsing (RFC1123, ISO8601, unix seconds/floats) -> UTC
 #   - Amount normalization -> integer cents
 #   - Source attribution normalization (honors is_organic)
-#   - Idempotent via AnalyticsEtlState cursor + unique (user_id, raw_id, item_idx)
+#   - Incremental via AnalyticsEtlState: a committed last_raw_id watermark per job, so
+#     normal runs only read raw rows above it. Job keys:
+#       transform_data              unscoped runs
+#       transform_data:user:<id>    runs scoped to user_ids (one watermark per user)
+#       transform_data:run:<task>   progress of a force_reprocess or since/until run,
+#                                   dropped when the run finishes
+#     since/until runs scan from the start and leave watermarks alone (they skip rows
+#     outside their days); force_reprocess rebuilds and resets the watermarks it covers.
+#     The watermark / progress is committed with each batch's upserts, so an autoretry
+#     resumes after the last committed batch (and a retried force_reprocess doesn't wipe
+#     the clean tables a second time). Unique (user_id, raw_id, item_idx) keeps any
+#     overlap idempotent.
+#     A run stops at the newest raw id ingested at least RAW_SETTLE_SECONDS ago. An
+#     AUTO_INCREMENT id is taken at insert, not commit: a writer's transaction (parallel
+#     extraction, the 5 s ingest flush) can still be open on a lower id than a row that
+#     is already visible, and a watermark moved past it would skip that row for good.
+#   - Lead / order rows go through CleanUpsertWriter (app/utils/clean_writer.py):
+#     multi-row upserts of flush_size records from one cached statement, run on the
+#     session's connection (one savepoint per chunk, retried on lock wait timeouts). A
+#     batch's clean rows, master customers and watermark commit in one transaction.
+#     Per-table write timings are in the result ("writes").
+#   - Parallel parsing (workers > 1, TRANSFORM_WORKERS): each raw batch is split into
+#     chunks that a billiard process pool runs through _parse_rows (payload parsing,
+#     type detection, dates, cents, JSON dumps); results come back in row order. The
+#     task process keeps DB reads, master customer resolution and writes, so output
+#     is the same as serial. Workers drop the engine pool they inherit at fork
+#     (dispose(close=False)) so nothing in a child can touch the task's connection
+#     (the one holding GET_LOCK). billiard rather than multiprocessing because Celery's
+#     prefork children are daemonic and multiprocessing won't let them fork a pool.
+#   - Master customers are resolved per batch: one IN query by customer_id and one by
+#     email for keys not already known, one multi-row insert for the new ones. Known ids
+#     stay in an LRU identity cache for the run (MASTER_CACHE_SIZE keys); hits, misses
+#     and creations are in the result ("master_customers").
+#   - Keyset batches over user_dataset_raw (id > last_id ORDER BY id LIMIT n, a primary
+#     key range scan) read as plain Core rows, so every batch costs the same however far
+#     into the table the run is (OFFSET made MySQL scan and discard all earlier rows)
 #   - Optional scoped rebuild (force_reprocess + user_ids/since/until)
 #   - Extremely verbose logging via debug_logger
 #   - Optional auto-DDL for three clean tables (MySQL)
@@ -23,11 +58,15 @@ from __future__ import annotations
 
 import json
 import time
-from datetime import datetime, date, timezone
+from collections import OrderedDict
+from datetime import datetime, date, timedelta, timezone
 from decimal import Decimal, InvalidOperation
 from typing import Dict, Iterable, Iterator, List, Tuple, Set, Optional
 
-from sqlalchemy import text
+from billiard import Pool
+from flask import current_app
+from sqlalchemy import select, text
+from sqlalchemy.engine import Row
 from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.exc import IntegrityError, OperationalError
 
@@ -36,6 +75,7 @@ from app.utils.logging import debug_logger  # <-- use debug_logger everywhere
 from app.extensions import celery, db
 from app.models.data_sources import AnalyticsEtlState, UserDatasetRaw
 from app.models.clean_staging import LeadsClean, CustomersClean, OrdersClean
+from app.utils.clean_writer import CleanUpsertWriter
 
 # ------------------------------------------------------------------------------------
 # Constants
@@ -44,6 +84,25 @@ JOB_NAME = "transform_data"
 BATCH_SIZE = 5000
 LOCK_KEY = "etl:clean_stage_tables"
 
+# AnalyticsEtlState job keys (see header)
+USER_STATE_PREFIX = f"{JOB_NAME}:user:"
+RUN_STATE_PREFIX = f"{JOB_NAME}:run:"
+RUN_STATE_MAX_AGE = timedelta(days=1)  # progress rows of runs that never finished
+RAW_SETTLE_SECONDS = 120  # raw rows younger than this are left to the next run (see header)
+
+# Master customer resolution: identity cache entries kept per run, values per IN query
+MASTER_CACHE_SIZE = 200_000
+MASTER_LOOKUP_CHUNK = 1000
+_MASTER_INSERT = None  # built on first use by _master_insert_stmt()
+
+# Parallel parsing: chunks handed to each pool worker per raw batch, and the smallest chunk
+PARSE_CHUNKS_PER_WORKER = 4
+PARSE_CHUNK_MIN = 50
+
+# Only what the transform reads from a raw row (id, user_id, record_time, content)
+RAW_TABLE = UserDatasetRaw.__table__
+RAW_COLUMNS = (RAW_TABLE.c.id, RAW_TABLE.c.user_id, RAW_TABLE.c.record_time, RAW_TABLE.c.content)
+
 # Clean staging table references using SQLAlchemy models
 LEADS_TBL = LeadsClean.__table__.name
 CUSTOMERS_TBL = CustomersClean.__table__.name
@@ -353,104 +412,446 @@ def _json_dump(obj: dict) -> str:
         except Exception:
             return "{}"
 
-def _get_or_create_master_customer(email: str, payload: dict, user_id: int, raw_id: int, item_idx: int, created_dt: datetime, day_iso: str, label: str) -> Optional[int]:
+# ------------------------------------------------------------------------------------
+# Master customers (customers_clean), resolved a batch at a time
+
+class _IdentityCache:
     """
-    Find or create master customer record using customer_id + email. Returns master_customer_id.
-    Priority: 1) customer_id from payload, 2) email matching
+    LRU map of ("cid", customer_id) / ("email", email) -> customers_clean.id, kept for
+    the whole run so customers seen in earlier batches cost no query.
     """
-    customer_id_from_payload = payload.get("customer_id")
-    
-    # First try: Look up by customer_id (from original CRM customer relationship)
-    if customer_id_from_payload:
-        try:
-            existing = db.session.query(CustomersClean).filter_by(customer_id=customer_id_from_payload).first()
-            if existing:
-                debug_logger.debug(f"[{JOB_NAME}] Found master customer by customer_id={customer_id_from_payload} -> id={existing.id}")
-                return existing.id
-        except Exception as e:
-            debug_logger.warning(f"[{JOB_NAME}] Error querying master customer by customer_id {customer_id_from_payload}: {e}")
-    
-    # Second try: Look up by email if no customer_id match
-    if email:
-        try:
-            existing = db.session.query(CustomersClean).filter_by(email=email).first()
-            if existing:
-                debug_logger.debug(f"[{JOB_NAME}] Found existing master customer by email={email} -> id={existing.id}")
-                return existing.id
-        except Exception as e:
-            debug_logger.warning(f"[{JOB_NAME}] Error querying master customer by email {email}: {e}")
-    
-    # No existing customer found - need email to create new record
-    if not email:
-        debug_logger.warning(f"[{JOB_NAME}] Cannot create master customer: no email provided (customer_id={customer_id_from_payload})")
+
+    def __init__(self, max_size: int = MASTER_CACHE_SIZE):
+        self.max_size = max_size
+        self._ids: "OrderedDict[Tuple[str, object], int]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "found": 0, "created": 0, "evicted": 0}
+
+    def get(self, key: Tuple[str, object]) -> Optional[int]:
+        mid = self._ids.get(key)
+        if mid is not None:
+            self._ids.move_to_end(key)
+        return mid
+
+    def put(self, key: Tuple[str, object], mid: int) -> None:
+        self._ids[key] = mid
+        self._ids.move_to_end(key)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+            self.stats["evicted"] += 1
+
+def _customer_id_key(v) -> Optional[int]:
+    """customers_clean.customer_id is BIGINT: payload ids as ints, None if not numeric."""
+    if v is None or isinstance(v, bool):
         return None
-    
-    # Create new master customer record
     try:
-        master_customer = {
-            "user_id": user_id,
-            "raw_id": raw_id, 
-            "item_idx": item_idx,
-            "created_at": created_dt.astimezone(timezone.utc).replace(tzinfo=None),
-            "day": day_iso,
-            "source_label": label,
-            "customer_id": payload.get("customer_id"),
-            "email": email,
-            "first_name": payload.get("first_name"),
-            "last_name": payload.get("last_name"),
-            "phone": payload.get("phone"),
-            "city": payload.get("city"),
-            "state": payload.get("state"),
-            "country": payload.get("country"),
-            "zipcode": payload.get("zipcode"),
-            "address": payload.get("address"),
-            "activity_status": _customer_status(payload) or None,
-            "subscription_status": payload.get("subscription_status"),
-            "unsubscribed_on": None,
-            "last_login": _parse_dt(payload.get("last_login"), None),
-            "signup_date": _parse_dt(payload.get("signup_date"), None).date() if _parse_dt(payload.get("signup_date"), None) else None,
-            "total_spend_cents": _extract_revenue_cents(payload),
-            "subscription_value_cents": 0,
-            "raw_payload_json": _json_dump(payload),
-        }
-        
+        n = int(str(v).strip())
+    except (TypeError, ValueError):
+        return None
+    return n or None
+
+def _identity_keys(email: str, payload: dict) -> List[Tuple[str, object]]:
+    """Lookup keys in priority order: customer_id from the payload first, then email."""
+    cid = _customer_id_key(payload.get("customer_id"))
+    keys: List[Tuple[str, object]] = [("cid", cid)] if cid else []
+    keys.append(("email", email))
+    return keys
+
+def _master_customer_row(email: str, payload: dict, user_id: int, raw_id: int, item_idx: int,
+                         created_dt: datetime, day_iso: str, label: str) -> Dict[str, object]:
+    """New customers_clean row for the first payload seen for a customer."""
+    last_login = _parse_dt(payload.get("last_login"), None)
+    signup = _parse_dt(payload.get("signup_date"), None)
+    return {
+        "user_id": user_id,
+        "raw_id": raw_id,
+        "item_idx": item_idx,
+        "created_at": created_dt.astimezone(timezone.utc).replace(tzinfo=None),
+        "day": day_iso,
+        "source_label": label,
+        "customer_id": _customer_id_key(payload.get("customer_id")),
+        "email": email,
+        "first_name": payload.get("first_name"),
+        "last_name": payload.get("last_name"),
+        "phone": payload.get("phone"),
+        "city": payload.get("city"),
+        "state": payload.get("state"),
+        "country": payload.get("country"),
+        "zipcode": payload.get("zipcode"),
+        "address": payload.get("address"),
+        "activity_status": _customer_status(payload) or None,
+        "subscription_status": payload.get("subscription_status"),
+        "unsubscribed_on": None,
         # Normalize datetime to naive UTC
-        if master_customer["last_login"]:
-            master_customer["last_login"] = master_customer["last_login"].astimezone(timezone.utc).replace(tzinfo=None)
-        
-        # Insert master customer record with ON DUPLICATE KEY handling
-        stmt = mysql_insert(CustomersClean.__table__).values(**master_customer)
-        stmt = stmt.on_duplicate_key_update(
-            # On duplicate email or customer_id, update key fields and keep existing record
+        "last_login": last_login.astimezone(timezone.utc).replace(tzinfo=None) if last_login else None,
+        "signup_date": signup.date() if signup else None,
+        "total_spend_cents": _extract_revenue_cents(payload),
+        "subscription_value_cents": 0,
+        "raw_payload_json": _json_dump(payload),
+    }
+
+def _master_insert_stmt():
+    """INSERT ... ON DUPLICATE KEY UPDATE for new masters (a concurrent insert of the same email / customer_id keeps its row)."""
+    global _MASTER_INSERT
+    if _MASTER_INSERT is None:
+        stmt = mysql_insert(CustomersClean.__table__)
+        _MASTER_INSERT = stmt.on_duplicate_key_update(
             activity_status=stmt.inserted.activity_status,
             last_login=stmt.inserted.last_login,
             total_spend_cents=stmt.inserted.total_spend_cents,
             # Ensure customer_id is set if it wasn't before
-            customer_id=stmt.inserted.customer_id
+            customer_id=stmt.inserted.customer_id,
         )
-        result = db.session.execute(stmt)
-        db.session.flush()  # Get the ID without committing
-        
-        # For duplicate key updates, lastrowid might be 0, so query for the existing record
-        if result.lastrowid:
-            new_id = result.lastrowid
-            debug_logger.info(f"[{JOB_NAME}] Created new master customer id={new_id} for email={email} customer_id={customer_id_from_payload}")
-        else:
-            # Duplicate key - find existing record by email or customer_id
-            existing = None
-            if customer_id_from_payload:
-                existing = db.session.query(CustomersClean).filter_by(customer_id=customer_id_from_payload).first()
-            if not existing and email:
-                existing = db.session.query(CustomersClean).filter_by(email=email).first()
-            
-            new_id = existing.id if existing else None
-            debug_logger.info(f"[{JOB_NAME}] Found existing master customer id={new_id} for email={email} customer_id={customer_id_from_payload}")
-        
-        return new_id
-        
+    return _MASTER_INSERT
+
+def _load_master_ids(column, values: List[object], kind: str, cache: _IdentityCache) -> None:
+    """One IN query per MASTER_LOOKUP_CHUNK values; fills the cache with what exists."""
+    tbl = CustomersClean.__table__
+    for i in range(0, len(values), MASTER_LOOKUP_CHUNK):
+        chunk = values[i:i + MASTER_LOOKUP_CHUNK]
+        for mid, value in db.session.execute(select(tbl.c.id, column).where(column.in_(chunk))).all():
+            if value is None:
+                continue
+            key = (kind, _customer_id_key(value) if kind == "cid" else str(value).lower())
+            if cache.get(key) is None:
+                cache.put(key, int(mid))
+                cache.stats["found"] += 1
+
+def _resolve_master_customers(items: List[tuple], cache: _IdentityCache) -> Dict[Tuple[str, object], int]:
+    """
+    Master customer ids for a batch. items: (email, payload, user_id, raw_id, item_idx,
+    created_dt, day_iso, label) for payloads with an email, in processing order.
+
+    Same priority as a per-payload lookup (customer_id, then email; otherwise the first
+    payload for a customer creates it), but with one IN query per key kind for what
+    the cache doesn't know and one multi-row insert for the new masters.
+    Returns {identity key: id} for every key of the batch that resolved; a new master
+    only answers for the email / customer_id stored on its row.
+    """
+    resolved: Dict[Tuple[str, object], int] = {}
+    if not items:
+        return resolved
+
+    item_keys = [_identity_keys(it[0], it[1]) for it in items]
+    unknown: Dict[str, Set[object]] = {"cid": set(), "email": set()}
+    for keys in item_keys:
+        for key in keys:
+            if key in resolved or key[1] in unknown[key[0]]:
+                continue
+            mid = cache.get(key)
+            if mid is not None:
+                resolved[key] = mid
+                cache.stats["hits"] += 1
+            else:
+                unknown[key[0]].add(key[1])
+                cache.stats["misses"] += 1
+
+    tbl = CustomersClean.__table__
+    try:
+        if unknown["cid"]:
+            _load_master_ids(tbl.c.customer_id, sorted(unknown["cid"]), "cid", cache)
+        if unknown["email"]:
+            _load_master_ids(tbl.c.email, sorted(unknown["email"]), "email", cache)
     except Exception as e:
-        debug_logger.error(f"[{JOB_NAME}] Failed to create master customer for {email}: {e}")
-        return None
+        debug_logger.warning(f"[{JOB_NAME}] Master customer lookup failed: {e}")
+    for kind, values in unknown.items():
+        for value in values:
+            mid = cache.get((kind, value))
+            if mid is not None:
+                resolved[(kind, value)] = mid
+
+    # Payloads nothing matched: the first one per customer (by either key) creates it
+    new_rows: List[Dict[str, object]] = []
+    owner: Dict[Tuple[str, object], int] = {}  # identity key -> index into new_rows
+    for it, keys in zip(items, item_keys):
+        if any(k in resolved for k in keys):
+            continue
+        idx = next((owner[k] for k in keys if k in owner), None)
+        if idx is None:
+            idx = len(new_rows)
+            new_rows.append(_master_customer_row(*it))
+        row = new_rows[idx]
+        for k in keys:
+            # Only keys stored on the row: a per-payload lookup never matches the others
+            if k[1] == (row["customer_id"] if k[0] == "cid" else row["email"]):
+                owner.setdefault(k, idx)
+    if not new_rows:
+        return resolved
+
+    try:
+        db.session.execute(_master_insert_stmt(), new_rows)
+        # Multi-row inserts don't report each id; read them back by email
+        emails = sorted({r["email"] for r in new_rows})
+        created = {}
+        for i in range(0, len(emails), MASTER_LOOKUP_CHUNK):
+            chunk = emails[i:i + MASTER_LOOKUP_CHUNK]
+            stmt = select(tbl.c.id, tbl.c.email).where(tbl.c.email.in_(chunk))
+            created.update({str(email).lower(): int(mid) for mid, email in db.session.execute(stmt).all()})
+    except Exception as e:
+        debug_logger.error(f"[{JOB_NAME}] Failed to create {len(new_rows)} master customers: {e}")
+        return resolved
+
+    row_ids = [created.get(r["email"]) for r in new_rows]
+    created_count = sum(1 for mid in row_ids if mid is not None)
+    # An insert that met an existing customer_id under another email updated that row
+    orphans = {r["customer_id"]: i for i, r in enumerate(new_rows) if row_ids[i] is None and r["customer_id"]}
+    if orphans:
+        try:
+            stmt = select(tbl.c.id, tbl.c.customer_id).where(tbl.c.customer_id.in_(sorted(orphans)))
+            for mid, cid in db.session.execute(stmt).all():
+                row_ids[orphans[_customer_id_key(cid)]] = int(mid)
+        except Exception as e:
+            debug_logger.warning(f"[{JOB_NAME}] Master customer lookup by customer_id failed: {e}")
+    orphan_idx = set(orphans.values())
+    for key, idx in owner.items():
+        mid = row_ids[idx]
+        if mid is None or key in resolved:
+            continue
+        if key[0] == "email" and idx in orphan_idx:
+            continue  # that row kept its own email; only the customer_id leads there
+        resolved[key] = mid
+        cache.put(key, mid)
+    cache.stats["created"] += created_count
+    debug_logger.info(f"[{JOB_NAME}] Created {created_count} master customers")
+    return resolved
+
+# ------------------------------------------------------------------------------------
+# Payload parsing (pure: runs in the task process, or in pool workers when workers > 1)
+
+def _parse_rows(rows: List[tuple], since_ymd: Optional[str], until_ymd: Optional[str],
+                scope_user_ids: Optional[List[int]]) -> Tuple[List[tuple], Dict[str, int]]:
+    """
+    Parse and normalize raw rows, given as (id, user_id, record_time, content) tuples.
+    No DB access, so serial and pooled runs produce the same output.
+
+    Returns (staged, counts). staged holds one tuple per payload that passed the filters,
+    in row / item order:
+        (raw_id, user_id, item_idx, type, created_dt, day_iso, label, email,
+         payload (only when there is an email, for master customers), rec)
+    rec is the leads_clean / orders_clean record without master_customer_id, or None
+    for other types.
+    """
+    staged: List[tuple] = []
+    counts = {"processed_payloads": 0, "skipped_no_time": 0}
+    for row_id, user_id, record_time, content in rows:
+        # Log raw row envelope (not full payload yet)
+        debug_logger.info(f"[{JOB_NAME}] raw_row id={row_id} user_id={user_id} record_time={record_time}")
+
+        # Iterate payloads; maintain item index per raw row
+        for item_idx, payload in enumerate(_iter_payloads(content)):
+            counts["processed_payloads"] += 1
+            # Log first 3 payloads verbosely; others summarized
+            if item_idx < 3:
+                debug_logger.info(f"[{JOB_NAME}] payload@{row_id}[{item_idx}] keys={list(payload.keys())[:15]}")
+            else:
+                debug_logger.debug(f"[{JOB_NAME}] payload@{row_id}[{item_idx}] keys={list(payload.keys())[:15]}")
+
+            t = _detect_type(payload)
+            created_dt = _created_at(payload, record_time)
+            if not created_dt:
+                counts["skipped_no_time"] += 1
+                debug_logger.warning(f"[{JOB_NAME}] skip payload (no time) row_id={row_id} idx={item_idx}")
+                continue
+            if created_dt.tzinfo is None:
+                created_dt = created_dt.replace(tzinfo=timezone.utc)
+            day_iso = created_dt.astimezone(timezone.utc).date().isoformat()
+            label = _source_label(payload, t)
+            email = _extract_email(payload)
+
+            # Scope filter by day/user (only applies when force_reprocess scope used)
+            if since_ymd and day_iso < since_ymd:
+                debug_logger.debug(f"[{JOB_NAME}] scoped-out (before since) row_id={row_id} idx={item_idx} day={day_iso}")
+                continue
+            if until_ymd and day_iso > until_ymd:
+                debug_logger.debug(f"[{JOB_NAME}] scoped-out (after until) row_id={row_id} idx={item_idx} day={day_iso}")
+                continue
+            if scope_user_ids and user_id not in scope_user_ids:
+                debug_logger.debug(f"[{JOB_NAME}] scoped-out user row_id={row_id} idx={item_idx} user_id={user_id}")
+                continue
+
+            # Common fields for all upserts
+            common = {
+                "user_id": user_id,
+                "raw_id": row_id,
+                "item_idx": item_idx,
+                "created_at": created_dt.astimezone(timezone.utc).replace(tzinfo=None),
+                "day": day_iso,
+                "source_label": label,
+                "raw_payload_json": _json_dump(payload),
+            }
+
+            # Dispatch by detected type
+            rec = None
+            if t == "lead":
+                # Extract lead fields
+                rec = dict(common)
+                rec.update({
+                    "is_organic": 1 if str(payload.get("is_organic", "")).lower() in {"1","true","yes"} or payload.get("is_organic") is True else 0,
+                    "platform": payload.get("platform"),
+                    "channel": payload.get("channel"),
+                    "network": payload.get("network"),
+                    "utm_source": payload.get("utm_source"),
+                    "utm_medium": payload.get("utm_medium"),
+                    "utm_campaign": payload.get("utm_campaign"),
+                    "utm_term": payload.get("utm_term"),
+                    "utm_content": payload.get("utm_content"),
+                    "campaign_id": payload.get("campaign_id"),
+                    "campaign_name": payload.get("campaign_name"),
+                    "adset_id": payload.get("adset_id"),
+                    "adset_name": payload.get("adset_name"),
+                    "ad_id": payload.get("ad_id"),
+                    "ad_name": payload.get("ad_name"),
+                    "form_id": payload.get("form_id"),
+                    "form_name": payload.get("form_name"),
+                    "lead_status": _lead_status(payload) or None,
+                    "email": email or None,
+                    "first_name": payload.get("first_name"),
+                    "last_name": payload.get("last_name"),
+                    "phone": payload.get("phone"),
+                    "city": payload.get("city"),
+                    "state": payload.get("state"),
+                    "country": payload.get("country"),
+                    "zipcode": payload.get("zipcode"),
+                    "referrer": payload.get("referrer") or payload.get("referral"),
+                    "cost_cents": _ad_spend_cents(payload),
+                    "master_customer_id": None,  # set by the parent after identity resolution
+                })
+
+            elif t == "order":
+                # Extract order fields
+                rec = dict(common)
+                rec.update({
+                    "order_number": str(payload.get("number") or payload.get("order_id") or "") or None,
+                    "transaction_id": payload.get("transaction_id"),
+                    "status": _order_status(payload) or None,
+                    "customer_id": payload.get("customer_id"),
+                    "email": email or None,
+                    "currency": payload.get("currency"),
+                    "payment_method": payload.get("payment_method") or payload.get("payment_method_title"),
+                    "created_via": payload.get("created_via"),
+                    "date_paid": _parse_dt(payload.get("date_paid") or payload.get("date_paid_gmt"), None),
+                    "date_completed": _parse_dt(payload.get("date_completed") or payload.get("date_completed_gmt"), None),
+                    "total_cents": _to_cents(payload.get("total")),
+                    "subtotal_cents": _to_cents(payload.get("subtotal")),
+                    "discount_total_cents": _to_cents(payload.get("discount_total") or payload.get("discount_tax")),
+                    "shipping_total_cents": _to_cents(payload.get("shipping_total") or payload.get("shipping_tax")),
+                    "tax_total_cents": _to_cents(payload.get("total_tax") or payload.get("cart_tax")),
+                    "store_credit_cents": _to_cents(payload.get("store_credit_used")),
+                    "subscription_value_cents": 0,
+                    "line_items": str(payload.get("line_items") or payload.get("items") or payload.get("products") or "") or None,
+                    "master_customer_id": None,  # set by the parent after identity resolution
+                })
+                # crude subscription detection
+                items_blob = (rec["line_items"] or "").lower()
+                if any(term in items_blob for term in ["subscription", "monthly", "yearly", "recurring", "plan"]):
+                    rec["subscription_value_cents"] = rec.get("total_cents", 0)
+
+                # Normalize datetimes to naive UTC for MySQL DATETIME
+                if rec["date_paid"]:
+                    rec["date_paid"] = rec["date_paid"].astimezone(timezone.utc).replace(tzinfo=None)
+                if rec["date_completed"]:
+                    rec["date_completed"] = rec["date_completed"].astimezone(timezone.utc).replace(tzinfo=None)
+
+            staged.append((row_id, user_id, item_idx, t, created_dt, day_iso, label, email,
+                           payload if email else None, rec))
+
+    return staged, counts
+
+def _init_parse_worker(engine) -> None:
+    """
+    Pool initializer. A forked worker inherits the task's engine pool, including the
+    connection holding GET_LOCK; dispose(close=False) drops the child's references
+    without closing (or sending COM_QUIT on) the parent's sockets.
+    """
+    engine.dispose(close=False)
+
+def _parse_batch(pool, workers: int, rows: List[tuple], filters: tuple) -> Tuple[List[tuple], Dict[str, int]]:
+    """_parse_rows over a raw batch, split across the pool when there is one (order kept)."""
+    if pool is None or len(rows) < 2:
+        return _parse_rows(rows, *filters)
+    size = max(PARSE_CHUNK_MIN, -(-len(rows) // (workers * PARSE_CHUNKS_PER_WORKER)))
+    chunks = [rows[i:i + size] for i in range(0, len(rows), size)]
+    staged: List[tuple] = []
+    counts = {"processed_payloads": 0, "skipped_no_time": 0}
+    for part, part_counts in pool.starmap(_parse_rows, [(chunk, *filters) for chunk in chunks]):
+        staged.extend(part)
+        for k, v in part_counts.items():
+            counts[k] += v
+    return staged, counts
+
+# ------------------------------------------------------------------------------------
+# Raw row reader
+
+def _raw_batches(after_id: int = 0, batch_size: int = BATCH_SIZE, until_id: Optional[int] = None,
+                 user_ids: Optional[List[int]] = None) -> Iterator[List[Row]]:
+    """
+    Yield user_dataset_raw rows with after_id < id <= until_id (optionally only
+    user_ids) in id order, batch_size at a time, as lightweight Core rows
+    (row.id, row.user_id, row.record_time, row.content).
+
+    Each batch is its own short keyset query starting after the last id seen, so
+    MySQL seeks straight to it on the primary key. One long server-side cursor would
+    avoid even that seek, but the batch is written back on the same session between
+    reads, and an unbuffered cursor left open for minutes ties up the connection
+    and trips net_write_timeout.
+    """
+    last_id = after_id
+    while True:
+        stmt = select(*RAW_COLUMNS).where(RAW_TABLE.c.id > last_id)
+        if until_id is not None:
+            stmt = stmt.where(RAW_TABLE.c.id <= until_id)
+        if user_ids:
+            stmt = stmt.where(RAW_TABLE.c.user_id.in_(user_ids))
+        stmt = stmt.order_by(RAW_TABLE.c.id.asc()).limit(batch_size)
+        rows = db.session.execute(stmt).all()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1].id
+
+# ------------------------------------------------------------------------------------
+# Watermarks (AnalyticsEtlState)
+
+def _settled_max_id() -> int:
+    """
+    Newest raw id whose row was ingested RAW_SETTLE_SECONDS or more ago (raw writers
+    stamp ingested_at in UTC just before their short insert + commit), so no writer
+    can still be committing a lower id.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=RAW_SETTLE_SECONDS)
+    stmt = (
+        select(RAW_TABLE.c.id)
+        .where(RAW_TABLE.c.ingested_at < cutoff)
+        .order_by(RAW_TABLE.c.id.desc())
+        .limit(1)
+    )
+    return int(db.session.execute(stmt).scalar() or 0)
+
+def _etl_states(jobs: Iterable[str]) -> Dict[str, AnalyticsEtlState]:
+    """State rows for jobs, created (at 0) where missing. Caller commits."""
+    jobs = list(jobs)
+    if not jobs:
+        return {}
+    states = {
+        st.job: st
+        for st in db.session.query(AnalyticsEtlState).filter(AnalyticsEtlState.job.in_(jobs)).all()
+    }
+    for job in jobs:
+        if job not in states:
+            states[job] = AnalyticsEtlState(job=job, last_raw_id=0)
+            db.session.add(states[job])
+    return states
+
+def _drop_stale_run_states() -> None:
+    cutoff = datetime.now() - RUN_STATE_MAX_AGE
+    n = (
+        db.session.query(AnalyticsEtlState)
+        .filter(AnalyticsEtlState.job.like(f"{RUN_STATE_PREFIX}%"), AnalyticsEtlState.last_run_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+    if n:
+        debug_logger.warning(f"[{JOB_NAME}] Dropped {n} progress rows of runs that never finished")
 
 # ------------------------------------------------------------------------------------
 # Create clean staging tables using SQLAlchemy models
@@ -492,16 +893,21 @@ def transform_data_task(self, _previous_result=None, **kwargs):
         since: Optional['YYYY-MM-DD'] inclusive lower bound (on created_at day)
         until: Optional['YYYY-MM-DD'] inclusive upper bound
         create_tables: bool (default True) -> run CREATE TABLE IF NOT EXISTS
+        flush_size: Optional[int] records per multi-row upsert (default clean_writer.FLUSH_SIZE)
+        workers: Optional[int] parse processes (default TRANSFORM_WORKERS; 1 = parse in-process)
     """
     force_reprocess: bool = bool(kwargs.get("force_reprocess", False))
     scope_user_ids: Optional[List[int]] = kwargs.get("user_ids")
     since_ymd: Optional[str] = _ymd(kwargs.get("since"))
     until_ymd: Optional[str] = _ymd(kwargs.get("until"))
     create_tables: bool = kwargs.get("create_tables", True)
+    flush_size: Optional[int] = kwargs.get("flush_size")
+    workers: int = max(1, int(kwargs.get("workers") or current_app.config.get("TRANSFORM_WORKERS") or 1))
 
     t0 = time.monotonic()
     debug_logger.info(f"[{JOB_NAME}] START task_id={self.request.id} force_reprocess={force_reprocess} "
-                      f"user_ids={scope_user_ids} since={since_ymd} until={until_ymd} create_tables={create_tables}")
+                      f"user_ids={scope_user_ids} since={since_ymd} until={until_ymd} create_tables={create_tables} "
+                      f"workers={workers}")
     
     # Initial progress
     self.update_state(state="PROGRESS", meta={
@@ -535,9 +941,44 @@ def transform_data_task(self, _previous_result=None, **kwargs):
             db.session.rollback()
             debug_logger.error(f"[{JOB_NAME}] FAILED to release lock key={LOCK_KEY}")
 
+    pool = None
     try:
-        # Clear existing clean data if force_reprocess is requested
-        if force_reprocess:
+        # Where to start: an earlier attempt of this task (autoretry), a full rebuild / day
+        # scoped scan from the start, or the watermark(s)
+        day_scoped = bool(since_ymd or until_ymd)
+        run_job = f"{RUN_STATE_PREFIX}{self.request.id}"
+        user_jobs = {int(uid): f"{USER_STATE_PREFIX}{int(uid)}" for uid in scope_user_ids or []}
+        watermark_jobs = [] if day_scoped else (list(user_jobs.values()) or [JOB_NAME])
+
+        _drop_stale_run_states()
+        resume = None
+        if self.request.retries:
+            resume = db.session.query(AnalyticsEtlState).filter_by(job=run_job).first()
+        watermarks = _etl_states(watermark_jobs)
+        run_state = resume
+        if resume is None and (force_reprocess or day_scoped):
+            run_state = _etl_states([run_job])[run_job]
+
+        # Per-user floors: a user-scoped run skips rows at or below that user's own watermark
+        user_floor: Dict[int, int] = {}
+        if resume is not None:
+            start_id = int(resume.last_raw_id or 0)
+        elif force_reprocess or day_scoped:
+            start_id = 0
+        else:
+            floors = [int(st.last_raw_id or 0) for st in watermarks.values()]
+            start_id = min(floors) if floors else 0
+            if user_jobs:
+                user_floor = {uid: int(watermarks[job].last_raw_id or 0) for uid, job in user_jobs.items()}
+        debug_logger.info(
+            f"[{JOB_NAME}] start_id={start_id} resumed={resume is not None} day_scoped={day_scoped} "
+            f"watermarks={ {job: st.last_raw_id for job, st in watermarks.items()} }"
+        )
+
+        # Clear existing clean data if force_reprocess is requested (not again on a resumed retry)
+        if force_reprocess and resume is not None:
+            debug_logger.warning(f"[{JOB_NAME}] Resuming force reprocess after id={start_id}; clean tables already cleared")
+        elif force_reprocess:
             params: Dict[str, object] = {}
             where = []
             if scope_user_ids:
@@ -557,8 +998,12 @@ def transform_data_task(self, _previous_result=None, **kwargs):
                 result = db.session.execute(text(sql), params)
                 rows_deleted = result.rowcount if hasattr(result, 'rowcount') else 'unknown'
                 debug_logger.info(f"[{JOB_NAME}] Deleted {rows_deleted} rows from {tbl}")
+            # The rebuild redoes everything those watermarks covered
+            for st in watermarks.values():
+                st.last_raw_id = 0
             db.session.commit()
             debug_logger.warning(f"[{JOB_NAME}] Clean tables cleared for reprocessing")
+        db.session.commit()
 
         totals = {
             "loops": 0,
@@ -569,15 +1014,14 @@ def transform_data_task(self, _previous_result=None, **kwargs):
             "upserts_leads": 0,
             "upserts_customers": 0,
             "upserts_orders": 0,
+            "parse_ms": 0,
         }
 
-        # Get total count for progress tracking
-        total_raw_records = 0
-        try:
-            total_raw_records = db.session.query(db.func.count(UserDatasetRaw.id)).scalar() or 0
-            debug_logger.info(f"[{JOB_NAME}] Total raw records to process: {total_raw_records}")
-        except Exception as e:
-            debug_logger.warning(f"[{JOB_NAME}] Could not get total count: {e}")
+        # Upper bound for this run (newer rows are next run's) and an id-span progress
+        # estimate; a backward primary key scan over recent rows instead of COUNT(*)
+        end_id = _settled_max_id()
+        total_raw_records = max(int(end_id) - start_id, 0)
+        debug_logger.info(f"[{JOB_NAME}] Raw ids to process: ({start_id}, {end_id}] (~{total_raw_records} rows)")
 
         self.update_state(state="PROGRESS", meta={
             "step": "processing",
@@ -587,176 +1031,94 @@ def transform_data_task(self, _previous_result=None, **kwargs):
             "processed_records": 0
         })
 
-        # Process ALL raw data in batches, let MySQL handle duplicates via UNIQUE constraints
-        current_offset = 0
-        
+        writer = CleanUpsertWriter(flush_size)
+        identities = _IdentityCache()
+        if workers > 1:
+            # Workers only parse (no DB); fork before the batches so they start once per run
+            pool = Pool(processes=workers, initializer=_init_parse_worker, initargs=(db.engine,))
+
+        # Process ALL raw data in keyset batches, let MySQL handle duplicates via UNIQUE constraints
+        current_offset = 0  # raw rows processed so far
+        batches = _raw_batches(start_id, BATCH_SIZE, end_id, scope_user_ids)
+
         while True:
             totals["loops"] += 1
             batch_start = time.monotonic()
 
-            # Fetch a page of raw rows (no cursor filtering - process everything)
+            # Fetch the next batch of raw rows (no cursor filtering - process everything)
             try:
-                rows: List[UserDatasetRaw] = (
-                    db.session.query(UserDatasetRaw)
-                    .order_by(UserDatasetRaw.id.asc())
-                    .offset(current_offset)
-                    .limit(BATCH_SIZE)
-                    .all()
-                )
+                rows: List[Row] = next(batches, [])
             except Exception as e:
-                debug_logger.exception(f"[{JOB_NAME}] FAILED to fetch raw rows at offset={current_offset}: {e}")
+                debug_logger.exception(f"[{JOB_NAME}] FAILED to fetch raw rows after {current_offset} rows: {e}")
                 raise
 
             if not rows:
-                debug_logger.info(f"[{JOB_NAME}] No more rows at offset={current_offset}. Processing complete.")
+                debug_logger.info(f"[{JOB_NAME}] No more rows after {current_offset} rows. Processing complete.")
                 break
 
             totals["batches"] += 1
             totals["fetched"] += len(rows)
             min_id, max_id = rows[0].id, rows[-1].id
-            debug_logger.info(f"[{JOB_NAME}] Batch {totals['batches']} fetched size={len(rows)} id_range=[{min_id},{max_id}] offset={current_offset}")
+            debug_logger.info(f"[{JOB_NAME}] Batch {totals['batches']} fetched size={len(rows)} id_range=[{min_id},{max_id}] processed={current_offset}")
 
             # In-batch counters for logging
             leads_batch = customers_batch = orders_batch = 0
 
-            for row in rows:
-                # Log raw row envelope (not full payload yet)
-                debug_logger.info(f"[{JOB_NAME}] raw_row id={row.id} user_id={row.user_id} record_time={getattr(row,'record_time',None)}")
-
-                # Iterate payloads; maintain item index per raw row
-                for item_idx, payload in enumerate(_iter_payloads(row.content)):
-                    totals["processed_payloads"] += 1
-                    # Log first 3 payloads verbosely; others summarized
-                    if item_idx < 3:
-                        debug_logger.info(f"[{JOB_NAME}] payload@{row.id}[{item_idx}] keys={list(payload.keys())[:15]}")
-                    else:
-                        debug_logger.debug(f"[{JOB_NAME}] payload@{row.id}[{item_idx}] keys={list(payload.keys())[:15]}")
-
-                    t = _detect_type(payload)
-                    created_dt = _created_at(payload, getattr(row, "record_time", None))
-                    if not created_dt:
-                        totals["skipped_no_time"] += 1
-                        debug_logger.warning(f"[{JOB_NAME}] skip payload (no time) row_id={row.id} idx={item_idx}")
-                        continue
-                    if created_dt.tzinfo is None:
-                        created_dt = created_dt.replace(tzinfo=timezone.utc)
-                    day_iso = created_dt.astimezone(timezone.utc).date().isoformat()
-                    label = _source_label(payload, t)
-                    email = _extract_email(payload)
-
-                    # Scope filter by day/user (only applies when force_reprocess scope used)
-                    if since_ymd and day_iso < since_ymd:
-                        debug_logger.debug(f"[{JOB_NAME}] scoped-out (before since) row_id={row.id} idx={item_idx} day={day_iso}")
-                        continue
-                    if until_ymd and day_iso > until_ymd:
-                        debug_logger.debug(f"[{JOB_NAME}] scoped-out (after until) row_id={row.id} idx={item_idx} day={day_iso}")
-                        continue
-                    if scope_user_ids and row.user_id not in scope_user_ids:
-                        debug_logger.debug(f"[{JOB_NAME}] scoped-out user row_id={row.id} idx={item_idx} user_id={row.user_id}")
-                        continue
-
-                    # Get or create master customer record for linking
-                    master_customer_id = None
-                    if email:
-                        master_customer_id = _get_or_create_master_customer(
-                            email, payload, row.user_id, row.id, item_idx, created_dt, day_iso, label
-                        )
-                        
-                    # Common fields for all upserts
-                    common = {
-                        "user_id": row.user_id,
-                        "raw_id": row.id,
-                        "item_idx": item_idx,
-                        "created_at": created_dt.astimezone(timezone.utc).replace(tzinfo=None),
-                        "day": day_iso,
-                        "source_label": label,
-                        "raw_payload_json": _json_dump(payload),
-                    }
-
-                    # Dispatch by detected type
-                    if t == "lead":
-                        # Extract lead fields
-                        rec = dict(common)
-                        rec.update({
-                            "is_organic": 1 if str(payload.get("is_organic", "")).lower() in {"1","true","yes"} or payload.get("is_organic") is True else 0,
-                            "platform": payload.get("platform"),
-                            "channel": payload.get("channel"),
-                            "network": payload.get("network"),
-                            "utm_source": payload.get("utm_source"),
-                            "utm_medium": payload.get("utm_medium"),
-                            "utm_campaign": payload.get("utm_campaign"),
-                            "utm_term": payload.get("utm_term"),
-                            "utm_content": payload.get("utm_content"),
-                            "campaign_id": payload.get("campaign_id"),
-                            "campaign_name": payload.get("campaign_name"),
-                            "adset_id": payload.get("adset_id"),
-                            "adset_name": payload.get("adset_name"),
-                            "ad_id": payload.get("ad_id"),
-                            "ad_name": payload.get("ad_name"),
-                            "form_id": payload.get("form_id"),
-                            "form_name": payload.get("form_name"),
-                            "lead_status": _lead_status(payload) or None,
-                            "email": email or None,
-                            "first_name": payload.get("first_name"),
-                            "last_name": payload.get("last_name"),
-                            "phone": payload.get("phone"),
-                            "city": payload.get("city"),
-                            "state": payload.get("state"),
-                            "country": payload.get("country"),
-                            "zipcode": payload.get("zipcode"),
-                            "referrer": payload.get("referrer") or payload.get("referral"),
-                            "cost_cents": _ad_spend_cents(payload),
-                            "master_customer_id": master_customer_id,
-                        })
-                        _upsert_row(LEADS_TBL, rec)
-                        leads_batch += 1
-                        debug_logger.debug(f"[{JOB_NAME}] UPSERT lead row_id={row.id} idx={item_idx} email={email} label={label} day={day_iso}")
-
-                    elif t == "order":
-                        # Extract order fields
-                        rec = dict(common)
-                        rec.update({
-                            "order_number": str(payload.get("number") or payload.get("order_id") or "") or None,
-                            "transaction_id": payload.get("transaction_id"),
-                            "status": _order_status(payload) or None,
-                            "customer_id": payload.get("customer_id"),
-                            "email": email or None,
-                            "currency": payload.get("currency"),
-                            "payment_method": payload.get("payment_method") or payload.get("payment_method_title"),
-                            "created_via": payload.get("created_via"),
-                            "date_paid": _parse_dt(payload.get("date_paid") or payload.get("date_paid_gmt"), None),
-                            "date_completed": _parse_dt(payload.get("date_completed") or payload.get("date_completed_gmt"), None),
-                            "total_cents": _to_cents(payload.get("total")),
-                            "subtotal_cents": _to_cents(payload.get("subtotal")),
-                            "discount_total_cents": _to_cents(payload.get("discount_total") or payload.get("discount_tax")),
-                            "shipping_total_cents": _to_cents(payload.get("shipping_total") or payload.get("shipping_tax")),
-                            "tax_total_cents": _to_cents(payload.get("total_tax") or payload.get("cart_tax")),
-                            "store_credit_cents": _to_cents(payload.get("store_credit_used")),
-                            "subscription_value_cents": 0,
-                            "line_items": str(payload.get("line_items") or payload.get("items") or payload.get("products") or "") or None,
-                            "master_customer_id": master_customer_id,
-                        })
-                        # crude subscription detection
-                        items_blob = (rec["line_items"] or "").lower()
-                        if any(term in items_blob for term in ["subscription", "monthly", "yearly", "recurring", "plan"]):
-                            rec["subscription_value_cents"] = rec.get("total_cents", 0)
-
-                        # Normalize datetimes to naive UTC for MySQL DATETIME
-                        if rec["date_paid"]:
-                            rec["date_paid"] = rec["date_paid"].astimezone(timezone.utc).replace(tzinfo=None)
-                        if rec["date_completed"]:
-                            rec["date_completed"] = rec["date_completed"].astimezone(timezone.utc).replace(tzinfo=None)
-
-                        _upsert_row(ORDERS_TBL, rec)
-                        orders_batch += 1
-                        debug_logger.debug(f"[{JOB_NAME}] UPSERT order row_id={row.id} idx={item_idx} num={rec['order_number']} status={rec['status']} day={day_iso}")
-
-                    else:
-                        # Customer records are now handled in _get_or_create_master_customer()
-                        # This section handles any other unclassified data types
-                        debug_logger.debug(f"[{JOB_NAME}] Skipping unclassified record type row_id={row.id} idx={item_idx} type={t}")
-
-            # Commit once per batch for throughput
+            # Plain tuples (not Row objects) are what gets pickled to the pool
+            rows_in = [
+                (r.id, r.user_id, r.record_time, r.content)
+                for r in rows
+                # already transformed by an earlier run for this user
+                if not (user_floor and r.id <= user_floor.get(r.user_id, 0))
+            ]
+            parse_start = time.monotonic()
+            try:
+                staged, counts = _parse_batch(pool, workers, rows_in, (since_ymd, until_ymd, scope_user_ids))
+            except Exception as e:
+                debug_logger.exception(f"[{JOB_NAME}] Parse failure in batch id_range=[{min_id},{max_id}]: {e}")
+                raise
+            totals["parse_ms"] += int((time.monotonic() - parse_start) * 1000)
+            for k, v in counts.items():
+                totals[k] += v
+
+            # Master customers for the whole batch at once, then the clean rows
+            created_before = identities.stats["created"]
+            masters = _resolve_master_customers(
+                [(email, payload, user_id, row_id, item_idx, created_dt, day_iso, label)
+                 for row_id, user_id, item_idx, t, created_dt, day_iso, label, email, payload, rec in staged if email],
+                identities,
+            )
+            customers_batch = identities.stats["created"] - created_before
+
+            for row_id, user_id, item_idx, t, created_dt, day_iso, label, email, payload, rec in staged:
+                if rec is None:
+                    # Customer records are handled by _resolve_master_customers()
+                    # This section handles any other unclassified data types
+                    debug_logger.debug(f"[{JOB_NAME}] Skipping unclassified record type row_id={row_id} idx={item_idx} type={t}")
+                    continue
+                if email:
+                    rec["master_customer_id"] = next((masters[k] for k in _identity_keys(email, payload) if k in masters), None)
+
+                if t == "lead":
+                    writer.add(LEADS_TBL, rec)
+                    leads_batch += 1
+                    debug_logger.debug(f"[{JOB_NAME}] UPSERT lead row_id={row_id} idx={item_idx} email={email} label={label} day={day_iso}")
+                else:
+                    writer.add(ORDERS_TBL, rec)
+                    orders_batch += 1
+                    debug_logger.debug(f"[{JOB_NAME}] UPSERT order row_id={row_id} idx={item_idx} num={rec['order_number']} status={rec['status']} day={day_iso}")
+
+            # Write the batch's remaining rows, then commit them with the resume point
+            try:
+                writer.flush()
+            except Exception as e:
+                db.session.rollback()
+                debug_logger.exception(f"[{JOB_NAME}] Upsert failure in batch id_range=[{min_id},{max_id}]: {e}")
+                raise
+            for st in watermarks.values():
+                st.last_raw_id = max_id if force_reprocess else max(int(st.last_raw_id or 0), max_id)
+            if run_state is not None:
+                run_state.last_raw_id = max_id
             try:
                 db.session.commit()
             except Exception as e:
@@ -764,7 +1126,7 @@ def transform_data_task(self, _previous_result=None, **kwargs):
                 debug_logger.exception(f"[{JOB_NAME}] Commit failure after batch id_range=[{min_id},{max_id}]: {e}")
                 raise
 
-            # Advance offset for next batch
+            # The next batch starts after max_id (keyset); count what we've processed
             current_offset += len(rows)
             
             batch_ms = int((time.monotonic() - batch_start) * 1000)
@@ -774,7 +1136,7 @@ def transform_data_task(self, _previous_result=None, **kwargs):
 
             debug_logger.info(
                 f"[{JOB_NAME}] Batch {totals['batches']} committed leads={leads_batch} customers={customers_batch} "
-                f"orders={orders_batch} next_offset={current_offset} elapsed_ms={batch_ms}"
+                f"orders={orders_batch} last_id={max_id} processed={current_offset} elapsed_ms={batch_ms}"
             )
 
             # Update progress every batch
@@ -796,12 +1158,20 @@ def transform_data_task(self, _previous_result=None, **kwargs):
                 debug_logger.info(f"[{JOB_NAME}] Last batch (size {len(rows)} < {BATCH_SIZE}), processing complete")
                 break
 
+        # Every raw row up to end_id has been looked at (scoped runs skip other users' rows)
+        for st in watermarks.values():
+            st.last_raw_id = max(int(st.last_raw_id or 0), int(end_id))
+        if run_state is not None:
+            db.session.delete(run_state)
+        db.session.commit()
+
         dur_ms = int((time.monotonic() - t0) * 1000)
         debug_logger.info(
             f"[{JOB_NAME}] COMPLETE loops={totals['loops']} batches={totals['batches']} fetched={totals['fetched']} "
             f"processed_payloads={totals['processed_payloads']} leads_upserts={totals['upserts_leads']} "
             f"customers_upserts={totals['upserts_customers']} orders_upserts={totals['upserts_orders']} "
-            f"total_processed={current_offset} elapsed_ms={dur_ms}"
+            f"total_processed={current_offset} elapsed_ms={dur_ms} writes={writer.stats()} "
+            f"master_customers={identities.stats}"
         )
 
         # Final success progress
@@ -819,7 +1189,13 @@ def transform_data_task(self, _previous_result=None, **kwargs):
         return {
             "status": "ok",
             "total_processed": current_offset,
+            "start_id": start_id,
+            "end_id": int(end_id),
+            "resumed": resume is not None,
             "counts": totals,
+            "writes": writer.stats(),
+            "master_customers": dict(identities.stats),
+            "workers": workers,
             "elapsed_ms": dur_ms,
         }
 
@@ -827,34 +1203,7 @@ def transform_data_task(self, _previous_result=None, **kwargs):
         debug_logger.exception(f"[{JOB_NAME}] FATAL: {e}")
         raise
     finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
         _unlock()
-
-# ------------------------------------------------------------------------------------
-# Internal: SQLAlchemy-based upsert into clean staging tables
-def _upsert_row(table_name: str, rec: Dict[str, object]) -> None:
-    # Map table names to SQLAlchemy models
-    model_map = {
-        LEADS_TBL: LeadsClean,
-        CUSTOMERS_TBL: CustomersClean,
-        ORDERS_TBL: OrdersClean,
-    }
-    
-    model_class = model_map.get(table_name)
-    if not model_class:
-        raise ValueError(f"Unknown table name: {table_name}")
-    
-    # Use MySQL INSERT ... ON DUPLICATE KEY UPDATE with SQLAlchemy
-    insert_stmt = mysql_insert(model_class.__table__).values(**rec)
-    
-    # Build update dict excluding unique constraint fields
-    update_dict = {
-        col: insert_stmt.inserted[col] 
-        for col in rec.keys() 
-        if col not in ("user_id", "raw_id", "item_idx")
-    }
-    
-    upsert_stmt = insert_stmt.on_duplicate_key_update(**update_dict)
-    db.session.execute(upsert_stmt)
-    
-    # Verbose single-line trace of key fields
-    debug_logger.debug(f"UPSERT {table_name} key=(user_id={rec.get('user_id')}, raw_id={rec.get('raw_id')}, idx={rec.get('item_idx')})")
@@ -0,0 +1,155 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Batched writer for the clean staging tables (leads_clean, orders_clean).
+# - Records are buffered per table and written flush_size at a time as one executemany
+#   of a cached INSERT ... ON DUPLICATE KEY UPDATE (the driver sends it as multi-row
+#   VALUES), instead of building, compiling and running one statement per record.
+# - The statement is built once per (table, columns) and reused for every chunk, so
+#   SQLAlchemy compiles it once per process.
+# - Chunks run on db.session's connection, inside the caller's transaction: they commit
+#   (or roll back) together with the master customer inserts and the ETL watermark.
+#   A separate pooled connection would let the session come back on another
+#   connection, and its RELEASE_LOCK would then miss the GET_LOCK taken by the task.
+# - Each chunk runs in a SAVEPOINT. A lock wait timeout (1205) only undoes that
+#   statement, so the chunk is rolled back to its savepoint and retried with backoff.
+#   A deadlock (1213) makes InnoDB roll back the whole transaction and the savepoint
+#   with it; the error is raised so the caller redoes the batch (transform_data_task
+#   autoretries and resumes from its last committed watermark).
+# - Upserts key on (user_id, raw_id, item_idx), so a chunk written again is a no-op.
+# - stats() gives per-table rows / chunks / retries / write ms for the task result.
+# ------------------------------------------------------------------------------------
+# Imports:
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import OperationalError
+
+# Local Imports
+from app.extensions import db
+from app.models.clean_staging import CustomersClean, LeadsClean, OrdersClean
+from app.utils.logging import debug_logger
+
+# ------------------------------------------------------------------------------------
+# Vars
+FLUSH_SIZE = 1000
+WRITE_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 0.1
+RETRY_MAX_SECONDS = 2.0
+RETRYABLE_ERRORS = (1213, 1205)  # ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT
+
+KEY_COLUMNS = ("user_id", "raw_id", "item_idx")
+TABLES = {m.__table__.name: m.__table__ for m in (LeadsClean, CustomersClean, OrdersClean)}
+
+_statements: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def _upsert_statement(table_name: str, columns: Tuple[str, ...]):
+    """Cached INSERT ... ON DUPLICATE KEY UPDATE for these columns (key columns aren't updated)."""
+    key = (table_name, columns)
+    stmt = _statements.get(key)
+    if stmt is None:
+        table = TABLES.get(table_name)
+        if table is None:
+            raise ValueError(f"Unknown table name: {table_name}")
+        insert_stmt = mysql_insert(table)
+        stmt = insert_stmt.on_duplicate_key_update(
+            {col: insert_stmt.inserted[col] for col in columns if col not in KEY_COLUMNS}
+        )
+        _statements[key] = stmt
+    return stmt
+
+def _retryable(e: OperationalError) -> bool:
+    args = getattr(e.orig, "args", None) or ()
+    return bool(args) and args[0] in RETRYABLE_ERRORS
+
+# ------------------------------------------------------------------------------------
+# Classes
+
+class CleanUpsertWriter:
+    """
+    Buffers clean-table records and writes them in multi-row upserts.
+
+        writer = CleanUpsertWriter(flush_size=1000)
+        writer.add(LEADS_TBL, rec)      # flushes that table every flush_size records
+        writer.flush()                  # before committing the batch's watermark
+        writer.stats()                  # {"leads_clean": {"rows", "chunks", "retries", "ms"}, ...}
+    """
+
+    def __init__(self, flush_size: Optional[int] = None):
+        self.flush_size = max(1, int(flush_size or FLUSH_SIZE))
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def add(self, table_name: str, rec: Dict[str, Any]) -> None:
+        buf = self._buffers.setdefault(table_name, [])
+        buf.append(rec)
+        if len(buf) >= self.flush_size:
+            self.flush(table_name)
+
+    def pending(self) -> int:
+        return sum(len(buf) for buf in self._buffers.values())
+
+    def flush(self, table_name: Optional[str] = None) -> None:
+        """Write everything buffered (for one table, or all of them)."""
+        names = [table_name] if table_name else list(self._buffers)
+        for name in names:
+            buf = self._buffers.get(name)
+            if not buf:
+                continue
+            self._buffers[name] = []
+            # executemany needs one column set per statement; lead/order records share theirs
+            groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for rec in buf:
+                groups.setdefault(tuple(rec.keys()), []).append(rec)
+            for columns, recs in groups.items():
+                for i in range(0, len(recs), self.flush_size):
+                    self._write_chunk(name, columns, recs[i:i + self.flush_size])
+
+    def _write_chunk(self, table_name: str, columns: Tuple[str, ...], recs: List[Dict[str, Any]]) -> None:
+        stmt = _upsert_statement(table_name, columns)
+        st = self._stats.setdefault(table_name, {"rows": 0, "chunks": 0, "retries": 0, "ms": 0})
+        t0 = time.monotonic()
+        try:
+            for attempt in range(WRITE_ATTEMPTS):
+                savepoint = db.session.begin_nested()
+                try:
+                    db.session.connection().execute(stmt, recs)
+                    savepoint.commit()
+                    break
+                except OperationalError as e:
+                    try:
+                        savepoint.rollback()
+                    except Exception:
+                        # Deadlock: the transaction (and the savepoint) is already gone
+                        debug_logger.error(f"[CLEAN_WRITER] {table_name} chunk of {len(recs)} lost its transaction: {e}")
+                        raise e
+                    if not _retryable(e) or attempt == WRITE_ATTEMPTS - 1:
+                        debug_logger.error(
+                            f"[CLEAN_WRITER] {table_name} chunk of {len(recs)} failed "
+                            f"(attempt {attempt + 1}/{WRITE_ATTEMPTS}): {e}"
+                        )
+                        raise
+                    st["retries"] += 1
+                    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** attempt))
+                    delay *= 0.5 + random.random()
+                    debug_logger.warning(
+                        f"[CLEAN_WRITER] {table_name} chunk of {len(recs)} hit lock conflict "
+                        f"({e.orig.args[0]}), retrying in {delay:.2f}s"
+                    )
+                    time.sleep(delay)
+        finally:
+            st["ms"] += int((time.monotonic() - t0) * 1000)
+        st["rows"] += len(recs)
+        st["chunks"] += 1
+        debug_logger.debug(f"[CLEAN_WRITER] {table_name} upserted {len(recs)} rows")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: dict(st) for name, st in self._stats.items()}
@@ -0,0 +1,191 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Canonical JSON + SHA-256 for user_dataset_raw.content_hash (uq_global_content_hash).
+# - The canonical form is fixed: json.dumps(sort_keys=True, separators=(",", ":"),
+#   ensure_ascii=False) encoded as UTF-8. Every backend must produce these exact bytes,
+#   otherwise already stored rows stop deduping.
+# - Backends (CONTENT_HASH_BACKEND in app config):
+#     "json"    - stdlib encoder, the reference implementation.
+#     "msgspec" - native sorted-key encoder (msgspec.json, already a dependency). Its
+#                 output only differs from the stdlib on floats written in exponent form
+#                 (|x| < 1e-4 or >= 1e16) and NaN/Infinity, so items holding such floats
+#                 (rare in API payloads) fall back to the stdlib encoder.
+#     "auto"    - msgspec when importable, else json.
+# - Benchmark / equivalence check: python -m benchmarks.content_hash (from backend/).
+# - Volatile fields: DataSource.config["hash_exclude"] lists field paths left out of the
+#   dedupe hash, e.g. ["date_modified", "_links", "meta.request_id"]. Dotted paths go into
+#   nested objects (and into every object of a list on the way). The stored content keeps
+#   the fields; only the hash ignores them. Changing the list changes that source's hashes,
+#   so the next run stores one more copy of each record. Candidates come from
+#   app/utils/field_volatility.py (GET /data-sources/<id>/field-changes).
+# ------------------------------------------------------------------------------------
+# Imports:
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - msgspec is pinned in requirements.txt
+    msgspec = None
+
+# Local Imports
+from app.utils.logging import debug_logger
+
+# ------------------------------------------------------------------------------------
+# Vars
+DEFAULT_BACKEND = "auto"
+BACKENDS = ("json", "msgspec")
+
+MAX_EXCLUDED_FIELDS = 64
+
+# Floats the stdlib writes in plain decimal (repr() without an exponent). Anything
+# outside this range, plus nan/inf, is formatted differently by native encoders.
+_FIXED_FLOAT_MIN = 1e-4
+_FIXED_FLOAT_MAX = 1e16
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def canonical_json(o: Any) -> str:
+    """Canonical JSON string for deterministic hashing (reference form)."""
+    return json.dumps(o, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def _canonical_json_bytes(o: Any) -> bytes:
+    return canonical_json(o).encode("utf-8")
+
+def _has_unportable_float(o: Any) -> bool:
+    """True if o contains a float the stdlib would write in exponent form (or nan/inf)."""
+    stack = [o]
+    while stack:
+        v = stack.pop()
+        t = type(v)
+        if t is dict:
+            stack.extend(v.values())
+        elif t is list:
+            stack.extend(v)
+        elif t is float and not (v == 0.0 or _FIXED_FLOAT_MIN <= abs(v) < _FIXED_FLOAT_MAX):
+            return True
+    return False
+
+def compile_exclusions(paths: Optional[Iterable[Any]]) -> Optional[Dict[str, Any]]:
+    """
+    config["hash_exclude"] -> path tree for strip_fields(), or None when nothing is excluded.
+    ["a", "meta.request_id"] becomes {"a": None, "meta": {"request_id": None}} (None = drop).
+    Entries that aren't non-empty strings are ignored with a warning.
+    """
+    if not paths:
+        return None
+    if isinstance(paths, str) or not isinstance(paths, (list, tuple)):
+        debug_logger.warning(f"[CONTENT_HASH] hash_exclude must be a list of field paths, got {paths!r}; ignoring")
+        return None
+    tree: Dict[str, Any] = {}
+    for path in list(paths)[:MAX_EXCLUDED_FIELDS]:
+        parts = path.split(".") if isinstance(path, str) else []
+        if not parts or not all(parts):
+            debug_logger.warning(f"[CONTENT_HASH] Ignoring hash_exclude entry {path!r}")
+            continue
+        node = tree
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                break  # a parent is already dropped whole
+            node = node.setdefault(part, child)
+        else:
+            node[parts[-1]] = None
+    return tree or None
+
+def strip_fields(item: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    """Copy of item without the fields in tree (from compile_exclusions). item is not modified."""
+    if not tree:
+        return item
+    t = type(item)
+    if t is list:
+        return [strip_fields(v, tree) for v in item]
+    if t is not dict:
+        return item
+    out = {}
+    for k, v in item.items():
+        if k in tree:
+            sub = tree[k]
+            if sub is None:
+                continue
+            v = strip_fields(v, sub)
+        out[k] = v
+    return out
+
+# ------------------------------------------------------------------------------------
+# Classes
+
+class ContentHasher:
+    """
+    Canonicalize + SHA-256 one decoded JSON item.
+
+        hasher = get_hasher(current_app.config.get("CONTENT_HASH_BACKEND"))
+        digest = hasher.digest(item)   # 32 bytes, same value for every backend
+        digest = hasher.digest(item, compile_exclusions(config.get("hash_exclude")))
+        hasher.stats()                 # {"backend": ..., "fast": n, "fallback": n}
+    """
+
+    def __init__(self, backend: str = DEFAULT_BACKEND):
+        if backend in (None, "", "auto"):
+            backend = "msgspec" if msgspec is not None else "json"
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown content hash backend {backend!r}; expected one of {BACKENDS}")
+        if backend == "msgspec" and msgspec is None:
+            raise ValueError("Content hash backend 'msgspec' requested but msgspec is not installed")
+
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._fast = 0
+        self._fallback = 0
+        self._encode: Callable[[Any], bytes] = _canonical_json_bytes
+        if backend == "msgspec":
+            self._encode = msgspec.json.Encoder(order="sorted").encode
+
+    def canonical(self, item: Any) -> bytes:
+        """Canonical UTF-8 bytes of item (identical across backends)."""
+        if self.backend == "json":
+            return _canonical_json_bytes(item)
+        if _has_unportable_float(item):
+            self._count(fallback=1)
+            return _canonical_json_bytes(item)
+        try:
+            out = self._encode(item)
+        except (TypeError, ValueError, OverflowError):
+            # Non-str keys, unsupported types, ...: let the reference encoder decide
+            self._count(fallback=1)
+            return _canonical_json_bytes(item)
+        self._count(fast=1)
+        return out
+
+    def digest(self, item: Any, exclude: Optional[Dict[str, Any]] = None) -> bytes:
+        """SHA-256 of the canonical item, minus the fields in exclude (compile_exclusions)."""
+        if exclude:
+            item = strip_fields(item, exclude)
+        return hashlib.sha256(self.canonical(item)).digest()
+
+    def _count(self, fast: int = 0, fallback: int = 0) -> None:
+        with self._lock:
+            self._fast += fast
+            self._fallback += fallback
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": self.backend, "fast": self._fast, "fallback": self._fallback}
+
+def get_hasher(backend: str = DEFAULT_BACKEND) -> ContentHasher:
+    """
+    New hasher for backend. An unknown/unavailable backend logs a warning and falls
+    back to the stdlib reference so a config typo never stops ingestion.
+    """
+    try:
+        return ContentHasher(backend)
+    except ValueError as e:
+        debug_logger.warning(f"[CONTENT_HASH] {e}; using 'json'")
+        return ContentHasher("json")
@@ -14,7 +14,7 @@ from app.extensions import db
 from app.models.user import User, Customer
 from app.models.plan import Plan
 from app.models.analysis import CustomerAnalysis, CustomerStats, SourceMetricsDaily
-from app.models.data_sources import DataSource, UserDatasetRaw, AnalyticsEtlState
+from app.models.data_sources import DataSource, UserDatasetRaw, UserDatasetItemHash, AnalyticsEtlState, DataSourcePageCache, DataSourceState
 from app.models.logging import ActivityLog, UserActivityLog, SiteSecurityLog, FailedLoginAttempt
 from app.models.public_data import Leads, WooCommerceOrder, UserCustomer
 def create_all_tables(engine=None):
@@ -0,0 +1,227 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Per-source "extraction profile": what a source's API looks like, detected on a
+#   successful run and stored in DataSource.config["profile"]:
+#     {"version": 1,
+#      "envelope": "data",            # where the items live: "" bare array, "data.items",
+#                                     #   "$record" (the object is the record)
+#      "pagination": "page",          # "page" (?page=N) or "cursor" (next link)
+#      "page_size_param": "per_page", # page size query param in base_url, if any
+#      "page_size": 100,
+#      "total_header": "X-WP-TotalPages", "total_kind": "pages",   # or "count"
+#      "detected_at": "..."}
+# - With a profile the extractor reads items straight from the envelope key, follows
+#   only next links for cursor APIs (no ?page=N probing), and stops on the last page
+#   from the total header / short page instead of fetching an empty one.
+# - The profile is re-detected when a response stops matching it.
+#   config["profile"] = false disables profiles for a source.
+# - known_total_pages() reads the page count off a first page (headers or body totals)
+#   for the extractor's parallel page fetch; it works with or without a profile.
+# ------------------------------------------------------------------------------------
+# Imports:
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+# ------------------------------------------------------------------------------------
+# Vars
+PROFILE_VERSION = 1
+PAGINATION_MODES = ("page", "cursor")
+
+ENVELOPE_KEYS = ("data", "items", "results", "records", "rows")  # same order as _as_list
+NESTED_KEYS = ("items", "results", "records", "rows")
+RECORD = "$record"
+
+TOTAL_PAGES_HEADERS = ("X-WP-TotalPages", "X-Total-Pages", "X-Pagination-Page-Count")
+TOTAL_COUNT_HEADERS = ("X-WP-Total", "X-Total-Count", "X-Total", "X-Pagination-Total-Count")
+PAGE_SIZE_PARAMS = ("per_page", "page_size", "pageSize", "limit", "size", "count")
+
+# Totals in the response body, top level or under "meta" / "pagination"
+BODY_TOTAL_PAGES_KEYS = ("total_pages", "totalPages", "last_page", "lastPage", "page_count", "pageCount")
+BODY_TOTAL_COUNT_KEYS = ("total", "total_count", "totalCount", "total_results", "totalResults")
+BODY_TOTAL_CONTAINERS = ("meta", "pagination", "paging")
+
+# Fields that describe the API (detected_at / version changes alone don't rewrite config)
+_COMPARED = ("envelope", "pagination", "page_size_param", "page_size", "total_header", "total_kind")
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def detect_envelope(payload: Any) -> Optional[str]:
+    """Key path _as_list would take the items from, or None if it finds none."""
+    if isinstance(payload, list):
+        return ""
+    if not isinstance(payload, dict):
+        return None
+    for key in ENVELOPE_KEYS:
+        if isinstance(payload.get(key), list):
+            return key
+    data = payload.get("data")
+    if isinstance(data, dict):
+        for key in NESTED_KEYS:
+            if isinstance(data.get(key), list):
+                return f"data.{key}"
+    if all(isinstance(k, str) for k in payload.keys()):
+        return RECORD
+    return None
+
+def items_at(payload: Any, envelope: str) -> Optional[List[Dict[str, Any]]]:
+    """Items at a known envelope path, or None if the payload doesn't have that shape."""
+    if envelope == "":
+        v = payload if isinstance(payload, list) else None
+    elif envelope == RECORD:
+        return [payload] if isinstance(payload, dict) and detect_envelope(payload) == RECORD else None
+    else:
+        v = payload
+        for part in envelope.split("."):
+            v = v.get(part) if isinstance(v, dict) else None
+    if not isinstance(v, list):
+        return None
+    return [x for x in v if isinstance(x, dict)]
+
+def page_size_from_url(url: str) -> Dict[str, Any]:
+    """{"page_size_param", "page_size"} if base_url pins a page size, else Nones."""
+    for key, value in parse_qsl(urlsplit(url).query, keep_blank_values=True):
+        if key in PAGE_SIZE_PARAMS:
+            try:
+                size = int(value)
+            except ValueError:
+                continue
+            if size > 0:
+                return {"page_size_param": key, "page_size": size}
+    return {"page_size_param": None, "page_size": None}
+
+def total_header(headers: Mapping[str, str]) -> Dict[str, Any]:
+    """{"total_header", "total_kind"} for the first total pages / count header present."""
+    for kind, names in (("pages", TOTAL_PAGES_HEADERS), ("count", TOTAL_COUNT_HEADERS)):
+        for name in names:
+            if _int_header(headers, name) is not None:
+                return {"total_header": name, "total_kind": kind}
+    return {"total_header": None, "total_kind": None}
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        value = int(str(headers.get(name)).strip())
+    except (TypeError, ValueError):
+        return None
+    return value if value >= 0 else None
+
+def total_pages(profile: Mapping[str, Any], headers: Mapping[str, str]) -> Optional[int]:
+    """Last page number according to the profile's total header, or None if unknown."""
+    name = profile.get("total_header")
+    if not name:
+        return None
+    value = _int_header(headers, name)
+    if value is None:
+        return None
+    if profile.get("total_kind") == "pages":
+        return value
+    size = profile.get("page_size")
+    return math.ceil(value / size) if size else None
+
+def _int_value(v: Any) -> Optional[int]:
+    if isinstance(v, bool):
+        return None
+    try:
+        n = int(v)
+    except (TypeError, ValueError):
+        return None
+    return n if n >= 0 else None
+
+def known_total_pages(headers: Mapping[str, str], envelope: Mapping[str, Any], page_size: int) -> Optional[int]:
+    """
+    Total page count reported by the first page of a walk: a total pages / total count
+    header, else the same in the body envelope. Counts are divided by page_size (the
+    item count of that first, full page). None if the response doesn't say.
+    """
+    for name in TOTAL_PAGES_HEADERS:
+        n = _int_header(headers, name)
+        if n is not None:
+            return n
+    count = next((c for c in (_int_header(headers, n) for n in TOTAL_COUNT_HEADERS) if c is not None), None)
+    if count is None and isinstance(envelope, Mapping):
+        scopes = [envelope] + [envelope[k] for k in BODY_TOTAL_CONTAINERS if isinstance(envelope.get(k), Mapping)]
+        for scope in scopes:
+            for key in BODY_TOTAL_PAGES_KEYS:
+                n = _int_value(scope.get(key))
+                if n is not None:
+                    return n
+        for scope in scopes:
+            for key in BODY_TOTAL_COUNT_KEYS:
+                count = _int_value(scope.get(key))
+                if count is not None:
+                    break
+            if count is not None:
+                break
+    if count is None or not page_size:
+        return None
+    return math.ceil(count / page_size)
+
+def load_profile(config: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """The stored profile if it is usable, else None."""
+    profile = config.get("profile") if isinstance(config, Mapping) else None
+    if not isinstance(profile, dict) or profile.get("version") != PROFILE_VERSION:
+        return None
+    if profile.get("pagination") not in PAGINATION_MODES or not isinstance(profile.get("envelope"), str):
+        return None
+    return profile
+
+def profiles_enabled(config: Mapping[str, Any]) -> bool:
+    return not (isinstance(config, Mapping) and config.get("profile") is False)
+
+def same_profile(a: Optional[Mapping[str, Any]], b: Optional[Mapping[str, Any]]) -> bool:
+    if not a or not b:
+        return False
+    return all(a.get(k) == b.get(k) for k in _COMPARED)
+
+# ------------------------------------------------------------------------------------
+# Classes
+
+class ProfileObserver:
+    """
+    Collects what one source walk looked like and turns it into a profile.
+    Fed by the fetch stage only (one thread).
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.envelope: Optional[str] = None
+        self.consistent = True
+        self.cursor = False
+        self.totals: Dict[str, Any] = {"total_header": None, "total_kind": None}
+        self.pages = 0
+
+    def observe(self, headers: Mapping[str, str], envelope: Optional[str], item_count: int, next_url: str) -> None:
+        if self.pages == 0:
+            self.totals = total_header(headers)
+        self.pages += 1
+        if next_url:
+            self.cursor = True
+        if not item_count or envelope is None:
+            return
+        if self.envelope is None:
+            self.envelope = envelope
+        elif self.envelope != envelope:
+            self.consistent = False
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """Detected profile, or None if the walk saw no items (or disagreeing shapes)."""
+        if self.envelope is None or not self.consistent:
+            return None
+        out: Dict[str, Any] = {
+            "version": PROFILE_VERSION,
+            "envelope": self.envelope,
+            "pagination": "cursor" if self.cursor else "page",
+        }
+        out.update(page_size_from_url(self.base_url))
+        out.update(self.totals)
+        if out["total_kind"] == "count" and not out["page_size"]:
+            # A total count is only useful with a known page size
+            out.update(total_header=None, total_kind=None)
+        out["detected_at"] = datetime.utcnow().isoformat()
+        return out
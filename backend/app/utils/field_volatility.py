@@ -0,0 +1,132 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Measures how often each field changes between stored copies of the same record,
+#   to pick DataSource.config["hash_exclude"] candidates (app/utils/content_hash.py).
+# - Copies are grouped by a record key (config["hash_key"], else the first of
+#   KEY_FIELDS present) and compared in ingest order. Fields are compared down to
+#   MAX_DEPTH levels ("meta.request_id"); deeper values and lists compare as a whole.
+#   An object is also compared as a whole and suggested instead of its fields when
+#   every one of them is volatile ("_links" rather than "_links.self", "_links.collection").
+# - A copy only exists because its hash differed, so every pair differs somewhere. A
+#   field that changes in (nearly) every pair is noise riding along with the data;
+#   one that changes now and then is a real update. Fields at or above SUGGEST_RATE
+#   over at least MIN_PAIRS pairs are suggested.
+# - "redundant" counts pairs that differ only in suggested / already excluded fields:
+#   the copies the suggestion would have avoided.
+# ------------------------------------------------------------------------------------
+# Imports:
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Local Imports
+from app.utils.content_hash import canonical_json, compile_exclusions
+
+# ------------------------------------------------------------------------------------
+# Vars
+KEY_FIELDS = ("id", "uuid", "ID", "_id", "key")
+MAX_DEPTH = 2
+SUGGEST_RATE = 0.9
+MIN_PAIRS = 10
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def record_key(item: Dict[str, Any], key_field: Optional[str] = None) -> Optional[str]:
+    """Identity of a record (as canonical JSON so 1 and "1" stay distinct), or None."""
+    fields = (key_field,) if key_field else KEY_FIELDS
+    for name in fields:
+        value = item.get(name)
+        if value is not None and not isinstance(value, (dict, list)):
+            return canonical_json(value)
+    return None
+
+def _flatten(item: Dict[str, Any], prefix: str = "", depth: int = 1) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for k, v in item.items():
+        path = f"{prefix}{k}"
+        out[path] = canonical_json(v)
+        if isinstance(v, dict) and v and depth < MAX_DEPTH:
+            out.update(_flatten(v, f"{path}.", depth + 1))
+    return out
+
+def _parent(path: str) -> Optional[str]:
+    return path.rsplit(".", 1)[0] if "." in path else None
+
+def _excluded(path: str, tree: Optional[Dict[str, Any]]) -> bool:
+    node = tree
+    for part in path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return False
+        node = node[part]
+        if node is None:
+            return True
+    return False
+
+def analyze(records: Iterable[Dict[str, Any]], key_field: Optional[str] = None,
+            hash_exclude: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    records: stored contents of one source, oldest first.
+    Returns {"records", "keyed", "distinct", "pairs", "redundant", "fields": [...],
+    "suggested": [...]}, fields sorted by change rate.
+    """
+    tree = compile_exclusions(hash_exclude)
+    last: Dict[str, Dict[str, str]] = {}
+    changed: Dict[str, int] = {}
+    children: Dict[str, Set[str]] = {}
+    pair_changes: List[Set[str]] = []
+    seen = keyed = 0
+
+    for item in records:
+        seen += 1
+        if not isinstance(item, dict):
+            continue
+        key = record_key(item, key_field)
+        if key is None:
+            continue
+        keyed += 1
+        flat = _flatten(item)
+        for p in flat:
+            parent = _parent(p)
+            if parent is not None:
+                children.setdefault(parent, set()).add(p)
+        prev = last.get(key)
+        last[key] = flat
+        if prev is None:
+            continue
+        diff = {p for p in prev.keys() | flat.keys() if prev.get(p) != flat.get(p)}
+        for p in diff:
+            changed[p] = changed.get(p, 0) + 1
+        # An object that changed because its fields did is explained by them
+        pair_changes.append(diff - {_parent(p) for p in diff})
+
+    pairs = len(pair_changes)
+    fields = [
+        {"field": p, "changed": n, "rate": round(n / pairs, 4), "excluded": _excluded(p, tree)}
+        for p, n in sorted(changed.items(), key=lambda kv: (-kv[1], kv[0]))
+    ]
+    volatile = {
+        f["field"] for f in fields
+        if not f["excluded"] and pairs >= MIN_PAIRS and f["rate"] >= SUGGEST_RATE
+    }
+    # An object goes in whole only if all of its fields are volatile, else just those fields
+    whole = {p for p in volatile if p in children and children[p] <= volatile}
+    volatile -= {p for p in volatile if p in children and p not in whole}
+    suggested = [
+        f["field"] for f in fields
+        if f["field"] in volatile and _parent(f["field"]) not in whole
+    ]
+    noise = volatile | {f["field"] for f in fields if f["excluded"]}
+    redundant = sum(1 for diff in pair_changes if diff and diff <= noise)
+
+    return {
+        "records": seen,
+        "keyed": keyed,
+        "distinct": len(last),
+        "pairs": pairs,
+        "redundant": redundant,
+        "fields": fields,
+        "suggested": suggested,
+    }
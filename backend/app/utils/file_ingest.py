@@ -0,0 +1,185 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - File ingestion for 'file' / 'manual' DataSources.
+# - Every such source owns an inbox under FILE_INGEST_ROOT:
+#     <root>/<user_id>/<source_id>/            <- uploads / dropped files land here
+#     <root>/<user_id>/<source_id>/processing/ <- claimed by a running extract
+#     <root>/<user_id>/<source_id>/processed/  <- ingested
+#     <root>/<user_id>/<source_id>/failed/     <- unreadable (see the run errors)
+#   Paths are always derived from ids, never from user supplied config.
+# - Readers stream records one at a time, so memory is bounded by one record:
+#     .ndjson / .jsonl  one JSON object per line (bad lines are counted and skipped)
+#     .csv              header row + rows -> dicts of strings
+#     .json             array or envelope ({"data": [...]}) via app/utils/json_stream.py
+#   Any of them may be gzipped (.gz). DataSource.config["format"] overrides detection.
+# ------------------------------------------------------------------------------------
+# Imports:
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Local Imports
+from app.utils.json_stream import StreamedPage
+from app.utils.logging import debug_logger
+
+# ------------------------------------------------------------------------------------
+# Vars
+FORMATS = ("ndjson", "csv", "json")
+EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv", ".json": "json"}
+CONTENT_TYPES = {"ndjson": "json", "csv": "csv", "json": "json"}  # user_dataset_raw.content_type
+
+READ_CHUNK_BYTES = 64 * 1024
+CLAIM_TIMEOUT_SECONDS = 6 * 3600  # claimed files older than this are returned to the inbox
+MAX_BAD_LINE_ERRORS = 20          # bad NDJSON lines reported per file (all are counted)
+
+PROCESSING_DIR = "processing"
+PROCESSED_DIR = "processed"
+FAILED_DIR = "failed"
+
+# ------------------------------------------------------------------------------------
+# Classes
+
+class RecordStats:
+    """Per file reader counters."""
+
+    def __init__(self):
+        self.records = 0
+        self.skipped = 0
+        self.errors: List[str] = []
+
+    def bad(self, msg: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_BAD_LINE_ERRORS:
+            self.errors.append(msg)
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def source_inbox(root: str, user_id: int, source_id: int) -> str:
+    return os.path.join(root, str(int(user_id)), str(int(source_id)))
+
+def allowed_file(name: str) -> bool:
+    base = name[:-3] if name.lower().endswith(".gz") else name
+    return os.path.splitext(base.lower())[1] in EXTENSIONS
+
+def detect_format(name: str, override: Optional[str] = None) -> str:
+    if override in FORMATS:
+        return override
+    base = name[:-3] if name.lower().endswith(".gz") else name
+    fmt = EXTENSIONS.get(os.path.splitext(base.lower())[1])
+    if fmt is None:
+        raise ValueError(f"unsupported file type: {name}")
+    return fmt
+
+def _requeue_stale_claims(inbox: str) -> None:
+    """Files left in processing/ by a crashed run go back to the inbox."""
+    processing = os.path.join(inbox, PROCESSING_DIR)
+    if not os.path.isdir(processing):
+        return
+    cutoff = time.time() - CLAIM_TIMEOUT_SECONDS
+    for name in os.listdir(processing):
+        path = os.path.join(processing, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.replace(path, os.path.join(inbox, name))
+                debug_logger.warning(f"[FILE_INGEST] Requeued stale claim {path}")
+        except FileNotFoundError:
+            continue
+
+def pending_files(inbox: str) -> List[str]:
+    """Ingestible files waiting in the inbox, oldest first (dotfiles are in-flight uploads)."""
+    if not os.path.isdir(inbox):
+        return []
+    _requeue_stale_claims(inbox)
+    names = []
+    for name in os.listdir(inbox):
+        path = os.path.join(inbox, name)
+        if name.startswith(".") or not os.path.isfile(path):
+            continue
+        if not allowed_file(name):
+            debug_logger.warning(f"[FILE_INGEST] Ignoring unsupported file {path}")
+            continue
+        names.append(name)
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(inbox, n)))
+    return names
+
+def claim(inbox: str, name: str) -> Optional[str]:
+    """
+    Atomically move inbox/name into processing/. Returns the claimed path, or None
+    if another run got it first.
+    """
+    processing = os.path.join(inbox, PROCESSING_DIR)
+    os.makedirs(processing, exist_ok=True)
+    dst = os.path.join(processing, name)
+    try:
+        os.rename(os.path.join(inbox, name), dst)
+    except FileNotFoundError:
+        return None
+    os.utime(dst)  # claim time, for stale claim detection
+    return dst
+
+def finish(inbox: str, claimed_path: str, ok: bool) -> str:
+    """Move a claimed file to processed/ or failed/ (timestamp prefixed). Returns the new path."""
+    target = os.path.join(inbox, PROCESSED_DIR if ok else FAILED_DIR)
+    os.makedirs(target, exist_ok=True)
+    dst = os.path.join(target, f"{time.strftime('%Y%m%dT%H%M%S')}-{os.path.basename(claimed_path)}")
+    os.replace(claimed_path, dst)
+    return dst
+
+def _iter_ndjson(fh, stats: RecordStats) -> Iterator[Dict[str, Any]]:
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    for lineno, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            stats.bad(f"line {lineno}: {e}")
+            continue
+        if not isinstance(item, dict):
+            stats.bad(f"line {lineno}: not a JSON object")
+            continue
+        stats.records += 1
+        yield item
+
+def _iter_csv(fh, stats: RecordStats) -> Iterator[Dict[str, Any]]:
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    for row in csv.DictReader(text):
+        # Cells beyond the header row land under the None key; they have no column name
+        row.pop(None, None)
+        stats.records += 1
+        yield row
+
+def _iter_json(fh, stats: RecordStats) -> Iterator[Dict[str, Any]]:
+    page = StreamedPage(iter(lambda: fh.read(READ_CHUNK_BYTES), b""))
+    for item in page:
+        stats.records += 1
+        yield item
+
+_READERS = {"ndjson": _iter_ndjson, "csv": _iter_csv, "json": _iter_json}
+
+@contextmanager
+def open_records(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[Iterator[Dict[str, Any]], str, RecordStats]]:
+    """
+    Stream the records of one file:
+
+        with open_records(path) as (records, content_type, stats):
+            for item in records: ...
+    """
+    fmt = detect_format(os.path.basename(path), fmt)
+    stats = RecordStats()
+    raw = open(path, "rb")
+    try:
+        fh = gzip.GzipFile(fileobj=raw, mode="rb") if path.lower().endswith(".gz") else raw
+        yield _READERS[fmt](fh, stats), CONTENT_TYPES[fmt], stats
+    finally:
+        raw.close()
@@ -0,0 +1,232 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Shared HTTP client for data source extraction.
+# - One pooled keep-alive requests.Session per host, so paginated sources reuse the
+#   same TCP+TLS connection instead of handshaking on every page.
+# - Retries transient failures (connect errors, timeouts, 429/5xx) with exponential
+#   backoff + jitter; a Retry-After header on the response replaces the computed delay
+#   (capped at backoff_max).
+# - Tracks pool statistics (requests, new connections, reuse rate, retries, time spent
+#   connecting) for the task summary.
+# - Thread safe: one client is shared by every extraction worker thread in a run.
+# ------------------------------------------------------------------------------------
+# Imports:
+import random
+import threading
+import time
+from typing import Any, Collection, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Local Imports
+from app.utils.logging import debug_logger
+from app.utils.rate_limit import retry_after_seconds
+
+# ------------------------------------------------------------------------------------
+# Vars
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5   # seconds; attempt n waits ~base * 2**n
+DEFAULT_BACKOFF_MAX = 30.0   # seconds; cap for a single backoff sleep
+DEFAULT_POOL_MAXSIZE = 4     # keep-alive connections kept per host
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# ------------------------------------------------------------------------------------
+# Classes
+
+class HttpStats:
+    """Thread safe counters for one HttpClient."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.connect_ms = 0.0
+        self.request_ms = 0.0
+
+    def add(self, **deltas) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "errors": self.errors,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_rate": round(reused / self.requests, 4) if self.requests else 0.0,
+                "connect_ms": int(self.connect_ms),
+                "request_ms": int(self.request_ms),
+            }
+
+def _pool_classes(stats: HttpStats) -> Dict[str, type]:
+    """
+    urllib3 pool classes whose connections report connect() time (TCP + TLS
+    handshake) into stats. Only called when the pool has to open a new socket,
+    so keep-alive reuse shows up as requests without a matching connect.
+    """
+
+    def _timed(base):
+        class _TimedConnection(base):
+            def connect(self):
+                t0 = time.monotonic()
+                try:
+                    return super().connect()
+                finally:
+                    stats.add(new_connections=1, connect_ms=(time.monotonic() - t0) * 1000)
+        return _TimedConnection
+
+    class _HTTPPool(HTTPConnectionPool):
+        ConnectionCls = _timed(HTTPConnection)
+
+    class _HTTPSPool(HTTPSConnectionPool):
+        ConnectionCls = _timed(HTTPSConnection)
+
+    return {"http": _HTTPPool, "https": _HTTPSPool}
+
+class _StatsAdapter(HTTPAdapter):
+    """HTTPAdapter whose pool manager builds timed connection pools."""
+
+    def __init__(self, pool_classes: Dict[str, type], **kwargs):
+        self._pool_classes = pool_classes
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes
+
+class HttpClient:
+    """
+    Pooled GET client with per-host sessions and retry/backoff.
+
+    Usage:
+        client = HttpClient(timeout=30, max_retries=3)
+        r = client.get(url)
+        client.stats()   # -> dict for the task summary
+        client.close()
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    ):
+        self.timeout = timeout
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_maxsize = max(1, int(pool_maxsize))
+        self._stats = HttpStats()
+        self._pool_classes = _pool_classes(self._stats)
+        self._sessions: Dict[str, requests.Session] = {}
+        self._hosts = 0  # sessions ever opened; survives close() for the run summary
+        self._lock = threading.Lock()
+
+    # Sessions
+    def session_for(self, url: str) -> requests.Session:
+        """Return the keep-alive session for url's scheme+host (created on first use)."""
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc.lower()}"
+        with self._lock:
+            sess = self._sessions.get(key)
+            if sess is None:
+                sess = requests.Session()
+                adapter = _StatsAdapter(
+                    self._pool_classes,
+                    pool_connections=1,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=0,  # retries are handled in get() so they can be counted
+                )
+                sess.mount("http://", adapter)
+                sess.mount("https://", adapter)
+                self._sessions[key] = sess
+                self._hosts += 1
+                debug_logger.debug(f"[HTTP] New pooled session for {key} pool_maxsize={self.pool_maxsize}")
+            return sess
+
+    def close(self) -> None:
+        with self._lock:
+            for sess in self._sessions.values():
+                try:
+                    sess.close()
+                except Exception:
+                    pass
+            self._sessions.clear()
+
+    # Requests
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with equal jitter for retry number `attempt` (0-based)."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retry_statuses: Optional[Collection[int]] = None,
+    ) -> requests.Response:
+        """
+        GET url through the host's pooled session.
+
+        Connect errors, timeouts and retry_statuses (default RETRY_STATUSES) are
+        retried up to max_retries times. When retries run out on a retryable status
+        the last response is returned (callers still raise_for_status()); exceptions
+        are re-raised.
+        """
+        retries = self.max_retries if max_retries is None else max(0, int(max_retries))
+        statuses = RETRY_STATUSES if retry_statuses is None else retry_statuses
+        sess = self.session_for(url)
+        attempt = 0
+        while True:
+            t0 = time.monotonic()
+            try:
+                r = sess.get(url, headers=headers, timeout=timeout or self.timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._stats.add(requests=1, errors=1, request_ms=(time.monotonic() - t0) * 1000)
+                if attempt >= retries:
+                    raise
+                wait = self.backoff(attempt)
+                debug_logger.warning(
+                    f"[HTTP] {type(e).__name__} on {url}; retry {attempt + 1}/{retries} in {wait:.2f}s"
+                )
+            else:
+                self._stats.add(requests=1, request_ms=(time.monotonic() - t0) * 1000)
+                if r.status_code not in statuses or attempt >= retries:
+                    return r
+                retry_after = retry_after_seconds(r.headers)
+                wait = min(retry_after, self.backoff_max) if retry_after is not None else self.backoff(attempt)
+                debug_logger.warning(
+                    f"[HTTP] HTTP {r.status_code} on {url}; retry {attempt + 1}/{retries} in {wait:.2f}s"
+                )
+                r.close()
+
+            self._stats.add(retries=1)
+            time.sleep(wait)
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        out = self._stats.as_dict()
+        with self._lock:
+            out["hosts"] = self._hosts
+        return out
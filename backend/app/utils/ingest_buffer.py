@@ -0,0 +1,188 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Redis buffer between POST /ingest/<source_id> (push) and the flush task (drain).
+#   Redis rather than process memory: web and Celery workers are separate processes.
+# - Layout (INGEST_BUFFER_URL):
+#     ingest:buf:<source_id>    list of JSON envelopes {"u": user_id, "t": received_at, "e": event}
+#     ingest:sources            set of source ids with buffered events
+#     ingest:lock:<source_id>   one flusher per source at a time (expires on its own)
+#     ingest:kick:<source_id>   debounces early flushes queued by busy sources
+#     ingest:dead:<source_id>   envelopes the database rejected (newest MAX_DEAD_LETTERS kept)
+# - Drain is at-least-once: a batch is read, written, and only then trimmed. A crash in
+#   between re-writes the same events next time, which the content hash dedupes.
+# - The length check + append of push() and the compare-and-delete of release() are
+#   Lua scripts, so each runs atomically in Redis: concurrent pushes can't overshoot
+#   MAX_BUFFERED_PER_SOURCE, and a flusher whose lock expired can't delete the lock
+#   another flusher has taken since.
+# ------------------------------------------------------------------------------------
+# Imports:
+import json
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+from flask import current_app
+
+# Local Imports
+from app.utils.logging import debug_logger
+
+# ------------------------------------------------------------------------------------
+# Vars
+DEFAULT_URL = "redis://localhost:6379/1"
+MAX_BUFFERED_PER_SOURCE = 500_000   # pushes beyond this are refused (backpressure)
+LOCK_SECONDS = 300
+MAX_DEAD_LETTERS = 100_000
+PUSH_ARGS_PER_CALL = 1000           # RPUSH arguments per call inside the push script (Lua stack)
+
+_SOURCES_KEY = "ingest:sources"
+_clients: Dict[str, "redis.Redis"] = {}
+_clients_lock = threading.Lock()
+
+# KEYS: buffer, sources set. ARGV: max buffered, source id, envelopes...
+# Returns the buffer length after the push, or -1 (nothing pushed) if it would exceed max.
+_PUSH_LUA = """
+local n = #ARGV - 2
+if redis.call('LLEN', KEYS[1]) + n > tonumber(ARGV[1]) then
+    return -1
+end
+local len = 0
+for i = 3, #ARGV, %d do
+    len = redis.call('RPUSH', KEYS[1], unpack(ARGV, i, math.min(i + %d, #ARGV)))
+end
+redis.call('SADD', KEYS[2], ARGV[2])
+return len
+""" % (PUSH_ARGS_PER_CALL, PUSH_ARGS_PER_CALL - 1)
+
+# KEYS: lock. ARGV: token. Deletes the lock only if it still holds our token.
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# ------------------------------------------------------------------------------------
+# Classes
+
+class BufferFull(Exception):
+    """The source already has MAX_BUFFERED_PER_SOURCE events waiting."""
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def _buf_key(source_id: int) -> str:
+    return f"ingest:buf:{int(source_id)}"
+
+def _lock_key(source_id: int) -> str:
+    return f"ingest:lock:{int(source_id)}"
+
+def _dead_key(source_id: int) -> str:
+    return f"ingest:dead:{int(source_id)}"
+
+def _envelope(user_id: int, received_at: str, event: Dict[str, Any]) -> str:
+    return json.dumps({"u": user_id, "t": received_at, "e": event}, separators=(",", ":"), ensure_ascii=False)
+
+def client() -> "redis.Redis":
+    """Shared connection pool per URL (one per process)."""
+    url = current_app.config.get("INGEST_BUFFER_URL") or DEFAULT_URL
+    with _clients_lock:
+        conn = _clients.get(url)
+        if conn is None:
+            conn = _clients[url] = redis.Redis.from_url(url)
+        return conn
+
+def push(user_id: int, source_id: int, events: List[Dict[str, Any]]) -> int:
+    """Append events to the source buffer. Returns the buffer length after the push."""
+    if not events:
+        return pending(source_id)
+    received_at = datetime.utcnow().isoformat()
+    payloads = [_envelope(user_id, received_at, event) for event in events]
+    script = client().register_script(_PUSH_LUA)
+    length = int(script(keys=[_buf_key(source_id), _SOURCES_KEY],
+                        args=[MAX_BUFFERED_PER_SOURCE, int(source_id), *payloads]))
+    if length < 0:
+        raise BufferFull(f"source {source_id} has {MAX_BUFFERED_PER_SOURCE} events waiting")
+    return length
+
+def buffered_sources() -> List[int]:
+    return sorted(int(s) for s in client().smembers(_SOURCES_KEY))
+
+def acquire(source_id: int) -> Optional[str]:
+    """Take the per-source flush lock. Returns a token for release(), or None if held."""
+    token = uuid.uuid4().hex
+    if client().set(_lock_key(source_id), token, nx=True, ex=LOCK_SECONDS):
+        return token
+    return None
+
+def release(source_id: int, token: str) -> None:
+    """Drop the flush lock if it is still ours (it may have expired and been re-taken)."""
+    script = client().register_script(_RELEASE_LUA)
+    if not script(keys=[_lock_key(source_id)], args=[token]):
+        debug_logger.warning(f"[INGEST_BUFFER] Flush lock for source {source_id} expired before release")
+
+def peek(source_id: int, limit: int) -> List[Tuple[int, str, Dict[str, Any]]]:
+    """
+    Oldest `limit` events as (user_id, received_at, event), without removing them.
+    Unparseable envelopes are dropped from the result (and logged); they still count
+    towards the batch so commit() trims them.
+    """
+    out = []
+    for raw in client().lrange(_buf_key(source_id), 0, limit - 1):
+        try:
+            env = json.loads(raw)
+            out.append((int(env["u"]), env["t"], env["e"]))
+        except (ValueError, KeyError, TypeError) as e:
+            debug_logger.warning(f"[INGEST_BUFFER] Dropping bad envelope for source {source_id}: {e}")
+            out.append((0, "", None))
+    return out
+
+def commit(source_id: int, count: int) -> int:
+    """
+    Remove the `count` oldest events (the batch just written). Returns what is left;
+    at 0 the source leaves the pending set (re-added if a push raced in).
+    """
+    conn = client()
+    key = _buf_key(source_id)
+    pipe = conn.pipeline()
+    pipe.ltrim(key, count, -1)
+    pipe.llen(key)
+    _, left = pipe.execute()
+    if not left:
+        conn.srem(_SOURCES_KEY, int(source_id))
+        if conn.llen(key):
+            conn.sadd(_SOURCES_KEY, int(source_id))
+    return int(left)
+
+def dead_letter(source_id: int, events: List[Tuple[int, str, Dict[str, Any]]]) -> int:
+    """Park (user_id, received_at, event) the database rejected, so trimming the batch doesn't lose them."""
+    if not events:
+        return 0
+    key = _dead_key(source_id)
+    pipe = client().pipeline()
+    pipe.rpush(key, *[_envelope(u, t, e) for u, t, e in events])
+    pipe.ltrim(key, -MAX_DEAD_LETTERS, -1)
+    pipe.execute()
+    return len(events)
+
+def should_kick(source_id: int, seconds: int) -> bool:
+    """True at most once per `seconds` per source: whether a push should queue an early flush."""
+    return bool(client().set(f"ingest:kick:{int(source_id)}", 1, nx=True, ex=seconds))
+
+def drop(source_id: int) -> int:
+    """Discard everything buffered for a source (e.g. it was deleted). Returns how many events."""
+    conn = client()
+    pipe = conn.pipeline()
+    pipe.llen(_buf_key(source_id))
+    pipe.delete(_buf_key(source_id))
+    pipe.srem(_SOURCES_KEY, int(source_id))
+    dropped, _, _ = pipe.execute()
+    return int(dropped)
+
+def pending(source_id: int) -> int:
+    return int(client().llen(_buf_key(source_id)))
@@ -0,0 +1,193 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Incremental JSON page decoding for very large API responses.
+# - Reads the body chunk by chunk and yields item dicts from the envelope array one at a
+#   time, so memory stays bounded by the largest single item rather than the page.
+# - Built on the stdlib C scanner (JSONDecoder.raw_decode); no extra dependency.
+#
+# Supported shapes (same family as extract_data_sources._as_list):
+#   [ {...}, {...} ]
+#   { "data" | "items" | "results" | "records" | "rows": [ ... ], ...envelope }
+#   { "data": { "items" | "results" | "records" | "rows": [ ... ] }, ...envelope }
+#   { ...single record... }
+#
+# Difference from _as_list: the FIRST envelope list found in document order is
+# streamed (_as_list prefers "data" when a page carries several candidate lists).
+# ------------------------------------------------------------------------------------
+# Imports:
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# ------------------------------------------------------------------------------------
+# Vars
+ENVELOPE_KEYS = ("data", "items", "results", "records", "rows")
+NESTED_KEYS = ("items", "results", "records", "rows")
+COMPACT_AT = 1 << 20  # drop consumed buffer text once this many chars are behind us
+WHITESPACE = " \t\n\r"
+NUMBER_CHARS = "0123456789+-.eE"
+
+_decoder = json.JSONDecoder()
+
+# ------------------------------------------------------------------------------------
+# Classes
+
+class StreamedPage:
+    """
+    Lazily decoded JSON page.
+
+    Iterate it to get item dicts. Once iteration finishes, `envelope` holds every
+    top-level key that was not the item array (pagination links, totals, ...) and
+    `items_key` names the key the items came from ("" for a bare array, "$record"
+    when the whole object was a single record).
+
+        page = StreamedPage(r.iter_content(65536))
+        for item in page: ...
+        next_url = _maybe_next_url(page.envelope)
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.envelope: Dict[str, Any] = {}
+        self.items_key: Optional[str] = None
+        self.count = 0
+
+    # Buffer management
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer. False at end of body."""
+        if self._eof:
+            return False
+        if self._pos > COMPACT_AT:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            text = self._utf8.decode(chunk)
+            if text:
+                self._buf += text
+                return True
+        self._buf += self._utf8.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        """Next non-whitespace char without consuming it ('' at end of body)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, ch: str) -> None:
+        got = self._peek()
+        if got != ch:
+            raise json.JSONDecodeError(f"Expecting '{ch}'", self._buf, self._pos)
+        self._pos += 1
+
+    def _value(self) -> Any:
+        """
+        Decode one complete JSON value at the cursor. Reads more of the body until the
+        value is fully buffered; numbers additionally need the char after them, since
+        "12" + next chunk "3e5" is one number. The buffer at least doubles between
+        attempts so large values stay linear.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._grow():
+                    raise
+                continue
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and (end >= len(self._buf) or self._buf[end] in NUMBER_CHARS)
+                and self._grow()
+            ):
+                continue
+            self._pos = end
+            return value
+
+    def _grow(self) -> bool:
+        target = len(self._buf) + max(len(self._buf) - self._pos, 1)
+        grew = False
+        while len(self._buf) < target and self._fill():
+            grew = True
+        return grew
+
+    # Parsing
+    def _iter_array(self) -> Iterator[Dict[str, Any]]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            item = self._value()
+            if isinstance(item, dict):
+                self.count += 1
+                yield item
+            c = self._peek()
+            self._pos += 1
+            if c == ",":
+                continue
+            if c == "]":
+                return
+            raise json.JSONDecodeError("Expecting ',' or ']'", self._buf, self._pos - 1)
+
+    def _iter_object(self, into: Dict[str, Any], keys: tuple, nested: bool) -> Iterator[Dict[str, Any]]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", self._buf, self._pos)
+            self._expect(":")
+            c = self._peek()
+            if self.items_key is None and key in keys and c == "[":
+                self.items_key = f"data.{key}" if nested else key
+                yield from self._iter_array()
+            elif self.items_key is None and not nested and key == "data" and c == "{":
+                sub: Dict[str, Any] = {}
+                yield from self._iter_object(sub, NESTED_KEYS, nested=True)
+                into[key] = sub
+            else:
+                into[key] = self._value()
+            c = self._peek()
+            self._pos += 1
+            if c == ",":
+                continue
+            if c == "}":
+                return
+            raise json.JSONDecodeError("Expecting ',' or '}'", self._buf, self._pos - 1)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        c = self._peek()
+        if c == "[":
+            self.items_key = ""
+            yield from self._iter_array()
+        elif c == "{":
+            yield from self._iter_object(self.envelope, ENVELOPE_KEYS, nested=False)
+            if self.items_key is None:
+                # No item array anywhere: the object itself is the record (as _as_list does)
+                self.items_key = "$record"
+                self.count += 1
+                yield self.envelope
+        elif c:
+            # Scalars / strings: nothing to ingest
+            self._value()
+        if self._peek():
+            raise json.JSONDecodeError("Extra data", self._buf, self._pos)
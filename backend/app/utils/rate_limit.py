@@ -0,0 +1,219 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Client-side API quota handling for data source extraction.
+# - TokenBucket: `rate` requests/second with bursts up to `burst`; rate=None means
+#   unlimited, but the bucket can still be paused (Retry-After / quota exhausted).
+# - SourceThrottle: what one source's fetch loop waits on before every request -
+#   its own bucket plus the bucket of the host it talks to - and how server hints
+#   (Retry-After, X-RateLimit-* / RateLimit-*) pause the source until its quota resets.
+#   The host bucket is paused too, so every other source on that host backs off with it
+#   instead of running into the same 429s.
+# - Buckets live in memory: they are shared by threads in one process, not across
+#   Celery workers.
+# ------------------------------------------------------------------------------------
+# Imports:
+import threading
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+# ------------------------------------------------------------------------------------
+# Vars
+DEFAULT_MAX_PAUSE = 300.0        # seconds; longer server-requested waits fail the request instead
+DEFAULT_MAX_RATE_LIMITED = 10    # 429 responses tolerated per request before giving up
+
+_REMAINING_HEADERS = ("X-RateLimit-Remaining", "X-Rate-Limit-Remaining", "RateLimit-Remaining")
+_RESET_HEADERS = ("X-RateLimit-Reset", "X-Rate-Limit-Reset", "RateLimit-Reset")
+_EPOCH_CUTOFF = 1e9              # reset values above this are epoch timestamps, below are deltas
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+def retry_after_seconds(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP-date), else None."""
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    seconds = _to_float(value)
+    if seconds is not None:
+        return max(seconds, 0.0)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(when.timestamp() - now, 0.0)
+
+def quota_reset_seconds(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds until the quota resets when the server says none is left
+    (X-RateLimit-Remaining: 0 + X-RateLimit-Reset), else None. Reset may be an epoch
+    timestamp (seconds or ms) or a delta in seconds, depending on the API.
+    """
+    remaining = next((_to_float(headers.get(h)) for h in _REMAINING_HEADERS if headers.get(h) is not None), None)
+    if remaining is None or remaining > 0:
+        return None
+    reset = next((_to_float(headers.get(h)) for h in _RESET_HEADERS if headers.get(h) is not None), None)
+    if reset is None:
+        return None
+    now = time.time() if now is None else now
+    if reset > _EPOCH_CUTOFF * 1000:
+        reset /= 1000.0
+    if reset > _EPOCH_CUTOFF:
+        return max(reset - now, 0.0)
+    return max(reset, 0.0)
+
+# ------------------------------------------------------------------------------------
+# Classes
+
+class TokenBucket:
+    """Thread safe token bucket with an optional pause-until deadline."""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self.rate = rate if rate and rate > 0 else None
+        self.burst = max(1.0, float(burst)) if burst else max(1.0, self.rate or 1.0)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def tighten(self, rate: Optional[float], burst: Optional[float]) -> None:
+        """Lower the limits if a stricter one is configured (shared host buckets)."""
+        if not rate or rate <= 0:
+            return
+        with self._lock:
+            if self.rate is None or rate < self.rate:
+                self.rate = rate
+                self.burst = max(1.0, float(burst)) if burst else max(1.0, rate)
+                self._tokens = min(self._tokens, self.burst)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self) -> float:
+        """Block until a request may go out. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if self.rate is None:
+                        return waited
+                    self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                    self._stamp = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class HostBuckets:
+    """One TokenBucket per host for a run; the strictest configured limit wins."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def get(self, host: str, rate: Optional[float] = None, burst: Optional[float] = None) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+                return bucket
+        bucket.tighten(rate, burst)
+        return bucket
+
+class SourceThrottle:
+    """
+    Request gate for one source.
+
+        throttle = SourceThrottle(TokenBucket(2, 5), hosts.get("api.example.com"), max_pause=300)
+        throttle.wait()              # before each request
+        throttle.observe(response)   # after each response; pauses on Retry-After / quota hints
+    """
+
+    def __init__(self, source_bucket: TokenBucket, host_bucket: TokenBucket,
+                 max_pause: float = DEFAULT_MAX_PAUSE, max_rate_limited: int = DEFAULT_MAX_RATE_LIMITED):
+        self.source_bucket = source_bucket
+        self.host_bucket = host_bucket
+        self.max_pause = max_pause
+        self.max_rate_limited = max(0, int(max_rate_limited))
+        self.wait_s = 0.0
+        self.pauses = 0
+        self.rate_limited = 0
+
+    def wait(self) -> None:
+        self.wait_s += self.source_bucket.acquire()
+        self.wait_s += self.host_bucket.acquire()
+
+    def observe(self, r) -> Optional[float]:
+        """
+        Apply the server's pacing hints from response r to the source and its host.
+        Returns the pause (seconds) that was scheduled, or None. Pauses longer than max_pause are not scheduled.
+        """
+        headers = r.headers
+        delay = retry_after_seconds(headers) if r.status_code in (429, 503) else None
+        if delay is None:
+            delay = quota_reset_seconds(headers)
+        if delay is None and r.status_code == 429:
+            # Throttled without a hint: back off a little more each time
+            delay = min(self.max_pause, 2.0 ** min(self.rate_limited, 8))
+        if r.status_code == 429:
+            self.rate_limited += 1
+        if delay is None or delay <= 0 or delay > self.max_pause:
+            return None
+        self.source_bucket.pause(delay)
+        self.host_bucket.pause(delay)
+        self.pauses += 1
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "throttle_wait_ms": int(self.wait_s * 1000),
+            "pauses": self.pauses,
+            "rate_limited": self.rate_limited,
+        }
+
+def parse_rate_limit_config(config: Mapping[str, Any]) -> Dict[str, Optional[float]]:
+    """
+    Read DataSource.config["rate_limit"]:
+        {"per_second": 2, "burst": 5, "host_per_second": 10, "host_burst": 10,
+         "max_pause": 300, "max_rate_limited": 10}
+    Missing / invalid values mean "no client-side limit" (server hints still apply).
+    max_rate_limited may be 0: the first 429 without a usable pause fails the request.
+    """
+    raw = config.get("rate_limit") if isinstance(config, Mapping) else None
+    raw = raw if isinstance(raw, Mapping) else {}
+
+    def _positive(key: str) -> Optional[float]:
+        v = _to_float(raw.get(key)) if raw.get(key) is not None else None
+        return v if v is not None and v > 0 else None
+
+    max_rate_limited = _to_float(raw.get("max_rate_limited")) if raw.get("max_rate_limited") is not None else None
+    if max_rate_limited is None or max_rate_limited < 0:
+        max_rate_limited = DEFAULT_MAX_RATE_LIMITED
+
+    return {
+        "per_second": _positive("per_second"),
+        "burst": _positive("burst"),
+        "host_per_second": _positive("host_per_second"),
+        "host_burst": _positive("host_burst"),
+        "max_pause": _positive("max_pause") or DEFAULT_MAX_PAUSE,
+        "max_rate_limited": max_rate_limited,
+    }
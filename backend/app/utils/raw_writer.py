@@ -0,0 +1,268 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Batched writer for user_dataset_raw.
+# - One multi-row INSERT ... ON DUPLICATE KEY UPDATE + one commit per batch instead of
+#   one statement and one commit per record.
+# - If a batch is rejected, it is bisected until the offending row(s) are isolated;
+#   every healthy row still lands.
+# - Hash pre-check: before a batch is sent, one indexed
+#   SELECT content_hash ... WHERE content_hash IN (...) per table drops rows that are
+#   already stored (as item rows or inside page rows), so on steady-state runs (mostly duplicates) the JSON content never leaves
+#   the worker. Skipped rows are counted as duplicates (and in "prechecked"); unlike
+#   the upsert path their ingested_at is not refreshed.
+# - Page mode (upsert_raw_page, DataSource.config["storage"] = "page"): the new items
+#   of a batch go into ONE raw row (content = list of items, schema_hint "page") and
+#   each item's hash into user_dataset_item_hash, pointing at that row. Items dedupe
+#   against both tables, so switching a source between modes doesn't re-store records.
+#   The row's own content_hash is the SHA-256 of its item hashes. Insert races with
+#   another writer are retried against the fresh state; a rejected page is bisected
+#   into smaller page rows like item batches are. Failures (lookups included) end up
+#   in failed / rejected / errors; the page writer never raises.
+# ------------------------------------------------------------------------------------
+# Imports:
+from datetime import datetime
+import hashlib
+from typing import Any, Dict, List, Set
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+# Local Imports
+from app.extensions import db
+from app.models.data_sources import UserDatasetItemHash, UserDatasetRaw
+from app.utils.logging import debug_logger
+
+# ------------------------------------------------------------------------------------
+# Vars
+RAW_TABLE = UserDatasetRaw.__table__
+ITEM_HASH_TABLE = UserDatasetItemHash.__table__
+PAGE_SCHEMA_HINT = "page"
+PAGE_WRITE_ATTEMPTS = 3
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def _chunks(rows: List[Dict[str, Any]], size: int):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+def _existing_hashes(hashes: List[bytes]) -> Set[bytes]:
+    """Which of these content hashes are already in user_dataset_raw (uq_global_content_hash lookup)."""
+    if not hashes:
+        return set()
+    stmt = select(RAW_TABLE.c.content_hash).where(RAW_TABLE.c.content_hash.in_(hashes))
+    return {bytes(h) for h in db.session.execute(stmt).scalars()}
+
+def _existing_item_hashes(hashes: List[bytes]) -> Set[bytes]:
+    """Which of these item hashes are already stored, as item rows or inside page rows."""
+    if not hashes:
+        return set()
+    stmt = select(ITEM_HASH_TABLE.c.content_hash).where(ITEM_HASH_TABLE.c.content_hash.in_(hashes))
+    return _existing_hashes(hashes) | {bytes(h) for h in db.session.execute(stmt).scalars()}
+
+def _precheck(rows: List[Dict[str, Any]], result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Drop rows whose hash is already stored, in either mode. On lookup failure send everything (the upsert still dedupes)."""
+    try:
+        existing = _existing_item_hashes([row["content_hash"] for row in rows])
+    except Exception as e:
+        db.session.rollback()
+        debug_logger.warning(f"[RAW_WRITER] Hash pre-check failed, writing batch unfiltered: {e}")
+        return rows
+    if not existing:
+        return rows
+    fresh = [row for row in rows if row["content_hash"] not in existing]
+    skipped = len(rows) - len(fresh)
+    result["duplicates"] += skipped
+    result["prechecked"] += skipped
+    return fresh
+
+def _execute_batch(rows: List[Dict[str, Any]]) -> int:
+    """
+    Send rows as one multi-row upsert and commit. Returns the number of rows that
+    were newly inserted.
+
+    MySQL reports 1 affected row per insert and 2 per duplicate that gets updated.
+    ingested_at is refreshed on every duplicate, so duplicates always count as 2
+    (same assumption the per-row writer made with rowcount == 1).
+    """
+    stmt = mysql_insert(RAW_TABLE).values(rows)
+    stmt = stmt.on_duplicate_key_update(
+        ingested_at=stmt.inserted.ingested_at,
+        status=stmt.inserted.status,
+        error_message=stmt.inserted.error_message,
+    )
+    res = db.session.execute(stmt)
+    db.session.commit()
+
+    n = len(rows)
+    affected = res.rowcount if res.rowcount is not None and res.rowcount >= 0 else n
+    duplicates = min(max(affected - n, 0), n)
+    return n - duplicates
+
+def _write_bisect(rows: List[Dict[str, Any]], result: Dict[str, Any]) -> None:
+    try:
+        inserted = _execute_batch(rows)
+        result["inserted"] += inserted
+        result["duplicates"] += len(rows) - inserted
+        return
+    except Exception as e:
+        db.session.rollback()
+        if len(rows) == 1:
+            row = rows[0]
+            h = row.get("content_hash")
+            h_hex = h.hex()[:16] if isinstance(h, (bytes, bytearray)) else str(h)
+            debug_logger.warning(f"[RAW_WRITER] Row rejected hash={h_hex}...: {e}")
+            result["failed"] += 1
+            result["rejected"].append(h)
+            result["errors"].append(f"row_rejected hash={h_hex}: {e}")
+            return
+        debug_logger.warning(f"[RAW_WRITER] Batch of {len(rows)} rejected, bisecting: {e}")
+
+    mid = len(rows) // 2
+    _write_bisect(rows[:mid], result)
+    _write_bisect(rows[mid:], result)
+
+def upsert_raw_rows(rows: List[Dict[str, Any]], batch_size: int = 1000, precheck: bool = True) -> Dict[str, Any]:
+    """
+    Upsert user_dataset_raw rows in batches of batch_size (one transaction each).
+
+    Rows are the same dicts the extractor builds (user_id, source_id, content,
+    content_hash, ...); ingested_at/created_at are stamped here. With precheck, rows
+    whose content_hash already exists are skipped before the write.
+
+    Returns: {"inserted": int, "duplicates": int, "failed": int, "prechecked": int, "errors": [str],
+              "rejected": [content_hash of each row that could not be written]}
+    """
+    result: Dict[str, Any] = {"inserted": 0, "duplicates": 0, "failed": 0, "prechecked": 0, "errors": [], "rejected": []}
+    if not rows:
+        return result
+
+    for batch in _chunks(rows, max(1, int(batch_size))):
+        if precheck:
+            batch = _precheck(batch, result)
+            if not batch:
+                continue
+        now_ts = datetime.utcnow()
+        for row in batch:
+            row["ingested_at"] = now_ts
+            row["created_at"] = now_ts
+        _write_bisect(batch, result)
+
+    debug_logger.debug(
+        f"[RAW_WRITER] rows={len(rows)} inserted={result['inserted']} "
+        f"duplicates={result['duplicates']} prechecked={result['prechecked']} failed={result['failed']}"
+    )
+    return result
+
+# ------------------------------------------------------------------------------------
+# Page mode
+
+def _page_hash(rows: List[Dict[str, Any]]) -> bytes:
+    return hashlib.sha256(b"".join(row["content_hash"] for row in rows)).digest()
+
+def _execute_page(rows: List[Dict[str, Any]]) -> None:
+    """Insert rows as one page row plus their item hashes, in one transaction."""
+    first = rows[0]
+    now_ts = datetime.utcnow()
+    res = db.session.execute(RAW_TABLE.insert().values(
+        user_id=first["user_id"],
+        source_id=first["source_id"],
+        record_time=first.get("record_time"),
+        ingested_at=now_ts,
+        created_at=now_ts,
+        content=[row["content"] for row in rows],
+        content_hash=_page_hash(rows),
+        content_type=first.get("content_type") or "json",
+        schema_hint=PAGE_SCHEMA_HINT,
+        status="ok",
+        error_message=None,
+    ))
+    raw_id = res.inserted_primary_key[0]
+    db.session.execute(ITEM_HASH_TABLE.insert(), [
+        {"content_hash": row["content_hash"], "raw_id": raw_id} for row in rows
+    ])
+    db.session.commit()
+
+def _write_page_bisect(rows: List[Dict[str, Any]], result: Dict[str, Any]) -> None:
+    for attempt in range(PAGE_WRITE_ATTEMPTS):
+        try:
+            _execute_page(rows)
+            result["inserted"] += len(rows)
+            result["pages"] += 1
+            return
+        except IntegrityError as e:
+            db.session.rollback()
+            error = e
+            # Another writer may have stored some of these items since the pre-check
+            try:
+                existing = _existing_item_hashes([row["content_hash"] for row in rows])
+            except Exception as lookup_e:
+                db.session.rollback()
+                debug_logger.warning(
+                    f"[RAW_WRITER] Item hash lookup failed after insert race, {len(rows)} items not written: {lookup_e}"
+                )
+                result["failed"] += len(rows)
+                result["rejected"].extend(row["content_hash"] for row in rows)
+                result["errors"].append(f"item_hash_lookup: {lookup_e}")
+                return
+            fresh = [row for row in rows if row["content_hash"] not in existing]
+            result["duplicates"] += len(rows) - len(fresh)
+            if not fresh:
+                return
+            if len(fresh) < len(rows) and attempt < PAGE_WRITE_ATTEMPTS - 1:
+                rows = fresh
+                continue
+            rows = fresh
+        except Exception as e:
+            db.session.rollback()
+            error = e
+        break
+
+    if len(rows) == 1:
+        h = rows[0]["content_hash"].hex()[:16]
+        debug_logger.warning(f"[RAW_WRITER] Page item rejected hash={h}...: {error}")
+        result["failed"] += 1
+        result["rejected"].append(rows[0]["content_hash"])
+        result["errors"].append(f"row_rejected hash={h}: {error}")
+        return
+    debug_logger.warning(f"[RAW_WRITER] Page of {len(rows)} items rejected, bisecting: {error}")
+    mid = len(rows) // 2
+    _write_page_bisect(rows[:mid], result)
+    _write_page_bisect(rows[mid:], result)
+
+def upsert_raw_page(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Store a batch of item rows (as built for upsert_raw_rows, all one source) as a
+    single page row. Items already stored anywhere are skipped and counted as duplicates.
+
+    Returns the upsert_raw_rows counters (per item) plus "pages": raw rows written.
+    """
+    result: Dict[str, Any] = {"inserted": 0, "duplicates": 0, "failed": 0, "prechecked": 0, "pages": 0, "errors": [], "rejected": []}
+    if not rows:
+        return result
+
+    try:
+        existing = _existing_item_hashes([row["content_hash"] for row in rows])
+    except Exception as e:
+        db.session.rollback()
+        debug_logger.warning(f"[RAW_WRITER] Item hash lookup failed, page not written: {e}")
+        result["failed"] = len(rows)
+        result["rejected"] = [row["content_hash"] for row in rows]
+        result["errors"].append(f"item_hash_lookup: {e}")
+        return result
+    fresh = [row for row in rows if row["content_hash"] not in existing]
+    result["duplicates"] += len(rows) - len(fresh)
+    result["prechecked"] += len(rows) - len(fresh)
+    if fresh:
+        _write_page_bisect(fresh, result)
+
+    debug_logger.debug(
+        f"[RAW_WRITER] page items={len(rows)} inserted={result['inserted']} duplicates={result['duplicates']} "
+        f"pages={result['pages']} failed={result['failed']}"
+    )
+    return result
@@ -0,0 +1,217 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Optional on-disk cache of raw API responses, so an extraction can be replayed
+#   (debugging, reprocessing, benchmarks) without spending third-party quota.
+# - Layout under RESPONSE_CACHE_ROOT:
+#     objects/<sha[:2]>/<sha>.gz       gzipped body, named by the SHA-256 of the body
+#                                      (identical bodies are stored once)
+#     sources/<source_id>/<key>.json   {"url", "status", "headers", "body": <sha>, "size", "stored_at"}
+#   <key> is the SHA-256 of the page URL minus the source's ignored query params (the
+#   incremental watermark param), so each page keeps its latest recording whatever
+#   watermark it was fetched with.
+# - Recording keeps 200 responses only. Streamed bodies are teed to disk as they are
+#   decoded and only kept if they were read to the end.
+# - Replay hands back requests.Response objects reading straight from the gzip file,
+#   so callers (r.json(), r.iter_content()) can't tell them from live ones.
+# - Cache failures are logged and counted, never raised into the extraction.
+# - Nothing expires on its own; delete the directory (or a source's folder) to reset.
+# ------------------------------------------------------------------------------------
+# Imports:
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Collection, Dict, Iterable, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Local Imports
+from app.utils.logging import debug_logger
+
+# ------------------------------------------------------------------------------------
+# Vars
+COMPRESS_LEVEL = 6
+OBJECTS_DIR = "objects"
+SOURCES_DIR = "sources"
+
+# Describe the transfer, not the body (which is stored decoded)
+_DROPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection", "set-cookie", "keep-alive"}
+
+# ------------------------------------------------------------------------------------
+# Classes
+
+class ResponseCacheMiss(LookupError):
+    """Offline replay asked for a page that was never recorded."""
+
+class ResponseCache:
+    """
+    Content-addressed response store shared by every thread of one extract run.
+
+        cache = ResponseCache(current_app.config["RESPONSE_CACHE_ROOT"])
+        cache.store(source_id, url, r, r.content)        # buffered body
+        chunks = cache.tee(source_id, url, r, chunks)    # streamed body
+        r = cache.load(source_id, url)                   # None if never recorded
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._stats = empty_stats()
+
+    # -- keys / paths -----------------------------------------------------------------
+
+    @staticmethod
+    def key(url: str, ignore: Collection[str] = ()) -> str:
+        """SHA-256 hex of url with the ignored query params removed."""
+        if ignore:
+            parts = urlsplit(url)
+            query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in ignore]
+            url = urlunsplit(parts._replace(query=urlencode(query)))
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.root, OBJECTS_DIR, sha[:2], f"{sha}.gz")
+
+    def _index_path(self, source_id: int, key: str) -> str:
+        return os.path.join(self.root, SOURCES_DIR, str(int(source_id)), f"{key}.json")
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                self._stats[k] += v
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    # -- recording --------------------------------------------------------------------
+
+    def _tmp_path(self) -> str:
+        tmp_dir = os.path.join(self.root, OBJECTS_DIR, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        return os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    def _commit(self, source_id: int, url: str, r, tmp: str, sha: str, size: int, ignore: Collection[str]) -> None:
+        """Move a finished body into objects/ and point the page's index entry at it."""
+        path = self._object_path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(tmp)
+        else:
+            os.replace(tmp, path)
+
+        index = self._index_path(source_id, self.key(url, ignore))
+        os.makedirs(os.path.dirname(index), exist_ok=True)
+        entry = {
+            "url": url,
+            "status": r.status_code,
+            "headers": {k: v for k, v in r.headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "body": sha,
+            "size": size,
+            "stored_at": datetime.utcnow().isoformat(),
+        }
+        tmp_index = f"{index}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_index, index)
+        self._count(stored=1)
+
+    def store(self, source_id: int, url: str, r, body: bytes, ignore: Collection[str] = ()) -> None:
+        """Record a fully read 200 response."""
+        if r.status_code != 200:
+            return
+        tmp = None
+        try:
+            tmp = self._tmp_path()
+            with gzip.open(tmp, "wb", compresslevel=COMPRESS_LEVEL) as f:
+                f.write(body)
+            self._commit(source_id, url, r, tmp, hashlib.sha256(body).hexdigest(), len(body), ignore)
+        except OSError as e:
+            self._count(errors=1)
+            debug_logger.warning(f"[RESPONSE_CACHE] Could not store {url}: {e}")
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+
+    def tee(self, source_id: int, url: str, r, chunks: Iterable[bytes], ignore: Collection[str] = ()) -> Iterator[bytes]:
+        """Pass chunks through unchanged, recording them; kept only if the body is read to the end."""
+        if r.status_code != 200:
+            yield from chunks
+            return
+        tmp = None
+        f = None
+        try:
+            tmp = self._tmp_path()
+            f = gzip.open(tmp, "wb", compresslevel=COMPRESS_LEVEL)
+        except OSError as e:
+            self._count(errors=1)
+            debug_logger.warning(f"[RESPONSE_CACHE] Could not record {url}: {e}")
+            tmp = None
+        sha = hashlib.sha256()
+        size = 0
+        complete = False
+        try:
+            for chunk in chunks:
+                if f is not None:
+                    try:
+                        f.write(chunk)
+                        sha.update(chunk)
+                        size += len(chunk)
+                    except OSError as e:
+                        self._count(errors=1)
+                        debug_logger.warning(f"[RESPONSE_CACHE] Could not record {url}: {e}")
+                        f.close()
+                        f = None
+                yield chunk
+            complete = True
+        finally:
+            if f is not None:
+                f.close()
+                if complete:
+                    try:
+                        self._commit(source_id, url, r, tmp, sha.hexdigest(), size, ignore)
+                        tmp = None
+                    except OSError as e:
+                        self._count(errors=1)
+                        debug_logger.warning(f"[RESPONSE_CACHE] Could not store {url}: {e}")
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+
+    # -- replay -----------------------------------------------------------------------
+
+    def load(self, source_id: int, url: str, ignore: Collection[str] = ()) -> Optional[requests.Response]:
+        """Recorded response for url (body streamed from disk), or None."""
+        try:
+            with open(self._index_path(source_id, self.key(url, ignore)), encoding="utf-8") as f:
+                entry = json.load(f)
+            raw = gzip.open(self._object_path(entry["body"]), "rb")
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                self._count(errors=1)
+                debug_logger.warning(f"[RESPONSE_CACHE] Unreadable entry for {url}: {e}")
+            self._count(missed=1)
+            return None
+
+        r = requests.Response()
+        r.status_code = int(entry.get("status") or 200)
+        r.reason = "OK"
+        r.url = url
+        r.headers = CaseInsensitiveDict(entry.get("headers") or {})
+        r.headers["Content-Length"] = str(int(entry.get("size") or 0))
+        r.raw = raw
+        self._count(replayed=1)
+        return r
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def empty_stats() -> Dict[str, int]:
+    return {"stored": 0, "replayed": 0, "missed": 0, "errors": 0}
@@ -13,7 +13,8 @@ from flask import session, request
 # Local Imports
 from app.utils.logging import logger, unauthorized_logger
 from app.extensions import db
-from app.models.user import User
+from app.models.user import User, UserApiKey
+from app.utils.helpers import hash_input
 
 # ------------------------------------------------------------------------------------
 # Var Decs
@@ -45,4 +46,25 @@ def authorizeUser(required_roles=None, required_permissions=None):
 
     except Exception as e:
         logger.error("Authorization failure: %s", e, exc_info=True)
-        raise PermissionError("Unauthorized")
\ No newline at end of file
+        raise PermissionError("Unauthorized")
+
+# API key auth for machine clients (X-API-Key or Authorization: Bearer <key>)
+def authorizeApiKey():
+    auth = request.headers.get("Authorization", "")
+    api_key = request.headers.get("X-API-Key") or (auth[7:].strip() if auth.lower().startswith("bearer ") else None)
+    if not api_key:
+        unauthorized_logger.warning(
+            f"Unauthorized access: No API key. "
+            f"IP={request.remote_addr}, Path={request.path}, Method={request.method}"
+        )
+        raise PermissionError("Unauthorized")
+
+    key = db.session.query(UserApiKey).filter_by(hashed_api_key=hash_input(api_key)).first()
+    if not key or not key.user_id:
+        unauthorized_logger.warning(
+            f"Unauthorized access: Unknown API key. "
+            f"IP={request.remote_addr}, Path={request.path}, Method={request.method}"
+        )
+        raise PermissionError("Unauthorized")
+
+    return key.user_id
@@ -0,0 +1,117 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Per-source health and circuit breaker state (data_source_state).
+# - closed:    extract normally. Each failed run bumps consecutive_failures; at
+#              CIRCUIT_FAILURE_THRESHOLD the circuit opens.
+# - open:      runs skip the source until the cooldown has passed (doubling per extra
+#              failure, capped at CIRCUIT_MAX_COOLDOWN_SECONDS), then allow one cheap probe.
+# - half_open: the probe passed; the next full run closes the circuit on success or
+#              re-opens it on failure.
+# - A "failure" is a source run that aborted (HTTP error, timeout, bad JSON, ...), not
+#   individual rejected rows.
+# ------------------------------------------------------------------------------------
+# Imports:
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+# Local Imports
+from app.extensions import db
+from app.models.data_sources import DataSourceState
+
+# ------------------------------------------------------------------------------------
+# Vars
+CIRCUIT_FAILURE_THRESHOLD = 3        # consecutive failed runs before the circuit opens
+CIRCUIT_COOLDOWN_SECONDS = 3600      # first open period; doubles per further failure
+CIRCUIT_MAX_COOLDOWN_SECONDS = 86400
+LAST_ERROR_MAX_CHARS = 2000
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gate decisions
+RUN = "run"
+SKIP = "skip"
+PROBE = "probe"
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def load_health(source_id: int) -> Dict[str, Any]:
+    state = db.session.get(DataSourceState, source_id)
+    if state is None:
+        return {
+            "circuit_state": CLOSED,
+            "consecutive_failures": 0,
+            "total_failures": 0,
+            "circuit_opened_at": None,
+        }
+    return {
+        "circuit_state": state.circuit_state or CLOSED,
+        "consecutive_failures": state.consecutive_failures or 0,
+        "total_failures": state.total_failures or 0,
+        "circuit_opened_at": state.circuit_opened_at,
+    }
+
+def cooldown_seconds(consecutive_failures: int) -> int:
+    extra = max(consecutive_failures - CIRCUIT_FAILURE_THRESHOLD, 0)
+    return min(CIRCUIT_COOLDOWN_SECONDS * (2 ** min(extra, 16)), CIRCUIT_MAX_COOLDOWN_SECONDS)
+
+def circuit_gate(health: Dict[str, Any], now: Optional[datetime] = None) -> Tuple[str, Optional[datetime]]:
+    """
+    What this run should do with the source: RUN, SKIP (circuit open, still cooling
+    down) or PROBE (cooldown over). Returns (decision, retry_at) - retry_at is when a
+    skipped source will next be probed.
+    """
+    if health["circuit_state"] != OPEN:
+        return RUN, None
+    now = now or datetime.utcnow()
+    opened_at = health.get("circuit_opened_at") or now
+    retry_at = opened_at + timedelta(seconds=cooldown_seconds(health["consecutive_failures"]))
+    if now < retry_at:
+        return SKIP, retry_at
+    return PROBE, None
+
+def _upsert_state(source_id: int, **values) -> None:
+    values["updated_at"] = datetime.utcnow()
+    stmt = mysql_insert(DataSourceState.__table__).values(source_id=source_id, **values)
+    stmt = stmt.on_duplicate_key_update(**{k: getattr(stmt.inserted, k) for k in values})
+    db.session.execute(stmt)
+
+def record_success(source_id: int) -> None:
+    """Source run completed: close the circuit. Caller commits."""
+    _upsert_state(
+        source_id,
+        circuit_state=CLOSED,
+        consecutive_failures=0,
+        circuit_opened_at=None,
+        last_success_at=datetime.utcnow(),
+    )
+
+def record_failure(source_id: int, health: Dict[str, Any], error: str) -> Dict[str, Any]:
+    """
+    Source run (or probe) failed: bump the counters and open the circuit once the
+    threshold is reached; a failure while half-open or open re-opens it immediately.
+    Returns the new health. Caller commits.
+    """
+    now = datetime.utcnow()
+    failures = health["consecutive_failures"] + 1
+    reopen = health["circuit_state"] in (OPEN, HALF_OPEN) or failures >= CIRCUIT_FAILURE_THRESHOLD
+    new = {
+        "circuit_state": OPEN if reopen else CLOSED,
+        "consecutive_failures": failures,
+        "total_failures": health["total_failures"] + 1,
+        "circuit_opened_at": now if reopen else None,
+    }
+    _upsert_state(source_id, last_error=str(error)[:LAST_ERROR_MAX_CHARS], last_error_at=now, **new)
+    return new
+
+def mark_half_open(source_id: int) -> None:
+    """Probe passed: let the next full run decide. Caller commits."""
+    _upsert_state(source_id, circuit_state=HALF_OPEN)
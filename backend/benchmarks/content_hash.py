@@ -0,0 +1,212 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Micro-benchmark for app/utils/content_hash.py backends on realistic payloads
+#   (WooCommerce REST v3 orders and lead records, generated with Faker).
+# - Before timing, checks that every backend yields byte-identical digests to the
+#   stdlib reference on the payloads plus float/unicode edge cases; exits 1 if not.
+#
+# Usage (from backend/):
+#   python -m benchmarks.content_hash
+#   python -m benchmarks.content_hash --items 5000 --repeat 5
+# ------------------------------------------------------------------------------------
+# Imports:
+import argparse
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from faker import Faker
+
+# Local Imports
+from app.utils.content_hash import BACKENDS, ContentHasher, canonical_json
+
+# ------------------------------------------------------------------------------------
+# Vars
+fake = Faker()
+
+EDGE_CASES: List[Any] = [
+    {"price": 1e16, "tiny": 1e-7, "small": 1e-5, "neg": -0.0, "big": 2 ** 70},
+    {"nan": float("nan"), "inf": float("inf"), "ninf": float("-inf")},
+    {"fixed": 0.0001, "max_fixed": 9999999999999998.0, "ratio": 0.73, "pi": 3.141592653589793},
+    {"text": "naïve café 😀   \x00\x1f \"quoted\" \\ /", "é": 1, "z": 2, "a": [None, True, False]},
+    {"nested": {"b": [{"y": 1, "x": 2}], "a": {}}, "empty_list": [], "empty_str": ""},
+]
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def _money(lo: float, hi: float) -> str:
+    return f"{random.uniform(lo, hi):.2f}"
+
+def _address(with_contact: bool) -> Dict[str, Any]:
+    out = {
+        "first_name": fake.first_name(),
+        "last_name": fake.last_name(),
+        "company": fake.company() if random.random() < 0.2 else "",
+        "address_1": fake.street_address(),
+        "address_2": "",
+        "city": fake.city(),
+        "state": fake.state_abbr(),
+        "postcode": fake.postcode(),
+        "country": "US",
+        "phone": fake.phone_number(),
+    }
+    if with_contact:
+        out["email"] = fake.email()
+    return out
+
+def woo_order(order_id: int) -> Dict[str, Any]:
+    """One order shaped like GET /wp-json/wc/v3/orders."""
+    line_items = []
+    for i in range(random.randint(1, 5)):
+        qty = random.randint(1, 3)
+        price = round(random.uniform(5, 120), 2)
+        line_items.append({
+            "id": order_id * 10 + i,
+            "name": fake.catch_phrase(),
+            "product_id": random.randint(10, 900),
+            "variation_id": 0,
+            "quantity": qty,
+            "tax_class": "",
+            "subtotal": f"{price * qty:.2f}",
+            "subtotal_tax": "0.00",
+            "total": f"{price * qty:.2f}",
+            "total_tax": "0.00",
+            "taxes": [],
+            "meta_data": [],
+            "sku": fake.bothify("SKU-####-??"),
+            "price": price,
+            "image": {"id": str(random.randint(1, 999)), "src": fake.image_url()},
+            "parent_name": None,
+        })
+    created = fake.date_time_this_year()
+    return {
+        "id": order_id,
+        "parent_id": 0,
+        "status": random.choice(["processing", "completed", "on-hold", "refunded"]),
+        "currency": "USD",
+        "version": "8.9.1",
+        "prices_include_tax": False,
+        "date_created": created.isoformat(),
+        "date_created_gmt": created.isoformat(),
+        "date_modified": created.isoformat(),
+        "date_modified_gmt": created.isoformat(),
+        "discount_total": "0.00",
+        "discount_tax": "0.00",
+        "shipping_total": _money(0, 15),
+        "shipping_tax": "0.00",
+        "cart_tax": "0.00",
+        "total": _money(10, 500),
+        "total_tax": "0.00",
+        "customer_id": random.randint(1, 5000),
+        "order_key": fake.bothify("wc_order_????????????"),
+        "billing": _address(with_contact=True),
+        "shipping": _address(with_contact=False),
+        "payment_method": "stripe",
+        "payment_method_title": "Credit Card (Stripe)",
+        "transaction_id": fake.bothify("ch_########################"),
+        "customer_ip_address": fake.ipv4(),
+        "customer_user_agent": fake.user_agent(),
+        "created_via": "checkout",
+        "customer_note": fake.sentence() if random.random() < 0.1 else "",
+        "date_completed": None,
+        "date_paid": created.isoformat(),
+        "cart_hash": fake.md5(),
+        "number": str(order_id),
+        "meta_data": [
+            {"id": order_id * 100 + i, "key": key, "value": fake.word()}
+            for i, key in enumerate(["_utm_source", "_utm_medium", "_utm_campaign", "_wc_order_attribution_source_type"])
+        ],
+        "line_items": line_items,
+        "tax_lines": [],
+        "shipping_lines": [{"id": order_id, "method_title": "Flat rate", "method_id": "flat_rate", "total": _money(0, 15), "total_tax": "0.00", "taxes": [], "meta_data": []}],
+        "fee_lines": [],
+        "coupon_lines": [],
+        "refunds": [],
+        "payment_url": f"https://shop.example.com/checkout/order-pay/{order_id}/",
+        "is_editable": False,
+        "needs_payment": False,
+        "needs_processing": True,
+        "_links": {
+            "self": [{"href": f"https://shop.example.com/wp-json/wc/v3/orders/{order_id}"}],
+            "collection": [{"href": "https://shop.example.com/wp-json/wc/v3/orders"}],
+        },
+    }
+
+def lead(lead_id: int) -> Dict[str, Any]:
+    """One flat lead/contact record."""
+    return {
+        "id": lead_id,
+        "first_name": fake.first_name(),
+        "last_name": fake.last_name(),
+        "email": fake.email(),
+        "phone": fake.phone_number(),
+        "city": fake.city(),
+        "state": fake.state_abbr(),
+        "country": "US",
+        "source": random.choice(["meta", "google", "organic", "email", "referral"]),
+        "campaign": fake.word(),
+        "score": round(random.random(), 4),
+        "consent": random.random() < 0.8,
+        "created_at": fake.iso8601(),
+        "notes": None,
+    }
+
+def check_equivalence(items: List[Any]) -> int:
+    """Number of (backend, item) pairs whose digest differs from the stdlib reference."""
+    reference = ContentHasher("json")
+    mismatches = 0
+    for backend in BACKENDS:
+        hasher = ContentHasher(backend)
+        for item in items:
+            if hasher.digest(item) != reference.digest(item):
+                mismatches += 1
+                print(f"  MISMATCH backend={backend} item={canonical_json(item)[:120]}")
+    return mismatches
+
+def bench(name: str, items: List[Any], repeat: int) -> None:
+    print(f"\n{name}: {len(items)} items, best of {repeat}")
+    base = None
+    for backend in BACKENDS:
+        hasher = ContentHasher(backend)
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for item in items:
+                hasher.digest(item)
+            best = min(best, time.perf_counter() - t0)
+        per_item_us = best / len(items) * 1e6
+        base = base or per_item_us
+        print(f"  {backend:<8} {per_item_us:8.2f} us/item  {base / per_item_us:5.2f}x  {hasher.stats()}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark content hash backends")
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    Faker.seed(args.seed)
+    orders = [woo_order(1000 + i) for i in range(args.items)]
+    leads = [lead(1 + i) for i in range(args.items)]
+    floats = [{"v": random.uniform(-1, 1) * 10 ** random.randint(-12, 20)} for _ in range(args.items)]
+
+    print("Checking digests against the stdlib reference ...")
+    mismatches = check_equivalence(EDGE_CASES + orders[:200] + leads[:200] + floats)
+    if mismatches:
+        print(f"FAILED: {mismatches} mismatching digests")
+        return 1
+    print("  all backends byte-identical")
+
+    bench("WooCommerce orders", orders, args.repeat)
+    bench("Leads", leads, args.repeat)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
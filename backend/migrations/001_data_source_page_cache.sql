@@ -0,0 +1,16 @@
+-- ------------------------------------------------------------------------------------
+-- 001: data_source_page_cache
+-- Conditional GET validators per source page (DataSourcePageCache, app/models/data_sources.py).
+-- ------------------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS data_source_page_cache (
+    id BIGINT NOT NULL AUTO_INCREMENT,
+    source_id BIGINT NOT NULL,
+    url_hash BINARY(32) NOT NULL,
+    url TEXT NOT NULL,
+    etag VARCHAR(512),
+    last_modified VARCHAR(64),
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_page_cache_source_url UNIQUE (source_id, url_hash),
+    FOREIGN KEY (source_id) REFERENCES data_sources (id) ON DELETE CASCADE
+);
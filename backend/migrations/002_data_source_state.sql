@@ -0,0 +1,13 @@
+-- ------------------------------------------------------------------------------------
+-- 002: data_source_state
+-- Per-source extraction state with the incremental watermark (DataSourceState,
+-- app/models/data_sources.py). Later columns are added by 003 and 004.
+-- ------------------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS data_source_state (
+    source_id BIGINT NOT NULL,
+    watermark VARCHAR(255),
+    watermark_updated_at DATETIME,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (source_id),
+    FOREIGN KEY (source_id) REFERENCES data_sources (id) ON DELETE CASCADE
+);
@@ -0,0 +1,15 @@
+-- ------------------------------------------------------------------------------------
+-- 003: data_source_state circuit breaker columns
+-- Source health / circuit breaker state (app/utils/source_health.py). Existing rows
+-- start closed with zero failures.
+-- Skip if data_source_state was created by create_all after this change (the columns
+-- are already there).
+-- ------------------------------------------------------------------------------------
+ALTER TABLE data_source_state
+    ADD COLUMN circuit_state ENUM('closed','open','half_open') NOT NULL DEFAULT 'closed' AFTER watermark_updated_at,
+    ADD COLUMN circuit_opened_at DATETIME AFTER circuit_state,
+    ADD COLUMN consecutive_failures INTEGER NOT NULL DEFAULT 0 AFTER circuit_opened_at,
+    ADD COLUMN total_failures INTEGER NOT NULL DEFAULT 0 AFTER consecutive_failures,
+    ADD COLUMN last_error TEXT AFTER total_failures,
+    ADD COLUMN last_error_at DATETIME AFTER last_error,
+    ADD COLUMN last_success_at DATETIME AFTER last_error_at;
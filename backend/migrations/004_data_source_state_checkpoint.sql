@@ -0,0 +1,12 @@
+-- ------------------------------------------------------------------------------------
+-- 004: data_source_state checkpoint columns
+-- Resume point of an unfinished extraction walk (cleared when a walk completes).
+-- Skip if data_source_state was created by create_all after this change.
+-- ------------------------------------------------------------------------------------
+ALTER TABLE data_source_state
+    ADD COLUMN checkpoint_page INTEGER AFTER last_success_at,
+    ADD COLUMN checkpoint_next_url TEXT AFTER checkpoint_page,
+    ADD COLUMN checkpoint_run_id VARCHAR(64) AFTER checkpoint_next_url,
+    ADD COLUMN checkpoint_url_hash BINARY(32) AFTER checkpoint_run_id,
+    ADD COLUMN checkpoint_watermark VARCHAR(255) AFTER checkpoint_url_hash,
+    ADD COLUMN checkpoint_at DATETIME AFTER checkpoint_watermark;
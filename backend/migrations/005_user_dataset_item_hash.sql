@@ -0,0 +1,11 @@
+-- ------------------------------------------------------------------------------------
+-- 005: user_dataset_item_hash
+-- Item hashes of page-mode raw rows (UserDatasetItemHash, app/utils/raw_writer.py).
+-- ------------------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS user_dataset_item_hash (
+    content_hash BINARY(32) NOT NULL,
+    raw_id BIGINT NOT NULL,
+    PRIMARY KEY (content_hash),
+    INDEX idx_item_hash_raw (raw_id),
+    FOREIGN KEY (raw_id) REFERENCES user_dataset_raw (id) ON DELETE CASCADE
+);
@@ -0,0 +1,7 @@
+-- ------------------------------------------------------------------------------------
+-- 006: analytics_etl_state.last_raw_id -> BIGINT
+-- Holds user_dataset_raw.id (BIGINT) watermarks for transform_data_task. Safe to run
+-- again (MODIFY to the same type is a no-op).
+-- ------------------------------------------------------------------------------------
+ALTER TABLE analytics_etl_state
+    MODIFY COLUMN last_raw_id BIGINT NOT NULL DEFAULT 0;
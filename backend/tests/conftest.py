@@ -0,0 +1,35 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Shared pytest fixtures. Run from backend/: python -m pytest -q
+# - Nothing here talks to MySQL, Redis or a live API. `app` is a bare Flask app bound to
+#   an in-memory SQLite database so db.session works; tests create only the tables
+#   they need.
+# ------------------------------------------------------------------------------------
+# Imports:
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local Imports
+from app.extensions import db
+
+# ------------------------------------------------------------------------------------
+# Fixtures
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    with app.app_context():
+        yield app
+        db.session.remove()
@@ -0,0 +1,87 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - ContentHasher (app/utils/content_hash.py): every backend must hash to the bytes of
+#   the stdlib reference form, or stored rows stop deduping. Also hash_exclude paths.
+# ------------------------------------------------------------------------------------
+# Imports:
+import hashlib
+
+import pytest
+
+# Local Imports
+from app.utils.content_hash import (
+    BACKENDS,
+    ContentHasher,
+    canonical_json,
+    compile_exclusions,
+    get_hasher,
+    strip_fields,
+)
+
+# ------------------------------------------------------------------------------------
+# Vars
+ITEMS = [
+    {"b": 1, "a": [True, None, "x"], "c": {"z": 1.5, "y": -2}},
+    {"name": "Zoë", "emoji": "🚀", "quote": "\"q\"", "ctl": "\n\t\u0001", "slash": "a/b"},
+    {"small": 0.5, "neg": -123.25, "zero": 0.0, "int": 2 ** 62, "nested": [[{"k": [1, {}]}]]},
+    {"tiny": 1e-7, "huge": 1.5e20, "ok": 0.1},   # exponent-form floats: msgspec falls back
+    {"nan": float("nan")},
+    [],
+    {},
+]
+
+# ------------------------------------------------------------------------------------
+# Tests
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("item", ITEMS)
+def test_backends_match_reference(backend, item):
+    hasher = ContentHasher(backend)
+    reference = canonical_json(item).encode("utf-8")
+    assert hasher.canonical(item) == reference
+    assert hasher.digest(item) == hashlib.sha256(reference).digest()
+
+def test_key_order_does_not_matter():
+    hasher = ContentHasher("json")
+    assert hasher.digest({"a": 1, "b": {"c": 2, "d": 3}}) == hasher.digest({"b": {"d": 3, "c": 2}, "a": 1})
+
+def test_msgspec_fallback_is_counted():
+    hasher = ContentHasher("msgspec")
+    hasher.digest({"a": 1})
+    hasher.digest({"a": 1e-9})
+    hasher.digest({1: "non-str key"})
+    assert hasher.stats() == {"backend": "msgspec", "fast": 1, "fallback": 2}
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        ContentHasher("nope")
+    assert get_hasher("nope").backend == "json"
+    assert get_hasher("auto").backend in BACKENDS
+
+def test_compile_exclusions():
+    assert compile_exclusions(None) is None
+    assert compile_exclusions([]) is None
+    assert compile_exclusions("date_modified") is None
+    assert compile_exclusions(["a", "meta.request_id", "", "x..y", 3]) == {"a": None, "meta": {"request_id": None}}
+    # A dropped parent swallows its children, in either order
+    assert compile_exclusions(["meta", "meta.request_id"]) == {"meta": None}
+    assert compile_exclusions(["meta.request_id", "meta"]) == {"meta": None}
+
+def test_strip_fields_leaves_item_untouched():
+    item = {"id": 1, "modified": "t1", "meta": {"request_id": "r", "v": 2}, "lines": [{"sku": "a", "ts": 1}]}
+    tree = compile_exclusions(["modified", "meta.request_id", "lines.ts"])
+    assert strip_fields(item, tree) == {"id": 1, "meta": {"v": 2}, "lines": [{"sku": "a"}]}
+    assert item["modified"] == "t1" and item["meta"]["request_id"] == "r" and item["lines"][0]["ts"] == 1
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_excluded_fields_do_not_change_the_hash(backend):
+    hasher = ContentHasher(backend)
+    tree = compile_exclusions(["date_modified", "_links"])
+    a = {"id": 1, "date_modified": "2024-01-01", "_links": {"self": "x"}}
+    b = {"id": 1, "date_modified": "2024-02-01", "_links": {"self": "y"}}
+    assert hasher.digest(a, tree) == hasher.digest(b, tree) == hasher.digest({"id": 1})
+    assert hasher.digest(a) != hasher.digest(b)
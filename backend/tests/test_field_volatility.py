@@ -0,0 +1,79 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - field_volatility.analyze (app/utils/field_volatility.py) on synthetic record
+#   histories: noise fields change in every copy, real updates only now and then.
+# ------------------------------------------------------------------------------------
+# Imports:
+from app.utils import field_volatility
+from app.utils.field_volatility import MIN_PAIRS, analyze, record_key
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def _history(copies: int, records: int = 2):
+    """`copies` stored versions of each record; status changes every 5th copy, the rest is noise."""
+    out = []
+    for n in range(copies):
+        for rid in range(records):
+            out.append({
+                "id": rid,
+                "status": "paid" if n >= 5 else "open",
+                "date_modified": f"2024-01-01T00:00:{n:02d}",
+                "_links": {"self": f"/orders/{rid}?r={n}", "collection": f"/orders?r={n}"},
+                "meta": {"request_id": f"req-{n}", "version": 1},
+            })
+    return out
+
+# ------------------------------------------------------------------------------------
+# Tests
+
+def test_record_key():
+    assert record_key({"id": 1}) != record_key({"id": "1"})
+    assert record_key({"uuid": "u", "id": 3}) == record_key({"id": 3})
+    assert record_key({"sku": "a"}) is None
+    assert record_key({"sku": "a"}, key_field="sku") == '"a"'
+    assert record_key({"id": {"nested": 1}}) is None
+
+def test_suggests_noise_fields():
+    report = analyze(_history(MIN_PAIRS + 1))
+    assert report["records"] == report["keyed"] == 2 * (MIN_PAIRS + 1)
+    assert report["distinct"] == 2
+    assert report["pairs"] == 2 * MIN_PAIRS
+    # _links goes in whole since all its fields are noise; meta only loses request_id
+    assert sorted(report["suggested"]) == ["_links", "date_modified", "meta.request_id"]
+    rates = {f["field"]: f["rate"] for f in report["fields"]}
+    assert rates["date_modified"] == 1.0
+    assert rates["status"] == 0.1
+    # Only the status change is a real update; every other pair was redundant
+    assert report["redundant"] == report["pairs"] - 2
+
+def test_nothing_suggested_below_min_pairs():
+    report = analyze(_history(MIN_PAIRS // 2))
+    assert report["suggested"] == []
+    assert report["fields"]
+
+def test_excluded_fields_are_flagged_not_suggested():
+    report = analyze(_history(MIN_PAIRS + 1), hash_exclude=["date_modified"])
+    fields = {f["field"]: f for f in report["fields"]}
+    assert fields["date_modified"]["excluded"] is True
+    assert "date_modified" not in report["suggested"]
+    assert report["redundant"] == report["pairs"] - 2
+
+def test_depth_limit(monkeypatch):
+    monkeypatch.setattr(field_volatility, "MAX_DEPTH", 1)
+    report = analyze(_history(MIN_PAIRS + 1))
+    assert sorted(report["suggested"]) == ["_links", "date_modified", "meta"]
+
+def test_unkeyed_and_non_dict_records_are_counted_only():
+    report = analyze([{"id": 1, "v": 1}, {"v": 2}, "text", {"id": 1, "v": 3}])
+    assert (report["records"], report["keyed"], report["distinct"], report["pairs"]) == (4, 2, 1, 1)
+    assert report["fields"] == [{"field": "v", "changed": 1, "rate": 1.0, "excluded": False}]
+
+def test_custom_key_field():
+    rows = [{"sku": "a", "id": n, "v": n} for n in range(3)]
+    assert analyze(rows)["pairs"] == 0
+    assert analyze(rows, key_field="sku")["pairs"] == 2
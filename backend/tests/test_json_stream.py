@@ -0,0 +1,90 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - StreamedPage (app/utils/json_stream.py) against the page shapes it supports, fed
+#   in chunks that split values, numbers and multi-byte characters.
+# ------------------------------------------------------------------------------------
+# Imports:
+import json
+
+import pytest
+
+# Local Imports
+from app.utils.json_stream import StreamedPage
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def _chunked(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+def _stream(doc, size: int = 7) -> StreamedPage:
+    return StreamedPage(_chunked(json.dumps(doc).encode("utf-8"), size))
+
+# ------------------------------------------------------------------------------------
+# Tests
+
+def test_bare_array():
+    page = _stream([{"id": 1}, {"id": 2}])
+    assert list(page) == [{"id": 1}, {"id": 2}]
+    assert page.items_key == ""
+    assert page.count == 2
+    assert page.envelope == {}
+
+@pytest.mark.parametrize("key", ["data", "items", "results", "records", "rows"])
+def test_envelope_keeps_other_keys(key):
+    doc = {"meta": {"total": 2}, key: [{"id": 1}, {"id": 2}], "next": "https://x/api?page=2"}
+    page = _stream(doc)
+    assert list(page) == doc[key]
+    assert page.items_key == key
+    assert page.envelope == {"meta": {"total": 2}, "next": "https://x/api?page=2"}
+
+def test_nested_data_items():
+    doc = {"data": {"items": [{"id": 1}], "cursor": "abc"}, "links": {"next": None}}
+    page = _stream(doc)
+    assert list(page) == [{"id": 1}]
+    assert page.items_key == "data.items"
+    assert page.envelope == {"data": {"cursor": "abc"}, "links": {"next": None}}
+
+def test_first_envelope_list_wins():
+    page = _stream({"results": [{"id": 1}], "data": [{"id": 2}]})
+    assert list(page) == [{"id": 1}]
+    assert page.items_key == "results"
+    assert page.envelope == {"data": [{"id": 2}]}
+
+def test_single_record_object():
+    doc = {"id": 7, "name": "x"}
+    page = _stream(doc)
+    assert list(page) == [doc]
+    assert page.items_key == "$record"
+    assert page.count == 1
+
+def test_non_dict_items_are_skipped():
+    page = _stream([1, "a", {"id": 1}, None])
+    assert list(page) == [{"id": 1}]
+    assert page.count == 1
+
+def test_empty_bodies():
+    assert list(StreamedPage([])) == []
+    assert list(_stream([])) == []
+    assert list(_stream({"data": []})) == []
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 64])
+def test_values_split_across_chunks(size):
+    doc = {"data": [{"n": 12345.678e5, "big": 123456789012345678, "s": "zürich ☃ 🚀", "neg": -0.5}] * 3}
+    page = _stream(doc, size)
+    assert list(page) == doc["data"]
+
+def test_number_at_end_of_chunk_is_not_cut():
+    assert list(StreamedPage([b'[{"n":12', b'3', b'4}]'])) == [{"n": 1234}]
+
+def test_utf8_bom():
+    assert list(StreamedPage([b"\xef\xbb\xbf", b'[{"id":1}]'])) == [{"id": 1}]
+
+@pytest.mark.parametrize("body", [b'[{"id":1}', b'[{"id":1}] x', b'{"data":[{"id":1}] "x":1}'])
+def test_malformed_bodies_raise(body):
+    with pytest.raises(json.JSONDecodeError):
+        list(StreamedPage(_chunked(body, 3)))
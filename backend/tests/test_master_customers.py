@@ -0,0 +1,150 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - transform_data._resolve_master_customers against a real customers_clean table in
+#   the in-memory SQLite of the `app` fixture.
+# - SQLite only auto-numbers an INTEGER PRIMARY KEY, so BIGINT compiles as INTEGER
+#   here, and the MySQL upsert for new masters is replaced by INSERT ... ON CONFLICT
+#   DO NOTHING, which keeps the existing row the same way for the id lookups. Items
+#   carry `day` as a date: SQLite's Date type rejects the ISO strings MySQL accepts.
+# ------------------------------------------------------------------------------------
+# Imports:
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import BigInteger, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.compiler import compiles
+
+# Local Imports
+from app.extensions import db
+from app.models.clean_staging import CustomersClean
+from app.tasks import transform_data
+from app.tasks.transform_data import _IdentityCache, _resolve_master_customers
+
+# ------------------------------------------------------------------------------------
+# Vars
+TABLE = CustomersClean.__table__
+CREATED = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    return "INTEGER"
+
+def _item(email: str, raw_id: int, customer_id=None, **payload):
+    if customer_id is not None:
+        payload["customer_id"] = customer_id
+    payload.setdefault("email", email)
+    return (email, payload, 1, raw_id, 0, CREATED, date(2024, 3, 1), "shop")
+
+def _existing(email: str, customer_id=None) -> int:
+    row = transform_data._master_customer_row(*_item(email, 1000 + _count(), customer_id))
+    return db.session.execute(TABLE.insert().values(**row)).inserted_primary_key[0]
+
+def _count() -> int:
+    return db.session.execute(select(func.count()).select_from(TABLE)).scalar()
+
+# ------------------------------------------------------------------------------------
+# Fixtures
+
+@pytest.fixture
+def customers(app, monkeypatch):
+    db.metadata.create_all(db.engine, tables=[TABLE])
+    monkeypatch.setattr(transform_data, "_master_insert_stmt", lambda: sqlite_insert(TABLE).on_conflict_do_nothing())
+    yield
+    db.session.rollback()
+    db.metadata.drop_all(db.engine, tables=[TABLE])
+
+# ------------------------------------------------------------------------------------
+# Tests
+
+def test_empty(customers):
+    assert _resolve_master_customers([], _IdentityCache()) == {}
+
+def test_creates_first_payload_per_customer(customers):
+    cache = _IdentityCache()
+    resolved = _resolve_master_customers(
+        [_item("a@x.io", 1, first_name="A1"), _item("b@x.io", 2), _item("a@x.io", 3, first_name="A2")],
+        cache,
+    )
+    assert set(resolved) == {("email", "a@x.io"), ("email", "b@x.io")}
+    assert _count() == 2
+    first_name = db.session.execute(select(TABLE.c.first_name).where(TABLE.c.id == resolved[("email", "a@x.io")])).scalar()
+    assert first_name == "A1"
+    assert cache.stats["created"] == 2 and cache.stats["misses"] == 2
+
+def test_second_batch_is_served_from_cache(customers):
+    cache = _IdentityCache()
+    first = _resolve_master_customers([_item("a@x.io", 1, customer_id=7)], cache)
+    again = _resolve_master_customers([_item("a@x.io", 2, customer_id="7")], cache)
+    assert again == first
+    assert _count() == 1
+    assert cache.stats["hits"] == 2
+
+def test_existing_rows_are_found_customer_id_first(customers):
+    by_email = _existing("old@x.io")
+    by_cid = _existing("cid@x.io", customer_id=42)
+    cache = _IdentityCache()
+    resolved = _resolve_master_customers([_item("old@x.io", 1), _item("new@x.io", 2, customer_id=" 42 ")], cache)
+    assert resolved[("email", "old@x.io")] == by_email
+    assert resolved[("cid", 42)] == by_cid
+    assert ("email", "new@x.io") not in resolved  # matched by customer_id; no new master
+    assert _count() == 2
+    assert cache.stats["found"] == 2 and cache.stats["created"] == 0
+
+def test_one_master_for_keys_seen_together(customers):
+    resolved = _resolve_master_customers(
+        [_item("x@x.io", 1, customer_id=5), _item("y@x.io", 2, customer_id=5), _item("x@x.io", 3)],
+        _IdentityCache(),
+    )
+    assert _count() == 1
+    assert resolved[("cid", 5)] == resolved[("email", "x@x.io")]
+    # The y@ payload reaches the master through its customer_id, as the caller looks it up
+    y_keys = transform_data._identity_keys("y@x.io", {"customer_id": 5})
+    assert next(resolved[k] for k in y_keys if k in resolved) == resolved[("cid", 5)]
+
+def test_keys_not_stored_on_the_master_are_not_cached(customers):
+    # c@ joins a@'s new master through customer_id 5 but is not stored on that row
+    batch = [_item("a@x.io", 1, customer_id=5), _item("c@x.io", 2, customer_id=5)]
+    warm = _IdentityCache()
+    resolved = _resolve_master_customers(batch, warm)
+    assert set(resolved) == {("cid", 5), ("email", "a@x.io")}
+    assert warm.get(("email", "c@x.io")) is None
+    # An email-only payload for c@ gets the same master with a warm or a cold cache
+    later = [_item("c@x.io", 3)]
+    from_warm = _resolve_master_customers(later, warm)
+    from_cold = _resolve_master_customers(later, _IdentityCache())
+    assert from_warm == from_cold
+    assert from_warm[("email", "c@x.io")] != resolved[("cid", 5)]
+    assert _count() == 2
+
+def test_insert_meeting_existing_customer_id(customers, monkeypatch):
+    # The lookup missed it (here: failed), so the insert runs into the stored customer_id
+    stored = _existing("first@x.io", customer_id=77)
+
+    def _lookup_fails(*args, **kwargs):
+        raise RuntimeError("lookup timed out")
+
+    monkeypatch.setattr(transform_data, "_load_master_ids", _lookup_fails)
+    cache = _IdentityCache()
+    resolved = _resolve_master_customers([_item("second@x.io", 1, customer_id=77)], cache)
+    # The stored row kept its own email, so second@ is not an identity of it
+    assert resolved == {("cid", 77): stored}
+    assert _count() == 1
+    assert cache.stats["created"] == 0
+
+def test_identity_cache_is_lru():
+    cache = _IdentityCache(max_size=2)
+    cache.put(("email", "a"), 1)
+    cache.put(("email", "b"), 2)
+    assert cache.get(("email", "a")) == 1
+    cache.put(("email", "c"), 3)
+    assert cache.get(("email", "b")) is None
+    assert (cache.get(("email", "a")), cache.get(("email", "c"))) == (1, 3)
+    assert cache.stats["evicted"] == 1
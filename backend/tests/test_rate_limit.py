@@ -0,0 +1,174 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - TokenBucket / SourceThrottle and the server hint parsers (app/utils/rate_limit.py).
+# - `clock` swaps the module's monotonic clock and sleep for a manual one, so waits
+#   are exact and the tests never sleep. Rates are powers of two: the manual clock only
+#   moves by the requested delay, so float rounding must not leave a token short.
+# ------------------------------------------------------------------------------------
+# Imports:
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+# Local Imports
+from app.utils import rate_limit
+from app.utils.rate_limit import (
+    HostBuckets,
+    SourceThrottle,
+    TokenBucket,
+    parse_rate_limit_config,
+    quota_reset_seconds,
+    retry_after_seconds,
+)
+
+# ------------------------------------------------------------------------------------
+# Fixtures
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+class _Response:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=c.monotonic, sleep=c.sleep, time=time.time))
+    return c
+
+# ------------------------------------------------------------------------------------
+# TokenBucket
+
+def test_unlimited_bucket_never_waits(clock):
+    bucket = TokenBucket()
+    assert [bucket.acquire() for _ in range(100)] == [0.0] * 100
+    assert clock.slept == []
+
+def test_burst_then_rate(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+
+def test_tokens_refill_up_to_burst(clock):
+    bucket = TokenBucket(rate=4, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 60
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.25)
+
+def test_pause_blocks_even_unlimited(clock):
+    bucket = TokenBucket()
+    bucket.pause(5)
+    bucket.pause(2)  # never shortens a pause
+    assert bucket.acquire() == pytest.approx(5)
+
+def test_defaults_and_invalid_rate():
+    assert TokenBucket(rate=0).rate is None
+    assert TokenBucket(rate=-1).rate is None
+    assert TokenBucket(rate=5).burst == 5
+    assert TokenBucket(rate=0.2).burst == 1.0
+
+def test_tighten_only_lowers():
+    bucket = TokenBucket(rate=5, burst=5)
+    bucket.tighten(10, 10)
+    assert (bucket.rate, bucket.burst) == (5, 5)
+    bucket.tighten(1, 2)
+    assert (bucket.rate, bucket.burst) == (1, 2)
+    bucket.tighten(None, None)
+    assert bucket.rate == 1
+
+def test_host_buckets_share_and_tighten():
+    hosts = HostBuckets()
+    a = hosts.get("api.example.com", 10, 10)
+    b = hosts.get("api.example.com", 2, 4)
+    assert a is b and a.rate == 2
+    assert hosts.get("other.example.com") is not a
+
+# ------------------------------------------------------------------------------------
+# Server hints
+
+def test_retry_after():
+    assert retry_after_seconds({}) is None
+    assert retry_after_seconds({"Retry-After": "30"}) == 30
+    assert retry_after_seconds({"Retry-After": "-3"}) == 0
+    assert retry_after_seconds({"Retry-After": "soon"}) is None
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    when = format_datetime(datetime(2024, 1, 1, 0, 2, tzinfo=timezone.utc), usegmt=True)
+    assert retry_after_seconds({"Retry-After": when}, now=now) == 120
+
+def test_quota_reset():
+    now = 1_700_000_000.0
+    assert quota_reset_seconds({"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "60"}, now) is None
+    assert quota_reset_seconds({"X-RateLimit-Remaining": "0"}, now) is None
+    assert quota_reset_seconds({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "60"}, now) == 60
+    assert quota_reset_seconds({"RateLimit-Remaining": "0", "RateLimit-Reset": str(now + 90)}, now) == 90
+    assert quota_reset_seconds({"X-Rate-Limit-Remaining": "0", "X-Rate-Limit-Reset": str((now + 15) * 1000)}, now) == 15
+
+# ------------------------------------------------------------------------------------
+# SourceThrottle
+
+def test_throttle_pauses_on_hints(clock):
+    throttle = SourceThrottle(TokenBucket(), TokenBucket(), max_pause=300)
+    assert throttle.observe(_Response(200)) is None
+    assert throttle.observe(_Response(429, {"Retry-After": "7"})) == 7
+    assert throttle.observe(_Response(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "3"})) == 3
+    throttle.wait()
+    assert clock.slept == [pytest.approx(7)]
+    assert throttle.stats() == {"throttle_wait_ms": 7000, "pauses": 2, "rate_limited": 1}
+
+def test_hint_pauses_every_source_on_the_host(clock):
+    hosts = HostBuckets()
+    first = SourceThrottle(TokenBucket(), hosts.get("api.example.com"), max_pause=300)
+    second = SourceThrottle(TokenBucket(), hosts.get("api.example.com"), max_pause=300)
+    other = SourceThrottle(TokenBucket(), hosts.get("other.example.com"), max_pause=300)
+    assert first.observe(_Response(429, {"Retry-After": "4"})) == 4
+    other.wait()
+    assert clock.slept == []
+    second.wait()
+    assert clock.slept == [pytest.approx(4)]
+    assert second.stats()["throttle_wait_ms"] == 4000
+
+def test_throttle_backs_off_without_hint():
+    throttle = SourceThrottle(TokenBucket(), TokenBucket(), max_pause=300)
+    assert [throttle.observe(_Response(429)) for _ in range(3)] == [1.0, 2.0, 4.0]
+    assert throttle.rate_limited == 3
+
+def test_throttle_ignores_pause_over_max():
+    throttle = SourceThrottle(TokenBucket(), TokenBucket(), max_pause=10)
+    assert throttle.observe(_Response(503, {"Retry-After": "3600"})) is None
+    assert throttle.pauses == 0
+
+def test_parse_rate_limit_config():
+    assert parse_rate_limit_config({}) == {
+        "per_second": None, "burst": None, "host_per_second": None, "host_burst": None,
+        "max_pause": rate_limit.DEFAULT_MAX_PAUSE, "max_rate_limited": rate_limit.DEFAULT_MAX_RATE_LIMITED,
+    }
+    limits = parse_rate_limit_config({"rate_limit": {"per_second": "2", "burst": 0, "host_per_second": "x", "max_pause": 30}})
+    assert (limits["per_second"], limits["burst"], limits["host_per_second"], limits["max_pause"]) == (2.0, None, None, 30.0)
+
+def test_max_rate_limited_accepts_zero():
+    assert parse_rate_limit_config({"rate_limit": {"max_rate_limited": 0}})["max_rate_limited"] == 0
+    assert parse_rate_limit_config({"rate_limit": {"max_rate_limited": "3"}})["max_rate_limited"] == 3
+    for bad in (-1, "x"):
+        limits = parse_rate_limit_config({"rate_limit": {"max_rate_limited": bad}})
+        assert limits["max_rate_limited"] == rate_limit.DEFAULT_MAX_RATE_LIMITED
@@ -0,0 +1,184 @@
+# ------------------------------------------------------------------------------------
+# Developed by Carpathian, LLC.
+# ------------------------------------------------------------------------------------
+# Legal Notice: Distribution Not Authorized.
+# ------------------------------------------------------------------------------------
+# Notes:
+# - Batching, hash pre-check and bisect paths of app/utils/raw_writer.py, in item and
+#   page mode.
+# - The MySQL statements themselves (upsert, page insert, hash lookup) are swapped for
+#   _Store, an in-memory table keyed by content_hash that rejects any write containing
+#   a "poison" row, so the tests exercise how batches are split, counted and reported,
+#   not the SQL.
+# ------------------------------------------------------------------------------------
+# Imports:
+import hashlib
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+# Local Imports
+from app.utils import raw_writer
+
+# ------------------------------------------------------------------------------------
+# Functions
+
+def _row(n: int, poison: bool = False):
+    content = {"id": n, "poison": poison}
+    return {
+        "user_id": 1,
+        "source_id": 2,
+        "content": content,
+        "content_hash": hashlib.sha256(repr(content).encode()).digest(),
+        "content_type": "json",
+        "status": "ok",
+        "error_message": None,
+    }
+
+class _Store:
+    def __init__(self):
+        self.hashes = set()
+        self.batches = []  # size of every batch sent
+        self.lookup_error = None
+        self.next_lookup_error = None  # becomes lookup_error after the next lookup
+        self.pages = []    # item count of every page row written
+        self.racing = set()  # hashes "another writer" stores just before the next page insert
+
+    def existing_item_hashes(self, hashes):
+        if self.lookup_error:
+            raise self.lookup_error
+        self.lookup_error = self.next_lookup_error
+        return set(hashes) & self.hashes
+
+    def execute_batch(self, rows):
+        self.batches.append(len(rows))
+        if any(row["content"]["poison"] for row in rows):
+            raise ValueError("Data too long for column 'content'")
+        fresh = {row["content_hash"] for row in rows} - self.hashes
+        self.hashes |= fresh
+        return len(fresh)
+
+    def execute_page(self, rows):
+        self.hashes |= self.racing
+        self.racing = set()
+        if any(row["content"]["poison"] for row in rows):
+            raise ValueError("Data too long for column 'content'")
+        hashes = {row["content_hash"] for row in rows}
+        if hashes & self.hashes:
+            raise IntegrityError("INSERT INTO user_dataset_item_hash", {}, Exception("Duplicate entry"))
+        self.hashes |= hashes
+        self.pages.append(len(rows))
+
+# ------------------------------------------------------------------------------------
+# Fixtures
+
+@pytest.fixture
+def store(app, monkeypatch):
+    s = _Store()
+    monkeypatch.setattr(raw_writer, "_execute_batch", s.execute_batch)
+    monkeypatch.setattr(raw_writer, "_existing_item_hashes", s.existing_item_hashes)
+    monkeypatch.setattr(raw_writer, "_execute_page", s.execute_page)
+    return s
+
+# ------------------------------------------------------------------------------------
+# Tests
+
+def test_empty():
+    assert raw_writer.upsert_raw_rows([]) == {
+        "inserted": 0, "duplicates": 0, "failed": 0, "prechecked": 0, "errors": [], "rejected": [],
+    }
+
+def test_batches_and_stamps(store):
+    rows = [_row(n) for n in range(25)]
+    res = raw_writer.upsert_raw_rows(rows, batch_size=10, precheck=False)
+    assert (res["inserted"], res["duplicates"], res["failed"]) == (25, 0, 0)
+    assert store.batches == [10, 10, 5]
+    assert all(isinstance(row["ingested_at"], datetime) and row["created_at"] == row["ingested_at"] for row in rows)
+
+def test_upsert_counts_duplicates(store):
+    raw_writer.upsert_raw_rows([_row(n) for n in range(3)], precheck=False)
+    res = raw_writer.upsert_raw_rows([_row(n) for n in range(5)], precheck=False)
+    assert (res["inserted"], res["duplicates"]) == (2, 3)
+
+def test_bisect_isolates_bad_row(store):
+    rows = [_row(n, poison=(n == 5)) for n in range(8)]
+    res = raw_writer.upsert_raw_rows(rows, precheck=False)
+    assert (res["inserted"], res["failed"]) == (7, 1)
+    assert res["rejected"] == [rows[5]["content_hash"]]
+    assert len(res["errors"]) == 1 and "row_rejected" in res["errors"][0]
+    # Depth first: 8 -> 4 (ok) + 4 -> 2 (rows 4, 5) -> 1 + 1, then 2 (rows 6, 7)
+    assert store.batches == [8, 4, 4, 2, 1, 1, 2]
+
+def test_bisect_several_bad_rows(store):
+    bad = {0, 3, 9}
+    rows = [_row(n, poison=(n in bad)) for n in range(10)]
+    res = raw_writer.upsert_raw_rows(rows, precheck=False)
+    assert (res["inserted"], res["failed"]) == (7, 3)
+    assert sorted(res["rejected"]) == sorted(rows[n]["content_hash"] for n in bad)
+    assert store.hashes == {row["content_hash"] for n, row in enumerate(rows) if n not in bad}
+
+def test_precheck_skips_stored_rows(store):
+    raw_writer.upsert_raw_rows([_row(n) for n in range(4)])
+    res = raw_writer.upsert_raw_rows([_row(n) for n in range(6)])
+    assert (res["inserted"], res["duplicates"], res["prechecked"]) == (2, 4, 4)
+    assert store.batches == [4, 2]
+
+def test_precheck_all_stored_sends_nothing(store):
+    rows = [_row(n) for n in range(4)]
+    raw_writer.upsert_raw_rows(rows)
+    res = raw_writer.upsert_raw_rows([_row(n) for n in range(4)])
+    assert (res["inserted"], res["duplicates"], res["prechecked"]) == (0, 4, 4)
+    assert store.batches == [4]
+
+def test_precheck_failure_writes_unfiltered(store):
+    raw_writer.upsert_raw_rows([_row(n) for n in range(2)])
+    store.lookup_error = RuntimeError("lookup timed out")
+    res = raw_writer.upsert_raw_rows([_row(n) for n in range(3)])
+    # The upsert still dedupes what the pre-check could not
+    assert (res["inserted"], res["duplicates"], res["prechecked"]) == (1, 2, 0)
+    assert store.batches == [2, 3]
+
+def test_page_stores_new_items_once(store):
+    res = raw_writer.upsert_raw_page([_row(n) for n in range(5)])
+    assert (res["inserted"], res["pages"], res["duplicates"]) == (5, 1, 0)
+    res = raw_writer.upsert_raw_page([_row(n) for n in range(3, 8)])
+    assert (res["inserted"], res["pages"], res["duplicates"], res["prechecked"]) == (3, 1, 2, 2)
+    assert store.pages == [5, 3]
+
+def test_page_dedupes_against_item_rows(store):
+    raw_writer.upsert_raw_rows([_row(n) for n in range(2)])
+    res = raw_writer.upsert_raw_page([_row(n) for n in range(4)])
+    assert (res["inserted"], res["duplicates"]) == (2, 2)
+    assert store.pages == [2]
+
+def test_page_retries_after_insert_race(store):
+    rows = [_row(n) for n in range(6)]
+    store.racing = {rows[1]["content_hash"], rows[4]["content_hash"]}
+    res = raw_writer.upsert_raw_page(rows)
+    assert (res["inserted"], res["duplicates"], res["failed"], res["pages"]) == (4, 2, 0, 1)
+    assert store.pages == [4]
+
+def test_page_lookup_failure_after_race_is_reported(store):
+    rows = [_row(n) for n in range(4)]
+    store.racing = {rows[0]["content_hash"]}
+    store.next_lookup_error = RuntimeError("lookup timed out")
+    res = raw_writer.upsert_raw_page(rows)
+    assert (res["inserted"], res["failed"], res["pages"]) == (0, 4, 0)
+    assert res["rejected"] == [row["content_hash"] for row in rows]
+    assert res["errors"] == ["item_hash_lookup: lookup timed out"]
+
+def test_page_bisects_bad_item(store):
+    rows = [_row(n, poison=(n == 2)) for n in range(4)]
+    res = raw_writer.upsert_raw_page(rows)
+    assert (res["inserted"], res["failed"], res["pages"]) == (3, 1, 2)
+    assert res["rejected"] == [rows[2]["content_hash"]]
+    assert store.pages == [2, 1]
+
+def test_page_lookup_failure_rejects_everything(store):
+    store.lookup_error = RuntimeError("lookup timed out")
+    rows = [_row(n) for n in range(3)]
+    res = raw_writer.upsert_raw_page(rows)
+    assert (res["inserted"], res["failed"], res["pages"]) == (0, 3, 0)
+    assert res["rejected"] == [row["content_hash"] for row in rows]
+    assert store.pages == []